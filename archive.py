@@ -0,0 +1,169 @@
+"""
+날짜별 브리핑 아카이브 — output/YYYYMMDD.md·html + meta.json + 페이지 목록
+
+실행마다 오늘 항목 하나만 추가(같은 날 재실행이면 교체)하고 지난 날짜 페이지는
+다시 읽거나 렌더링하지 않는다.
+  - meta.json: [{date, label, file}] 오름차순 배열. 끝부분만 파싱해 덧붙인다 (사본 + 교체)
+  - pages/NNNN.json·html: 오래된 순 PAGE_SIZE개씩 고정 분할 → 마지막 페이지만 갱신
+    (새 페이지가 생길 때만 직전 페이지의 '다음' 링크를 위해 한 장 더 렌더)
+  - archive.html: 최신 목록 페이지, index.html: 오늘 브리핑 페이지
+실행당 파싱·렌더링은 아카이브 크기와 무관하게 O(새 항목 + PAGE_SIZE).
+"""
+
+import html
+import json
+from pathlib import Path
+from string import Template
+
+import assets
+
+PAGE_SIZE = 30
+TEMPLATE = Path("templates/archive.html")
+_TAIL = 4096          # meta.json 끝에서 읽는 바이트 — 항목 하나보다 충분히 큼
+
+
+def _entry_block(entry):
+    """json.dumps(list, indent=2) 와 같은 모양의 배열 원소 텍스트"""
+    return "  " + json.dumps(entry, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+
+
+def append_meta(path, entry):
+    """meta.json에 항목 추가 (마지막 항목과 날짜가 같으면 교체) → 전체 항목 수 변화(0/1)
+
+    마지막 항목보다 이른 날짜(백필)이거나 형식이 예상과 다르면 전체를 다시 쓴다."""
+    path = Path(path)
+    if not path.exists():
+        assets.write_changed(path, json.dumps([entry], ensure_ascii=False, indent=2))
+        return 1
+    data = path.read_bytes()
+    start = max(0, len(data) - _TAIL)
+    tail = data[start:]
+    end = tail.rstrip().rfind(b"]")
+    i = tail.rfind(b"\n  {", 0, end)
+    last = None
+    if end > 0 and i >= 0:
+        try:
+            last = json.loads(tail[i:end].strip())
+        except ValueError:
+            last = None
+    # 끝부분만 파싱해 이어 붙이고 파일은 사본 + 교체 — 중간에 죽어도 meta.json은 온전
+    if last is not None and last.get("date") == entry["date"]:
+        assets.write_atomic(path, data[:start + i] + b"\n" + _entry_block(entry).encode("utf-8") + b"\n]")
+        return 0
+    if last is not None and last.get("date", "") < entry["date"]:
+        cut = start + tail.rfind(b"}", 0, end) + 1
+        assets.write_atomic(path, data[:cut] + b",\n" + _entry_block(entry).encode("utf-8") + b"\n]")
+        return 1
+    # 빈 배열·백필·손상 → 전체 재작성 (드문 경로)
+    try:
+        items = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        items = []
+    before = len(items)
+    items = sorted({e["date"]: e for e in items + [entry]}.values(), key=lambda e: e["date"])
+    assets.write_changed(path, json.dumps(items, ensure_ascii=False, indent=2))
+    return len(items) - before
+
+
+class Archive:
+    """output/ 아카이브 — add()가 오늘 항목을 쓰고 목록 페이지를 증분 갱신
+
+    store(assets.AssetStore)가 있으면 페이지 공통 CSS를 해시 파일 하나로 빼서 참조한다."""
+
+    def __init__(self, root="output", page_size=PAGE_SIZE, template=TEMPLATE, store=None):
+        self.root = Path(root)
+        self.page_size = page_size
+        self.tmpl = Template(Path(template).read_text(encoding="utf-8"))
+        self.state_path = self.root / "pages" / "state.json"
+        self.store = store
+
+    def _page(self, path, text):
+        if self.store is not None:
+            text = assets.externalize(text, self.store, assets.relative_base(self.store.root, path))
+        assets.write_changed(path, text)
+
+    # ── 상태 ──
+    def _state(self):
+        """{"count", "latest", "page_size"} — 없으면 기존 meta.json에서 한 번만 페이지를 만든다"""
+        if self.state_path.exists():
+            st = json.loads(self.state_path.read_text(encoding="utf-8"))
+            if st.get("page_size") == self.page_size:
+                return st
+        return self._rebuild()
+
+    def _rebuild(self):
+        meta = self.root / "meta.json"
+        items = json.loads(meta.read_text(encoding="utf-8")) if meta.exists() else []
+        n, last = len(items), self._npages(len(items))
+        for p in range(last):
+            self._save_page(p + 1, items[p * self.page_size:(p + 1) * self.page_size], p + 1 < last)
+        return self._save_state(n, items[-1]["date"] if items else "")
+
+    def _save_state(self, count, latest):
+        st = {"count": count, "latest": latest, "page_size": self.page_size}
+        assets.write_changed(self.state_path, json.dumps(st))
+        return st
+
+    def _npages(self, count):
+        return (count + self.page_size - 1) // self.page_size
+
+    # ── 페이지 ──
+    def _page_path(self, no, ext):
+        return self.root / "pages" / f"{no:04d}.{ext}"
+
+    def _load_page(self, no):
+        path = self._page_path(no, "json")
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+
+    def _save_page(self, no, items, has_newer):
+        assets.write_changed(self._page_path(no, "json"), json.dumps(items, ensure_ascii=False))
+        self._page(self._page_path(no, "html"), self.render_list(no, items, has_newer, prefix="../"))
+
+    def render_list(self, no, items, has_newer, prefix="", meta=""):
+        """목록 페이지 — 최신 항목이 위. prefix는 output/ 기준 상대 경로 보정
+
+        지난 페이지는 다시 렌더하지 않으므로 전체 건수처럼 바뀌는 값은 넣지 않는다."""
+        rows = "\n".join(
+            f'    <li><a href="{prefix}{html.escape(e["file"])}">{html.escape(e["label"])}</a></li>'
+            for e in reversed(items))
+        page = lambda n: f"{prefix}pages/{n:04d}.html"
+        older = f'<a href="{page(no - 1)}">← 이전</a>' if no > 1 else "<span></span>"
+        newer = f'<a href="{page(no + 1)}">다음 →</a>' if has_newer else "<span></span>"
+        body = (f'    <ul class="archive-list">\n{rows}\n    </ul>\n'
+                f'    <div class="pager">{older}<span>{no}</span>{newer}</div>')
+        return self.tmpl.substitute(
+            title=f"지난 브리핑 {no}", heading="지난 브리핑",
+            meta=meta or (f"{items[0]['label']} ~ {items[-1]['label']}" if items else ""),
+            archive_href=f"{prefix}archive.html", search_base=f"{prefix}search/", body=body)
+
+    # ── 추가 ──
+    def add(self, date, label, heading, generated, md_text, body_html):
+        """오늘 브리핑 기록 → 항목 dict. date='YYYYMMDD'"""
+        entry = {"date": date, "label": label, "file": f"{date}.html"}
+        page_html = self.tmpl.substitute(
+            title=label, heading=heading, meta=f"Generated {generated}",
+            archive_href="archive.html", search_base="search/", body=body_html)
+        assets.write_changed(self.root / f"{date}.md", md_text)
+        self._page(self.root / f"{date}.html", page_html)
+        self._page(self.root / "index.html", page_html)
+
+        st = self._state()
+        added = append_meta(self.root / "meta.json", entry)
+        if date < st["latest"]:
+            st = self._rebuild()                      # 백필 — 페이지 경계가 바뀜
+        elif added:
+            count = st["count"] + 1
+            no = self._npages(count)
+            new_page = (count - 1) % self.page_size == 0
+            self._save_page(no, ([] if new_page else self._load_page(no)) + [entry], False)
+            if new_page and no > 1:
+                self._save_page(no - 1, self._load_page(no - 1), True)   # '다음' 링크 추가
+            st = self._save_state(count, date)
+        else:                                         # 같은 날 재실행 — 마지막 페이지의 항목 교체
+            no = self._npages(st["count"])
+            self._save_page(no, [entry if e["date"] == date else e for e in self._load_page(no)],
+                            False)
+        last = self._npages(st["count"])
+        self._page(self.root / "archive.html",
+                   self.render_list(last, self._load_page(last), False, meta=f"총 {st['count']}건"))
+        return entry
@@ -0,0 +1,88 @@
+"""
+콘텐츠 주소 출력 — 페이지의 공통 CSS·JS·조각을 해시 이름 파일로 한 번만 기록
+
+  {root}/{sha256 앞 16자}.{css|js|html}   내용이 이름이므로 한 번 쓰면 바뀌지 않는다
+같은 내용은 파일이 이미 있으면 다시 쓰지 않고, 페이지는 <link>·<script src>로 참조한다.
+매일 같은 템플릿 CSS·부트스트랩 JS가 커밋·배포마다 반복되지 않고 새 바이트만 남는다.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+
+MIN_BYTES = 1024      # 이보다 작은 블록은 요청 하나를 더 만들 가치가 없어 인라인 유지
+HASH_CHARS = 16
+
+# 속성 없는 블록만 — src·type이 붙은 스크립트(위젯 임베드, JSON 데이터)는 건드리지 않음
+_BLOCK_RE = re.compile(r"<(style|script)>([\s\S]*?)</\1>")
+_EXT = {"style": "css", "script": "js"}
+
+
+def write_atomic(path, data):
+    """bytes|str → tmp에 쓰고 교체 — 읽는 쪽이 반쯤 쓴 파일을 보지 않고,
+    스레드·프로세스가 같은 파일을 동시에 써도 tmp가 겹치지 않음. 모든 모듈의 파일 기록 경로"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_changed(path, data):
+    """내용이 다를 때만 write_atomic → 기록 여부 (커밋·배포에 실제로 바뀐 파일만 남김)"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path = Path(path)
+    if path.exists() and path.read_bytes() == data:
+        return False
+    write_atomic(path, data)
+    return True
+
+
+class AssetStore:
+    """해시 이름 파일 저장소 — compress면 .gz 사전 압축본도 같이 쓴다"""
+
+    def __init__(self, root, compress=False):
+        self.root = Path(root)
+        self.compress = compress
+        self.written = self.reused = self.bytes_written = 0
+
+    def put(self, data, ext):
+        """bytes|str → 파일 이름 (이미 있으면 쓰지 않음)"""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        name = f"{hashlib.sha256(data).hexdigest()[:HASH_CHARS]}.{ext}"
+        path = self.root / name
+        if path.exists() and path.stat().st_size == len(data):
+            self.reused += 1
+            return name
+        write_changed(path, data)
+        if self.compress:
+            write_changed(path.with_name(name + ".gz"), gzip.compress(data, 9, mtime=0))
+        self.written += 1
+        self.bytes_written += len(data)
+        return name
+
+
+def externalize(html, store, base="", min_bytes=MIN_BYTES):
+    """html 안의 <style>·<script> 블록 → store 파일 참조. base는 페이지 기준 store 경로 ('assets/')"""
+    def repl(m):
+        tag, body = m.group(1), m.group(2)
+        if len(body) < min_bytes:
+            return m.group(0)
+        href = base + store.put(body, _EXT[tag])
+        if tag == "style":
+            return f'<link rel="stylesheet" href="{href}">'
+        return f'<script src="{href}"></script>'
+    return _BLOCK_RE.sub(repl, html)
+
+
+def relative_base(root, page):
+    """page 파일에서 root 디렉터리까지의 상대 URL 접두 ('assets/', '../assets/')"""
+    rel = os.path.relpath(Path(root), Path(page).parent)
+    return rel.replace(os.sep, "/").rstrip("/") + "/"
@@ -0,0 +1,399 @@
+"""오프라인 벤치마크 — 렌더·변환 경로 처리량/메모리 측정 + 기준선 회귀 검사
+
+  python bench.py              # 측정 후 bench_baseline.json과 비교 (메모리 회귀 시 exit 1)
+  python bench.py --strict     # 시간 회귀도 exit 1 (같은 머신·조용한 환경에서만)
+  python bench.py --update     # 현재 결과를 기준선으로 저장
+  python bench.py -k patch     # 이름에 'patch'가 들어간 케이스만
+  python bench.py -k import    # 모듈 import 시간만
+
+sample_gen.py의 SAMPLE·mock 데이터와 합성 대용량 입력(10년치 일간 FRED — fred_js·SVG 차트,
+50KB 브리핑, 카드 수백 개 템플릿, 변형 페이지 300개)을 쓴다. 네트워크는 사용하지 않는다.
+import.* 케이스는 새 인터프리터에서 모듈 import 시간을 재고, 무거운 SDK가
+import 시점에 딸려 오면 시간과 무관하게 실패로 처리한다.
+시간은 고정 보정 루프(_calibration) 대비 비율로 비교해 머신 속도 차를 덜어 내고,
+그래도 잡음이 커서 기본은 경고만 한다. 실패는 peak 메모리·무거운 import로만 낸다.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, ".")
+import assets
+import generate as g
+import marketstore
+import sample_gen as sg
+import searchindex
+import snapshots
+import svgchart
+
+BASELINE = Path("bench_baseline.json")
+
+
+# ───────────────────────────────────────────
+# 합성 입력
+# ───────────────────────────────────────────
+
+def synth_daily(years=10, seed=7, start=100.0):
+    """영업일 기준 일간 관측치 [(date, value)]"""
+    rnd = random.Random(seed)
+    d, v, out = date.today() - timedelta(days=365 * years), start, []
+    while d <= date.today():
+        if d.weekday() < 5:
+            v = max(0.1, v + rnd.gauss(0, 0.4))
+            out.append((d.isoformat(), round(v, 3)))
+        d += timedelta(days=1)
+    return out
+
+
+def synth_cnn_payload(days=365, seed=3):
+    """CNN graphdata 형태 JSON 문자열 (지표 7종 × days 포인트)"""
+    rnd = random.Random(seed)
+    t0 = (time.time() - days * 86400) * 1000
+    def pts(lo, hi):
+        return [{"x": t0 + i * 86400000, "y": round(rnd.uniform(lo, hi), 4),
+                 "rating": "neutral"} for i in range(days)]
+    d = {"fear_and_greed": {"score": 41.2, "rating": "fear", "previous_close": 40.1,
+                            "previous_1_week": 47.3, "previous_1_month": 55.0},
+         "fear_and_greed_historical": {"data": pts(0, 100)},
+         "put_call_options": {"data": pts(0.5, 1.3)}}
+    for k in ("market_momentum_sp500", "stock_price_strength", "stock_price_breadth",
+              "junk_bond_demand", "market_volatility_vix"):
+        d[k] = {"data": pts(0, 100)}
+    return json.dumps(d)
+
+
+def synth_crypto_payload(n=31, seed=5):
+    rnd = random.Random(seed)
+    return json.dumps({"data": [{"value": str(rnd.randint(1, 99)),
+                                 "value_classification": "Fear"} for _ in range(n)]})
+
+
+def synth_move_frame(years=2):
+    import numpy as np
+    import pandas as pd
+    idx = pd.bdate_range(end=date.today(), periods=252 * years)
+    vals = 80 + np.cumsum(np.random.default_rng(1).normal(0, 1.5, len(idx)))
+    df = pd.DataFrame({("Close", "^MOVE"): vals}, index=idx)
+    df.columns = pd.MultiIndex.from_tuples(df.columns)
+    return df
+
+
+def synth_ohlc_frame(symbols, years=2, seed=2):
+    """yf.download(group_by="ticker") 형태 — (심볼, 필드) 열, 심볼마다 일부 휴장일 NaN"""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(end=date.today(), periods=252 * years)
+    cols = {}
+    for sym in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(idx))))
+        close[rng.random(len(idx)) < 0.03] = np.nan
+        for f, k in (("Open", 0.998), ("High", 1.01), ("Low", 0.99), ("Close", 1.0)):
+            cols[(sym, f)] = close * k
+        cols[(sym, "Volume")] = rng.integers(1e5, 1e7, len(idx)).astype(float)
+    return pd.DataFrame(cols, index=idx)
+
+
+def many_cards(n=400):
+    """카드 n개짜리 지수 카드 슬롯 (CARD_SETS 교체용) + 그 시세"""
+    mkt = {f"SYM{i}": {"price": 100 + i, "change": (i % 7) - 3,
+                       "spark": [100 + i + (j % 5) for j in range(g.SPARK_POINTS)]}
+           for i in range(n)}
+    return {**g.CARD_SETS, "index_cards": [(f"SYM{i}", f"SYM{i}") for i in range(n)]}, \
+        {**sg.mock_mkt, **mkt}
+
+
+@contextlib.contextmanager
+def patched(obj, **attrs):
+    """obj 속성을 잠시 교체 — 블록을 나가면 원래 값으로 (다른 케이스는 실제 함수를 본다)"""
+    old = {k: getattr(obj, k) for k in attrs}
+    for k, v in attrs.items():
+        setattr(obj, k, v)
+    try:
+        yield obj
+    finally:
+        for k, v in old.items():
+            setattr(obj, k, v)
+
+
+def many_cards_template(src, n=400):
+    """카드 n개짜리 정적 블록을 추가한 대형 템플릿 (변형 렌더의 두 번째 템플릿)"""
+    cards = "\n".join(g.card(f"SYM{i}", {"price": 100 + i, "change": (i % 7) - 3})
+                      for i in range(n))
+    block = f'<div class="block">\n  <div class="cards">\n{cards}\n  </div>\n</div>\n\n'
+    return src.replace("<!-- 4. 지수 캔들차트 -->", block + "<!-- 4. 지수 캔들차트 -->", 1)
+
+
+def synth_variants(n, templates, out_dir):
+    """데스크별 워치리스트 변형 n개 — 템플릿을 번갈아 쓰고 카드·위젯 구성을 돌려 가며 바꿈"""
+    keys = list(g.SYMS)
+    specs = []
+    for i in range(n):
+        cards = {"index_cards": [(k, k) for k in keys[i % 5:i % 5 + 4 + i % 3]]}
+        widgets = {"stock": [(f"tv-v{i}", keys[i % len(keys)], "NASDAQ:AAPL", 400)]} if i % 2 else {}
+        specs.append({"name": f"v{i}", "template": templates[i % len(templates)],
+                      "out": str(Path(out_dir) / f"v{i}.html"), "cards": cards,
+                      "widgets": widgets})
+    return specs
+
+
+# ───────────────────────────────────────────
+# 케이스
+# ───────────────────────────────────────────
+
+def build_cases():
+    """[(이름, 호출 fn, 입력 바이트 수 or None)] — 준비 비용은 측정 밖"""
+    tmpl = Path("templates/dashboard.html").read_text(encoding="utf-8")
+    big_tmpl = many_cards_template(tmpl)
+    sample_html = g.briefing_to_html(sg.SAMPLE)
+    big_md = (sg.SAMPLE * (50_000 // len(sg.SAMPLE.encode("utf-8")) + 1))
+    big_md = big_md.encode("utf-8")[:50_000].decode("utf-8", "ignore")
+
+    daily = synth_daily(10)
+    daily_xy = {"x": [d for d, _ in daily], "y": [v for _, v in daily]}
+    fred_big = dict(cpi=daily_xy, core=daily_xy, un=daily_xy, ff=daily_xy,
+                    d10=daily_xy, d2=daily_xy)
+
+    cnn_raw = synth_cnn_payload()
+    crypto_raw = synth_crypto_payload()
+    move_df = synth_move_frame()
+    ohlc_syms = list(g.OHLC_SYMS.values())
+    ohlc_df = synth_ohlc_frame(ohlc_syms)
+    move_store = marketstore.OHLCStore()
+    move_store.upsert(move_df, ["^MOVE"])
+    ohlc_store = marketstore.OHLCStore()
+    ohlc_store.upsert(ohlc_df, ohlc_syms)
+
+    def upsert_2y():
+        st = marketstore.OHLCStore()
+        st.upsert(ohlc_df, ohlc_syms)
+        st.close()
+
+    # 변형 렌더 — 300개, 기본·대형 템플릿 번갈아 (출력은 임시 디렉터리)
+    var_dir = tempfile.mkdtemp(prefix="bench-variants-")
+    var_tmpls = [str(Path(var_dir) / "a.html"), str(Path(var_dir) / "b.html")]
+    Path(var_tmpls[0]).write_text(tmpl, encoding="utf-8")
+    Path(var_tmpls[1]).write_text(big_tmpl, encoding="utf-8")
+    variants = synth_variants(300, var_tmpls, var_dir)
+    var_values = g.dashboard_slots(sg.mock_mkt, sg.mock_fred, sample_html, sg.mock_fg,
+                                   sg.mock_move, sg.mock_fred_series)
+    var_bytes = sum(len(Path(t).read_bytes()) for t in var_tmpls) * 150
+
+    def variants_run(workers):
+        return lambda: g.render_variants(variants, var_values, sg.mock_mkt, workers=workers)
+
+    # 일별 스냅샷 히스토리 — 공포탐욕 5년치 (임시 디렉터리)
+    hist = snapshots.ColumnStore(tempfile.mkdtemp(prefix="bench-history-"),
+                                 g.HISTORY_SCHEMA["fear_greed"])
+    labels = ("Extreme Fear", "Fear", "Neutral", "Greed", "Extreme Greed")
+    hist_days = synth_daily(5)
+    for i, (d, v) in enumerate(hist_days):
+        hist.append({"date": d, "cnn": v % 100, "cnn_label": labels[i % 5], "crypto": v % 97,
+                     "crypto_label": labels[(i + 2) % 5], "pcc_now": 0.7 + (i % 30) / 100})
+    hist_row = {"date": hist_days[-1][0], "cnn": 41, "cnn_label": "Fear", "crypto": 63,
+                "crypto_label": "Greed", "pcc_now": 0.81}
+
+    # 네트워크 계층 대체 — 매 호출 JSON 디코딩까지 측정에 포함. 해당 케이스 호출 동안만 교체
+    def fake_http_json(url, params=None, headers=None, timeout=10, source=None):
+        return json.loads(cnn_raw if url == g.CNN_FG_URL else crypto_raw)
+
+    def offline(fn):
+        def run():
+            with patched(g, http_json=fake_http_json, FRED_API_KEY=g.FRED_API_KEY or "bench",
+                         fred_observations=lambda sid, start=None: daily):
+                return fn()
+        return run
+
+    def patch(src, briefing, mkt=sg.mock_mkt):
+        return lambda: g.patch_html(src, mkt, sg.mock_fred, briefing,
+                                    fg=sg.mock_fg, move_pcc=sg.mock_move)
+
+    # 지수 카드 슬롯에 실제 카드 400개 — card()·sparkline 렌더까지 측정
+    card_sets, cards_mkt = many_cards()
+
+    def patch_many_cards():
+        with patched(g, CARD_SETS=card_sets):
+            return patch(tmpl, sample_html, cards_mkt)()
+
+    def patch_cold():
+        g._TEMPLATE_CACHE.clear()
+        return g.patch_html(tmpl, sg.mock_mkt, sg.mock_fred, sample_html,
+                            fg=sg.mock_fg, move_pcc=sg.mock_move)
+
+    nbytes = lambda s: len(s.encode("utf-8"))
+    return [
+        ("card", lambda: g.card("S&P 500", sg.mock_mkt["SP500"]), None),
+        ("briefing_to_html.sample", lambda: g.briefing_to_html(sg.SAMPLE), nbytes(sg.SAMPLE)),
+        ("briefing_to_html.50kb", lambda: g.briefing_to_html(big_md), nbytes(big_md)),
+        ("patch_html.sample", patch(tmpl, sample_html), nbytes(tmpl)),
+        ("patch_html.sample_cold", patch_cold, nbytes(tmpl)),
+        ("patch_html.many_cards", patch_many_cards, nbytes(tmpl)),
+        ("fred_js.sample", lambda: g.fred_js(**sg.mock_fred_series), None),
+        ("fred_js.10y_daily", lambda: g.fred_js(**fred_big), None),
+        ("chart_slots.sample", lambda: g.chart_slots(sg.mock_fred_series, sg.mock_move), None),
+        ("chart_slots.10y_daily", lambda: g.chart_slots(fred_big, sg.mock_move), None),
+        ("sparkline", lambda: svgchart.sparkline(sg.mock_mkt["SP500"]["spark"]), None),
+        ("fred_yoy.10y_daily", offline(lambda: g.fred_yoy("BENCH", start="2016-01-01")), None),
+        ("fetch_fear_greed.parse", offline(g.fetch_fear_greed), nbytes(cnn_raw) + nbytes(crypto_raw)),
+        ("fetch_move_pcc.parse", offline(lambda: g.fetch_move_pcc(move_store)), nbytes(cnn_raw)),
+        ("ohlc.upsert_2y", upsert_2y, None),
+        ("fetch_market.store", lambda: g.fetch_market(ohlc_store), None),
+        ("render_variants.300_inline", variants_run(1), var_bytes),
+        ("render_variants.300_pool", variants_run(max(2, os.cpu_count() or 1)), var_bytes),
+        ("search.tokens_50kb", lambda: searchindex.tokens(big_md), nbytes(big_md)),
+        ("history.append", lambda: hist.append(hist_row), None),
+        ("history.query_5y", lambda: hist.query(columns=("cnn", "cnn_label", "pcc_now")), None),
+    ]
+
+
+# import 시간 — (케이스 이름, 모듈). 렌더 전용 경로는 무거운 SDK 없이 떠야 한다
+IMPORT_CASES = [("import.generate", "generate"), ("import.sample_gen", "sample_gen")]
+HEAVY_MODULES = ("anthropic", "yfinance", "pandas", "numpy", "requests")
+
+
+# ───────────────────────────────────────────
+# 측정
+# ───────────────────────────────────────────
+
+def measure_import(mod, repeat=5):
+    """새 인터프리터 best-of-repeat import 초 + import 시점에 로드된 무거운 모듈"""
+    code = ("import sys, time; t = time.perf_counter(); import %s; dt = time.perf_counter() - t; "
+            "print(dt, ','.join(m for m in %r if m in sys.modules))" % (mod, HEAVY_MODULES))
+    best, heavy = float("inf"), ""
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             check=True).stdout.split()
+        best, heavy = min(best, float(out[0])), (out[1] if len(out) > 1 else "")
+    return best, heavy
+
+
+def measure(fn, min_time=0.3, repeat=7):
+    """best-of-repeat 호출당 초 + tracemalloc 1회 호출 peak 바이트"""
+    fn()                                                # 워밍업 (캐시·import)
+    n = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(n): fn()
+        dt = time.perf_counter() - t
+        if dt >= min_time / repeat or n >= 1 << 20:
+            break
+        n = n * 2 if dt <= 0 else max(n * 2, int(n * (min_time / repeat) / dt))
+    best = dt / n
+    for _ in range(repeat - 1):
+        t = time.perf_counter()
+        for _ in range(n): fn()
+        best = min(best, (time.perf_counter() - t) / n)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def calibrate(repeat=7):
+    """머신 속도 기준 — 케이스들과 비슷한 순수 파이썬 문자열·dict 작업의 best-of 초"""
+    def loop():
+        d = {}
+        for i in range(20000):
+            k = f"k{i % 997}"
+            d[k] = d.get(k, "")[:8] + str(i)
+        return json.dumps(sorted(d.items()))
+    return measure(loop, 0.3, repeat)[0]
+
+
+def fmt_time(sec):
+    return f"{sec*1e6:9.1f} µs" if sec < 1e-3 else f"{sec*1e3:9.2f} ms"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--update", action="store_true", help="현재 결과를 기준선으로 저장")
+    ap.add_argument("--tolerance", type=float, default=0.75,
+                    help="허용 시간 증가율 (기본 0.75 = +75%%)")
+    ap.add_argument("--alloc-tolerance", type=float, default=0.25,
+                    help="허용 peak 메모리 증가율 (기본 0.25)")
+    ap.add_argument("--min-time", type=float, default=0.3, help="케이스당 최소 측정 시간(초)")
+    ap.add_argument("--strict", action="store_true", help="시간 회귀도 실패로 처리")
+    ap.add_argument("-k", default="", help="이름 필터")
+    args = ap.parse_args(argv)
+
+    base = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    calib = calibrate()
+    results, failed, slow = {"_calibration": {"sec": calib, "peak": 0}}, [], []
+    scale = calib / base["_calibration"]["sec"] if "_calibration" in base else 1.0
+    print(f"보정 루프 {fmt_time(calib).strip()} — 기준선 대비 머신 속도 x{1/scale:.2f}")
+
+    def time_note(name, sec):
+        """보정 비율을 뺀 시간 변화 → 표시 문자열 (허용치 초과면 slow에 추가)"""
+        dt = sec / (base[name]["sec"] * scale) - 1
+        if dt <= args.tolerance:
+            return f"time {dt:+.0%}"
+        slow.append(name)
+        return f"time {dt:+.0%} ⚠️"
+
+    print(f"{'case':28} {'time/op':>12} {'ops/s':>10} {'MB/s':>8} {'peak KB':>9}  vs baseline")
+    for name, fn, size in build_cases():
+        if args.k not in name:
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            sec, peak = measure(fn, args.min_time)
+        results[name] = {"sec": sec, "peak": peak}
+        mbps = f"{size / sec / 1e6:8.1f}" if size else " " * 8
+        note = ""
+        b = base.get(name)
+        if b:
+            dm = (peak / b["peak"] - 1) if b["peak"] else 0.0
+            note = f"{time_note(name, sec)}  mem {dm:+.0%}"
+            if dm > args.alloc_tolerance:
+                note += "  ❌ REGRESSION"
+                failed.append(name)
+        print(f"{name:28} {fmt_time(sec):>12} {1/sec:10.0f} {mbps} {math.ceil(peak/1024):9d}  {note}")
+
+    for name, mod in IMPORT_CASES:
+        if args.k not in name:
+            continue
+        sec, heavy = measure_import(mod)
+        results[name] = {"sec": sec, "peak": 0}
+        note = ""
+        b = base.get(name)
+        if b:
+            note = time_note(name, sec)
+        if heavy:
+            note += f"  ❌ HEAVY IMPORT: {heavy}"
+            failed.append(name)
+        print(f"{name:28} {fmt_time(sec):>12} {1/sec:10.0f} {'':8} {'':>9}  {note}")
+
+    if args.update:
+        if args.k and "_calibration" in base:
+            # 일부 케이스만 갱신 — 기준선의 보정 기준에 맞춰 환산, 보정값 자체는 유지
+            del results["_calibration"]
+            results = {k: {**r, "sec": r["sec"] / scale} for k, r in results.items()}
+        base.update(results)
+        assets.write_atomic(BASELINE, json.dumps(base, indent=2, sort_keys=True) + "\n")
+        print(f"💾 기준선 저장: {BASELINE}")
+        return 0
+    if slow:
+        print(f"⚠️ 시간 증가 {len(slow)}건 (보정 후 +{args.tolerance:.0%} 초과): {', '.join(slow)}")
+        if args.strict:
+            failed += slow
+    if failed:
+        print(f"❌ 회귀 {len(failed)}건: {', '.join(failed)}")
+        return 1
+    print("✅ 회귀 없음" if base else "ℹ️ 기준선 없음 — python bench.py --update")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,32 +8,142 @@ GitHub: https://github.com/bubblepangx/morning
   ④ 템플릿에 ①②③ 합쳐서 docs/index.html 출력
 """
 
-import anthropic
 import os
 import json
 import sys
 import re
-import requests
+import random
+import time
+import threading
+import copy
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
+from types import SimpleNamespace
+
+import assets
+
+# 무거운 SDK(anthropic, yfinance, pandas/timeseries, requests)는 해당 fetcher가
+# 실제로 실행될 때 함수 안에서 import 한다 — 렌더 전용 경로(sample_gen, 템플릿 작업)와
+# 모듈 import 자체는 부수효과 없이 수 ms 안에 끝나야 한다 (bench.py import.* 케이스)
 
 # ───────────────────────────────────────────
-# 시간 설정 (KST = UTC+9)
+# 시간 설정 (KST = UTC+9) — 실행마다 start_run_clock()으로 기준 시각을 잡는다
 # ───────────────────────────────────────────
 KST = timezone(timedelta(hours=9))
-now  = datetime.now(KST)
-
 WEEKDAY_KO  = ["월", "화", "수", "목", "금", "토", "일"]
-date_ko     = now.strftime("%Y년 %m월 %d일")
-weekday_ko  = WEEKDAY_KO[now.weekday()]
-datetime_ko = f"{date_ko} ({weekday_ko}) 오전 {now.strftime('%H시 %M분')} KST"
-file_date   = now.strftime("%Y%m%d")
 
-TODAY_STR = f"{date_ko} ({weekday_ko})"
+_CLOCK = None
+
+
+def start_run_clock(at=None):
+    """이번 실행의 기준 시각 고정 → now / date_ko / weekday_ko / datetime_ko / file_date / today_str"""
+    global _CLOCK
+    now = at or datetime.now(KST)
+    date_ko = now.strftime("%Y년 %m월 %d일")
+    weekday_ko = WEEKDAY_KO[now.weekday()]
+    _CLOCK = SimpleNamespace(
+        now=now, date_ko=date_ko, weekday_ko=weekday_ko,
+        datetime_ko=f"{date_ko} ({weekday_ko}) 오전 {now.strftime('%H시 %M분')} KST",
+        file_date=now.strftime("%Y%m%d"), today_str=f"{date_ko} ({weekday_ko})")
+    return _CLOCK
+
+
+def run_clock():
+    """현재 실행의 기준 시각 (start_run_clock 전이면 지금 시각으로 시작)"""
+    return _CLOCK or start_run_clock()
+
+
+# 예전 모듈 전역(now, TODAY_STR …) 호환 — 접근 시점의 실행 시계에서 읽는다
+_CLOCK_ATTRS = {"now": "now", "date_ko": "date_ko", "weekday_ko": "weekday_ko",
+                "datetime_ko": "datetime_ko", "file_date": "file_date", "TODAY_STR": "today_str"}
+
+
+def __getattr__(name):
+    if name in _CLOCK_ATTRS:
+        return getattr(run_clock(), _CLOCK_ATTRS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 FRED_API_KEY = os.environ.get("FRED_API_KEY", "")
 FRED_URL = "https://api.stlouisfed.org/fred/series/observations"
+CNN_FG_URL = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
+CNN_HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
+               "Accept": "application/json"}
+CRYPTO_FG_URL = "https://api.alternative.me/fng/"
 
 
+# ───────────────────────────────────────────
+# 실행 메트릭 — 단계별 span + 요청·바이트·토큰 카운터
+# ───────────────────────────────────────────
+# 실행마다 docs/run_report.jsonl (span 한 줄씩 + 마지막 요약 한 줄)을 쓰고
+# docs/run_history.jsonl 에 요약 한 줄을 덧붙인다 (워크플로 커밋으로 누적).
+
+from contextlib import contextmanager
+
+RUN_REPORT = Path("docs/run_report.jsonl")
+RUN_HISTORY = Path("docs/run_history.jsonl")
+
+
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.t0 = time.perf_counter()
+        self.started_at = datetime.now(KST).isoformat(timespec="seconds")
+        self.spans, self.counters, self.claude = [], {}, {}
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """with METRICS.span("fetch cnn") as a: a["bytes"] = ... — 소요 시간·성공 여부 기록"""
+        t = time.perf_counter()
+        rec = {"name": name}
+        try:
+            yield attrs
+            rec["ok"] = True
+        except BaseException as e:
+            rec["ok"], rec["error"] = False, f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            rec.update(start=round(t - self.t0, 4), dur=round(time.perf_counter() - t, 4),
+                       thread=threading.current_thread().name, **attrs)
+            with self.lock:
+                self.spans.append(rec)
+
+    def incr(self, key, n=1):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def summary(self, **extra):
+        top = {}
+        for sp in self.spans:
+            if sp["name"].startswith("stage "):
+                top[sp["name"][6:]] = sp["dur"]
+        return {"type": "run", "started_at": self.started_at,
+                "total_s": round(time.perf_counter() - self.t0, 3),
+                "stages": top, "counters": dict(sorted(self.counters.items())),
+                "claude": self.claude, **extra}
+
+    def write(self, report=RUN_REPORT, history=RUN_HISTORY, **extra):
+        summ = self.summary(**extra)
+        lines = [json.dumps({"type": "span", **sp}, ensure_ascii=False)
+                 for sp in sorted(self.spans, key=lambda sp: sp["start"])]
+        lines.append(json.dumps(summ, ensure_ascii=False))
+        assets.write_atomic(report, "\n".join(lines) + "\n")
+        if history is not None:          # 덧붙이기도 사본 + 교체 — 중단돼도 이전 줄은 온전
+            prev = history.read_bytes() if history.exists() else b""
+            assets.write_atomic(history, prev + (json.dumps(summ, ensure_ascii=False) + "\n").encode("utf-8"))
+        return summ
+
+
+METRICS = RunMetrics()
+
+
+def new_run_metrics():
+    """실행 경계 — 새 메트릭 수집기로 교체"""
+    global METRICS
+    METRICS = RunMetrics()
+    return METRICS
+
 # ═══════════════════════════════════════════
 # PART A — Claude API 브리핑 (setup.sh 기반)
 # ═══════════════════════════════════════════
@@ -73,17 +183,11 @@ SYSTEM_PROMPT = """당신은 Bloomberg·FT 25년 경력 선임 시장 기자 'Ma
 - 브리핑 본문 외의 메타 텍스트 출력 금지"""
 
 
-def build_prompt() -> str:
-    days = ["월", "화", "수", "목", "금", "토", "일"]
-    d = now.strftime('%Y년 %m월 %d일')
-    w = days[now.weekday()]
-    t = now.strftime('%H:%M')
+# 출력 형식 스캐폴드 — 날짜·시각이 없는 정적 텍스트라 프롬프트 캐시 대상.
+# 실행 시각은 build_prompt()가 뒤에 붙이는 헤더 한 줄로만 전달한다.
 
-    # 월요일은 주말 소식 브리핑 (미국 장 휴장)
-    if now.weekday() == 0:
-        return f"""오늘: {d} ({w}) {t} KST — 월요일 주말 브리핑
-
-미국 주식시장은 주말 동안 휴장이었습니다.
+# 월요일은 주말 소식 브리핑 (미국 장 휴장)
+WEEKEND_SCAFFOLD = """미국 주식시장은 주말 동안 휴장이었습니다.
 웹 검색으로 주말(토·일) 동안 나온 최신 뉴스를 수집한 후 아래 구조로 한국어 브리핑을 작성하세요.
 
 반드시 검색:
@@ -99,7 +203,7 @@ def build_prompt() -> str:
 
 출력 형식:
 
-# 🗓 주말 브리핑 — {d} ({w})
+# 🗓 주말 브리핑 — YYYY년 MM월 DD일 (요일)
 
 ## 📌 이번 주 핵심 이슈
 
@@ -148,9 +252,7 @@ def build_prompt() -> str:
 *본 브리핑은 정보 제공 목적이며 투자 권유가 아닙니다.*
 ---"""
 
-    return f"""오늘: {d} ({w}) {t} KST
-
-웹 검색으로 최신 데이터를 수집한 후 아래 구조로 한국어 브리핑을 작성하세요.
+REGULAR_SCAFFOLD = """웹 검색으로 최신 데이터를 수집한 후 아래 구조로 한국어 브리핑을 작성하세요.
 
 반드시 검색:
 - 미국 3대 지수 종가 (Dow, S&P500, Nasdaq, 러셀2000)
@@ -179,7 +281,7 @@ def build_prompt() -> str:
 | 다우존스 (DJIA) | | | |
 | 러셀 2000 | | | |
 
-**선물 현황 ({t} KST):** S&P500 선물 ___ / Nasdaq100 선물 ___
+**선물 현황 (HH:MM KST):** S&P500 선물 ___ / Nasdaq100 선물 ___
 
 [표 아래부터 전부 서술형 문단으로 작성]
 
@@ -286,46 +388,394 @@ def build_prompt() -> str:
 ---"""
 
 
-def generate() -> str:
-    """Claude API + web_search 자동 반복 → 브리핑 마크다운 반환"""
+def prompt_parts():
+    """(모드, 정적 스캐폴드, 실행 시각 헤더) — 모드: weekend(월요일) / regular"""
+    now = run_clock().now
+    d = now.strftime('%Y년 %m월 %d일')
+    w = WEEKDAY_KO[now.weekday()]
+    t = now.strftime('%H:%M')
+    fill = "형식의 YYYY년 MM월 DD일 (요일)·HH:MM 자리는 위 날짜·시각으로 채우세요."
+    if now.weekday() == 0:
+        return "weekend", WEEKEND_SCAFFOLD, f"오늘: {d} ({w}) {t} KST — 월요일 주말 브리핑\n{fill}"
+    return "regular", REGULAR_SCAFFOLD, f"오늘: {d} ({w}) {t} KST\n{fill}"
+
+
+def build_prompt() -> str:
+    _, scaffold, header = prompt_parts()
+    return f"{scaffold}\n\n{header}"
+
+
+BRIEFING_MODEL = "claude-sonnet-4-6"
+# 스트리밍 모드 (기본) — 검색어·섹션을 도착하는 대로 표시하고, 완성된 섹션은 바로 HTML 변환.
+# BRIEFING_DEADLINE 초가 지나면 스트림을 끊고 완성된 섹션만으로 브리핑을 만든다
+# (briefing 단계 데드라인 900s보다 짧아야 부분 결과가 살아남는다)
+BRIEFING_STREAM = os.environ.get("BRIEFING_STREAM", "1") != "0"
+BRIEFING_DEADLINE = float(os.environ.get("BRIEFING_DEADLINE", "780"))
+CLAUDE_MAX_RETRIES = int(os.environ.get("CLAUDE_MAX_RETRIES", "4"))
+
+
+def briefing_request() -> dict:
+    """messages.create / messages.stream 공용 요청 인자
+
+    프롬프트 캐시: tools → system → 스캐폴드까지가 실행마다 같은 접두부라
+    cache_control 지점을 system과 스캐폴드 끝에 둔다. 실행 시각 헤더만 캐시 밖."""
+    _, scaffold, header = prompt_parts()
+    return dict(
+        model=BRIEFING_MODEL,
+        max_tokens=8000,
+        system=[{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+        tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 15}],
+        messages=[{"role": "user", "content": [
+            {"type": "text", "text": scaffold, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": header},
+        ]}],
+    )
+
+
+# ───────────────────────────────────────────
+# 지역 분할 모드 — 지역 섹션별 요청을 동시에 보내고 고정 순서로 병합
+# ───────────────────────────────────────────
+# BRIEFING_SPLIT=1 이면 스캐폴드를 아래 제목 줄 기준으로 잘라 지역마다 따로 요청한다.
+# 생성 시간은 가장 느린 지역 하나로 줄고, 한 지역이 실패해도 그 섹션만 안내 문단으로 대체.
+
+BRIEFING_SPLIT = os.environ.get("BRIEFING_SPLIT", "").lower() not in ("", "0", "false")
+BRIEFING_REGIONS = [
+    # (이름, 섹션 제목 접두 (평일·주말), web_search 예산, max_tokens)
+    ("us",       ("# 🇺🇸", "# 🗓"), 8, 6000),
+    ("kr",       ("# 🇰🇷",),        3, 2000),
+    ("cn",       ("# 🇨🇳",),        3, 2000),
+    ("jp",       ("# 🇯🇵",),        3, 2000),
+    ("calendar", ("## 📅",),        2, 1500),
+]
+
+
+def region_formats(scaffold):
+    """스캐폴드 → {지역: 해당 섹션 출력 형식} — 제목 줄부터 다음 지역 제목 직전까지"""
+    lines = scaffold.splitlines(keepends=True)
+    starts = []
+    for name, prefixes, _, _ in BRIEFING_REGIONS:
+        i = next((i for i, l in enumerate(lines) if l.startswith(prefixes)), None)
+        if i is None:
+            raise ValueError(f"scaffold has no {name} section ({prefixes})")
+        starts.append((i, name))
+    ends = [i for i, _ in starts[1:]] + [len(lines)]
+    return {name: "".join(lines[i:j]).strip() for (i, name), j in zip(starts, ends)}
+
+
+def region_request(name) -> dict:
+    """지역 하나의 요청 — 전체 스캐폴드(맥락·캐시 공유) + 이 섹션만 쓰라는 지시 + 헤더"""
+    _, _, budget, max_tokens = next(r for r in BRIEFING_REGIONS if r[0] == name)
+    fmt = region_formats(prompt_parts()[1])[name]
+    req = briefing_request()
+    req["max_tokens"] = max_tokens
+    req["tools"] = [{"type": "web_search_20250305", "name": "web_search", "max_uses": budget}]
+    req["messages"][0]["content"].insert(1, {"type": "text", "text": (
+        "이번 요청은 위 형식 중 아래 섹션만 작성합니다. 나머지 섹션은 별도 요청이 작성합니다.\n\n"
+        f"{fmt}\n\n"
+        f"응답은 '{fmt.splitlines()[0]}' 제목 줄로 시작하고 이 섹션 내용만 출력하세요. "
+        f"웹 검색은 이 섹션에 필요한 항목만 최대 {budget}회.")})
+    return req
+
+
+# ───────────────────────────────────────────
+# 브리핑 캐시 — 같은 날 재실행은 Claude를 다시 부르지 않는다
+# ───────────────────────────────────────────
+# {CACHE_DIR}/briefing/{YYYYMMDD}-{mode}-{요청 해시}.md — 완성된 브리핑만 저장.
+# 요청 해시는 실행 시각 헤더를 뺀 요청 전체(모델·시스템·스캐폴드·도구)라 프롬프트를
+# 고치면 자동으로 새로 생성된다. --refresh-briefing / BRIEFING_REFRESH=1 로 강제 갱신.
+
+BRIEFING_REFRESH = os.environ.get("BRIEFING_REFRESH", "").lower() not in ("", "0", "false")
+
+
+def briefing_cache_key():
+    mode = prompt_parts()[0] + ("-split" if BRIEFING_SPLIT else "")
+    req = briefing_request()
+    req["messages"][0]["content"] = req["messages"][0]["content"][:-1]   # 실행 시각 헤더 제외
+    if BRIEFING_SPLIT:
+        req["regions"] = BRIEFING_REGIONS
+    h = hashlib.sha256(json.dumps(req, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return f"{run_clock().file_date}-{mode}-{h.hexdigest()[:12]}"
+
+
+def _briefing_cache_path():
+    return Path(CACHE_DIR) / "briefing" / f"{briefing_cache_key()}.md" if CACHE_DIR else None
+
+
+def load_cached_briefing():
+    """오늘 같은 요청으로 만든 브리핑 마크다운 (없거나 강제 갱신이면 None)"""
+    path = _briefing_cache_path()
+    if BRIEFING_REFRESH or path is None:
+        return None
+    raw = _cache_read(path)
+    return raw.decode("utf-8") if raw else None
+
+
+def store_briefing(md_text):
+    """완성 브리핑 저장 + 지난 날짜 항목 정리"""
+    path = _briefing_cache_path()
+    if path is None or not md_text:
+        return
+    assets.write_atomic(path, md_text.encode("utf-8"))
+    lkg_save("briefing", md_text)
+    for old in path.parent.glob("*.md"):
+        if not old.name.startswith(run_clock().file_date):
+            old.unlink(missing_ok=True)
+
+
+_SECTION_RE = re.compile(r"^#{1,2} ", re.M)
+
+
+class BriefingSections:
+    """스트리밍 마크다운 누적기 — '# ' / '## ' 제목 경계로 완성된 섹션을 즉시 HTML 변환
+
+    다음 제목이 시작돼야 앞 섹션이 완성된 것으로 본다.
+    첫 first 제목('# ') 이전 텍스트(작업 과정 설명 등 프리앰블)는 버린다."""
+
+    def __init__(self, first="# "):
+        self.buf, self.md, self.html = "", [], []
+        self.started = False
+        self.stale = False             # 마지막 정상 브리핑으로 대체한 경우
+        self.first = re.compile(r"(?:^|\n)" + re.escape(first))
+
+    def feed(self, text):
+        """text 조각 추가 → 이번에 완성된 섹션 마크다운 목록"""
+        self.buf += text
+        if not self.started:
+            m = self.first.search(self.buf)
+            if not m:
+                return []
+            self.buf = self.buf[m.start() + (self.buf[m.start()] == "\n"):]
+            self.started = True
+        done = []
+        while True:
+            m = _SECTION_RE.search(self.buf, 1)
+            if not m:
+                return done
+            done.append(self._emit(self.buf[:m.start()]))
+            self.buf = self.buf[m.start():]
+
+    def close(self, complete=True):
+        """스트림 종료 — complete=False(중단)면 미완성 꼬리 섹션은 버림"""
+        if complete and self.buf.strip():
+            self._emit(self.buf)
+        self.buf = ""
+
+    def note(self, md_text):
+        """완성 섹션 뒤에 안내 문단 추가"""
+        self._emit(md_text)
+
+    def extend(self, other):
+        """다른 브리핑의 완성 섹션을 뒤에 이어 붙임 (이미 변환된 HTML 재사용)"""
+        if other.md:
+            self.md += other.md[:-1] + [other.md[-1].rstrip("\n") + "\n\n"]
+            self.html += other.html
+
+    def _emit(self, md_text):
+        self.md.append(md_text)
+        self.html.append(briefing_to_html(md_text))
+        return md_text
+
+    @property
+    def markdown(self):
+        return "".join(self.md).strip()
+
+    def to_html(self):
+        return "\n".join(self.html)
+
+
+def generate_briefing() -> BriefingSections:
+    """Claude API + web_search → 섹션 단위 브리핑 (마크다운 + HTML)"""
+    cached = load_cached_briefing()
+    if cached:
+        print(f"  ♻️ 오늘 브리핑 캐시 사용 ({briefing_cache_key()}) — 새로 만들려면 --refresh-briefing")
+        doc = BriefingSections()
+        doc.feed(cached)
+        doc.close()
+        METRICS.incr("briefing.cache_hit")
+        METRICS.claude.update(cached=True, chars=len(doc.markdown))
+        return doc
+
     api_key = os.environ.get("ANTHROPIC_API_KEY", "").strip()
-    if not api_key:
+    if not api_key and not replaying():
         raise EnvironmentError(
             "ANTHROPIC_API_KEY 환경변수가 없습니다.\n"
             "GitHub Actions: Settings → Secrets → ANTHROPIC_API_KEY 등록 필요"
         )
 
-    client = anthropic.Anthropic(api_key=api_key)
-    print(f"  🤖 Claude API 호출 ({now.strftime('%H:%M:%S')} KST)")
+    print(f"  🤖 Claude API 호출 ({run_clock().now.strftime('%H:%M:%S')} KST)"
+          f"{' — 스트리밍' if BRIEFING_STREAM else ''}{' — 지역 분할' if BRIEFING_SPLIT else ''}")
     print("  🔍 웹 검색 자동 수행 중:")
 
-    response = client.messages.create(
-        model="claude-sonnet-4-6",
-        max_tokens=8000,
-        system=SYSTEM_PROMPT,
-        tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 15}],
-        messages=[{"role": "user", "content": build_prompt()}],
-    )
+    def client():
+        import anthropic
+        # SDK 재시도 — 429·5xx·연결 오류를 지터 백오프로, retry-after 헤더 존중
+        return anthropic.Anthropic(api_key=api_key, max_retries=CLAUDE_MAX_RETRIES)
 
-    # 모든 text 블록 누적 (web_search는 서버사이드 — 단일 응답에 여러 text 블록)
-    full_text = ""
-    search_count = 0
-    for block in response.content:
-        if block.type == "tool_use":
-            search_count += 1
-            print(f"     [{search_count:02d}] {block.input.get('query', '')}")
-        elif block.type == "text" and block.text.strip():
-            full_text += block.text
+    deadline = time.monotonic() + min(BRIEFING_DEADLINE, budget_left())
+    if BRIEFING_SPLIT:
+        doc, searches, usage, complete = generate_regions(client, deadline)
+    else:
+        doc = BriefingSections()
+        searches, response, complete = run_briefing_request(briefing_request(), doc, client, deadline)
+        usage = claude_usage(response) if response is not None else {}
+
+    print(f"  ✅ 브리핑 완료 (검색 {searches}회, {len(doc.markdown)}자)")
+    if complete:
+        store_briefing(doc.markdown)
+    METRICS.claude.update(usage, search_count=searches, chars=len(doc.markdown))
+    return doc
+
+
+def run_briefing_request(req, doc, client, deadline, tag="", tap_key=None):
+    """요청 하나 → doc에 섹션 누적. (검색 수, 최종 응답 or None, 완성 여부)
+
+    스트리밍 중 deadline을 넘기면 미완성 꼬리 섹션을 버리고 안내 문단을 붙인다
+    (완성된 섹션이 하나도 없으면 TimeoutError)."""
+    pre = f"[{tag}] " if tag else ""
+    searches, response = 0, None
+    if not BRIEFING_STREAM:
+        with METRICS.span("claude messages.create"):
+            response = tap_claude(lambda: client().messages.create(**req), key=tap_key)
+        # 모든 text 블록 누적 (web_search는 서버사이드 — 단일 응답에 여러 text 블록)
+        for block in response.content:
+            if block.type in ("tool_use", "server_tool_use"):
+                searches += 1
+                print(f"     {pre}[{searches:02d}] {block.input.get('query', '')}")
+            elif block.type == "text" and block.text.strip():
+                doc.feed(block.text)
+        doc.close()
+        return searches, response, True
+    try:
+        with METRICS.span("claude messages.stream") as a:
+            t = time.perf_counter()
+            for kind, v in claude_events(lambda: client().messages.stream(**req), deadline,
+                                         tap_key=tap_key):
+                if kind == "search":
+                    searches += 1
+                    print(f"     {pre}[{searches:02d}] {v}")
+                elif kind == "text":
+                    a.setdefault("ttft", round(time.perf_counter() - t, 3))
+                    for sec in doc.feed(v):
+                        print(f"     {pre}📄 {sec.splitlines()[0][:60]}")
+                else:
+                    response = v
+        doc.close()
+        return searches, response, True
+    except TimeoutError:
+        doc.close(complete=False)
+        METRICS.incr("claude.deadline_exceeded")
+        if not doc.md:
+            raise
+        print(f"  ⏱ {pre}브리핑 {BRIEFING_DEADLINE:.0f}s 초과 — 완성된 섹션 {len(doc.md)}개만 사용")
+        doc.note(f"\n> ⏱ 생성 시간 초과로 완성된 섹션 {len(doc.md)}개만 표시합니다.\n")
+        return searches, response, False
+
+
+def generate_regions(client, deadline):
+    """지역 섹션 동시 생성 → BRIEFING_REGIONS 순서로 병합 (doc, 검색 수, usage 합계, 완성 여부)
+
+    실패한 지역은 제목 + 안내 문단으로 대체하고, 전 지역이 실패해야 예외를 올린다."""
+    fmts = region_formats(prompt_parts()[1])
+
+    def one(name):
+        first = fmts[name].split(" ", 1)[0] + " "         # '# ' 또는 '## '
+        doc = BriefingSections(first=first)
+        with METRICS.span(f"claude region {name}"):
+            return (doc,) + run_briefing_request(region_request(name), doc, client, deadline,
+                                                 tag=name, tap_key=name)
+
+    names = [r[0] for r in BRIEFING_REGIONS]
+    with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="region") as pool:
+        futs = [pool.submit(one, n) for n in names]
+
+    merged, searches, usage, complete, failed = BriefingSections(), 0, {}, True, []
+    for name, fut in zip(names, futs):
+        try:
+            doc, n, response, ok = fut.result()
+        except Exception as e:
+            print(f"  ⚠️ [{name}] 섹션 생성 실패: {e}")
+            METRICS.incr("claude.region_failed")
+            failed.append(name)
+            complete = False
+            title = fmts[name].splitlines()[0].replace("YYYY년 MM월 DD일 (요일)", run_clock().today_str)
+            merged.note(f"{title}\n\n> ⚠️ 이 섹션은 생성하지 못했습니다 ({type(e).__name__}).\n\n")
+            continue
+        merged.extend(doc)
+        searches += n
+        complete = complete and ok
+        for k, v in (claude_usage(response) if response is not None else {}).items():
+            usage[k] = usage.get(k, 0) + v
+    if len(failed) == len(names):
+        raise RuntimeError(f"모든 지역 섹션 생성 실패 ({', '.join(failed)})")
+    usage["regions_failed"] = failed
+    return merged, searches, usage, complete
 
-    # 안전망: # 제목 이전 프리앰블 제거
-    idx = full_text.find('\n# ')
-    if idx == -1:
-        idx = full_text.find('# ')
-    if idx > 0:
-        full_text = full_text[idx:].lstrip()
 
-    print(f"  ✅ 브리핑 완료 (검색 {search_count}회, {len(full_text)}자)")
-    return full_text
+def generate() -> str:
+    """Claude API + web_search 자동 반복 → 브리핑 마크다운 반환"""
+    return generate_briefing().markdown
+
+
+def claude_events(open_stream, deadline=None, tap_key=None):
+    """messages.stream → ("search", 질의) / ("text", 조각) 이벤트, 마지막에 ("message", 최종 응답)
+
+    deadline(monotonic)이 지나면 스트림을 닫고 TimeoutError — 응답이 멈춰 있어도
+    watchdog 타이머가 연결을 끊는다. 재생 모드에선 녹화된 블록을 같은 이벤트로 흘린다."""
+    if replaying():
+        msg = tap_claude(None, key=tap_key)
+        for b in msg.content:
+            if b.type in ("tool_use", "server_tool_use"):
+                yield "search", b.input.get("query", "")
+            elif b.type == "text":
+                yield "text", b.text
+        yield "message", msg
+        return
+
+    with open_stream() as stream:
+        timer = None
+        if deadline is not None:
+            timer = threading.Timer(max(0.0, deadline - time.monotonic()), stream.close)
+            timer.daemon = True
+            timer.start()
+        try:
+            for ev in stream:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError("briefing stream deadline")
+                if ev.type == "text":
+                    yield "text", ev.text
+                elif ev.type == "content_block_stop" and \
+                        ev.content_block.type in ("tool_use", "server_tool_use"):
+                    yield "search", (ev.content_block.input or {}).get("query", "")
+            final = stream.get_final_message()
+        except TimeoutError:
+            raise
+        except Exception as e:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("briefing stream deadline") from e
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+    yield "message", tap_claude(lambda: final, key=tap_key)
+
+
+def claude_usage(response):
+    """응답 usage → 토큰·web_search 사용량 dict (필드가 없으면 생략)"""
+    u = getattr(response, "usage", None)
+    if u is None:
+        return {}
+    out = {}
+    for k in ("input_tokens", "output_tokens",
+              "cache_creation_input_tokens", "cache_read_input_tokens"):
+        v = getattr(u, k, None)
+        if v is not None:
+            out[k] = v
+    stu = getattr(u, "server_tool_use", None)
+    if isinstance(stu, dict):
+        stu = SimpleNamespace(**stu)
+    if stu is not None and getattr(stu, "web_search_requests", None) is not None:
+        out["web_search_requests"] = stu.web_search_requests
+    return out
 
 
 def briefing_to_html(md_text: str) -> str:
@@ -342,7 +792,521 @@ def briefing_to_html(md_text: str) -> str:
 # PART B — 대시보드 데이터 (yfinance + FRED)
 # ═══════════════════════════════════════════
 
-import yfinance as yf
+# yf.download는 내부 전역 상태(shared._DFS)를 공유 → 스레드 동시 호출 시 결과가 섞임
+_YF_LOCK = threading.Lock()
+
+# ───────────────────────────────────────────
+# 디스크 캐시 — 소스별 TTL + 조건부 재검증 + 실패 시 stale 응답
+# ───────────────────────────────────────────
+# CACHE_DIR 환경변수로 위치 지정 (빈 값이면 비활성). 재실행·로컬 반복 시
+# TTL 안의 데이터는 네트워크 없이 읽고, 만료되면 ETag/Last-Modified로
+# 재검증해 바뀐 데이터만 받는다. 갱신이 실패하면 CACHE_MAX_STALE 이내의
+# 이전 응답으로 대체한다.
+
+import hashlib
+import pickle
+
+CACHE_DIR = os.environ.get("CACHE_DIR", ".cache")
+CACHE_MAX_STALE = 7 * 24 * 3600
+CACHE_TTL = {                 # 초
+    "cnn": 10 * 60,           # CNN graphdata — 장중 수시 갱신
+    "crypto_fg": 30 * 60,     # alternative.me — 일 1회 갱신, 여유 있게
+    "yf_ohlc": 5 * 60,        # yfinance 일봉 증분 다운로드 (OHLC 저장소)
+}
+_CACHE_SKIP_PARAMS = {"api_key"}   # 키는 캐시 키·파일에 남기지 않음
+
+
+def _cache_path(source, key, ext):
+    if not CACHE_DIR:
+        return None
+    h = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:20]
+    return Path(CACHE_DIR) / source / f"{h}.{ext}"
+
+
+def _cache_read(path):
+    try:
+        return path.read_bytes() if path is not None else None
+    except OSError:
+        return None
+
+
+def cached_http_json(source, url, params=None, headers=None, timeout=10):
+    """TTL 디스크 캐시를 거치는 GET → JSON"""
+    safe = {k: v for k, v in (params or {}).items() if k not in _CACHE_SKIP_PARAMS}
+    path = _cache_path(source, (url, sorted(safe.items())), "json")
+    entry = None
+    raw = _cache_read(path)
+    if raw:
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            entry = None
+    age = time.time() - entry["fetched_at"] if entry else None
+    if entry and age < CACHE_TTL.get(source, 0):
+        METRICS.incr("cache.hit")
+        return entry["body"]
+
+    hdrs = dict(headers or {})
+    if entry and entry.get("etag"):
+        hdrs["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        hdrs["If-Modified-Since"] = entry["last_modified"]
+    try:
+        r = http_get(url, params=params, headers=hdrs, timeout=timeout)
+        if r.status_code == 304 and entry:
+            METRICS.incr("cache.revalidated")
+            body = entry["body"]
+        else:
+            r.raise_for_status()
+            body = r.json()
+            entry = {"url": url, "params": safe, "body": body,
+                     "etag": r.headers.get("ETag"),
+                     "last_modified": r.headers.get("Last-Modified")}
+    except Exception as e:
+        if entry and age < CACHE_MAX_STALE:
+            print(f"  ♻️ {source} 갱신 실패 — {age/60:.0f}분 전 캐시 사용 ({e})")
+            METRICS.incr("cache.stale")
+            mark_stale(source, entry["fetched_at"])
+            return entry["body"]
+        raise
+    clear_stale(source)
+    if path is not None:
+        entry["fetched_at"] = time.time()
+        assets.write_atomic(path, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+    return body
+
+
+def cached_call(source, key, fn, ok=bool):
+    """임의 fetch 결과(pickle) 디스크 캐시 — yfinance DataFrame 등. ok(결과)가 거짓이면 실패로 간주"""
+    if _TAP is not None:
+        return _TAP.through("calls", repr((source, key)), fn)
+    path = _cache_path(source, key, "pkl")
+    entry = None
+    raw = _cache_read(path)
+    if raw:
+        try:
+            entry = pickle.loads(raw)
+        except Exception:
+            entry = None
+    age = time.time() - entry["fetched_at"] if entry else None
+    if entry and age < CACHE_TTL.get(source, 0):
+        METRICS.incr("cache.hit")
+        return entry["value"]
+    try:
+        with METRICS.span(f"call {source}"):
+            value = fn()
+        METRICS.incr(f"calls.{source}")
+        if not ok(value):
+            raise ValueError("empty result")
+    except Exception as e:
+        if entry and age < CACHE_MAX_STALE:
+            print(f"  ♻️ {source} 갱신 실패 — {age/60:.0f}분 전 캐시 사용 ({e})")
+            METRICS.incr("cache.stale")
+            mark_stale(source, entry["fetched_at"])
+            return entry["value"]
+        raise
+    clear_stale(source)
+    if path is not None:
+        assets.write_atomic(path, pickle.dumps({"fetched_at": time.time(), "value": value}))
+    return value
+
+
+# ───────────────────────────────────────────
+# 마지막 정상값 (last-known-good) + 지연 데이터 표시
+# ───────────────────────────────────────────
+# {CACHE_DIR}/lkg/{소스}.pkl = {"saved_at", "value"} — 단계·부분 결과의 마지막 성공값.
+# 재시도 끝에도 실패한 소스는 이 값(또는 디스크 캐시·저장소의 지난 값)을 쓰고 _STALE에
+# 기록되어 대시보드 상단 알림(stale_notice 슬롯)으로 나간다. 같은 소스가 다시 성공하면 지운다.
+
+STALE_LABELS = {   # 소스(또는 접두) → 알림 문구
+    "briefing": "브리핑", "yf_ohlc": "시세·MOVE", "market": "시세 카드",
+    "fear_greed": "공포탐욕", "cnn": "CNN 공포탐욕·Put/Call", "crypto_fg": "크립토 공포탐욕",
+    "move_pcc": "MOVE·Put/Call", "fred": "FRED 지표",
+}
+_STALE = {}                 # 소스 → 데이터 기준 시각(epoch)
+_STALE_LOCK = threading.Lock()
+_STALE_LOCAL = threading.local()   # 단계 스레드에서 쓴 지난 값 기준 시각 (marks)
+
+
+def lkg_save(source, value, saved_at=None):
+    """saved_at: 값의 기준 시각 — 지난 값이 섞인 결과면 가장 오래된 시각 (기본 지금)"""
+    path = _cache_path("lkg", source, "pkl")
+    if path is not None:
+        assets.write_atomic(path, pickle.dumps({"saved_at": saved_at or time.time(), "value": value}))
+    if saved_at is None:
+        clear_stale(source)
+
+
+def lkg_load(source):
+    """(값, 저장 시각) — 없으면 (None, None)"""
+    raw = _cache_read(_cache_path("lkg", source, "pkl"))
+    try:
+        entry = pickle.loads(raw) if raw else None
+    except Exception:
+        entry = None
+    return (entry["value"], entry["saved_at"]) if entry else (None, None)
+
+
+def day_ts(day):
+    """'YYYY-MM-DD' → 그날 0시(KST) epoch — 저장소 마지막 봉·갱신일을 기준 시각으로 쓸 때"""
+    return datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=KST).timestamp()
+
+
+def mark_stale(source, as_of):
+    METRICS.incr("stale.sources")
+    with _STALE_LOCK:
+        _STALE[source] = min(as_of, _STALE.get(source, as_of))
+    marks = getattr(_STALE_LOCAL, "marks", None)
+    if marks is not None:
+        marks.append(as_of)
+
+
+def clear_stale(source):
+    with _STALE_LOCK:
+        _STALE.pop(source, None)
+
+
+def stale_sources():
+    """{알림 문구: 가장 오래된 기준 시각}"""
+    out = {}
+    with _STALE_LOCK:
+        for src, ts in _STALE.items():
+            label = STALE_LABELS.get(src) or STALE_LABELS.get(src.split("_")[0], src)
+            out[label] = min(ts, out.get(label, ts))
+    return out
+
+
+def restore_parts(source, result, keys, label):
+    """실패한 부분(keys)을 source 단계의 마지막 정상값으로 채움 → 채웠는지"""
+    prev, saved_at = lkg_load(source)
+    if not isinstance(prev, dict):
+        return False
+    for k in keys:
+        if k in prev:
+            result[k] = prev[k]
+    mark_stale(label, saved_at)
+    return True
+
+
+# ───────────────────────────────────────────
+# 녹화 / 재생 — 외부 소스 원응답을 번들 파일로 캡처·재공급
+# ───────────────────────────────────────────
+# --record PATH : 실행 중 받은 HTTP JSON / yfinance 결과 / Claude 응답 블록을 저장
+# --replay PATH : 같은 번들에서 읽어 main() 전체를 오프라인으로 실행
+# 재생 중에는 디스크 캐시·FRED 저장소를 끄므로 요청 키가 녹화 때와 같아진다.
+
+import gzip
+
+_TAP_SKIP_PARAMS = {"api_key", "realtime_start"}   # 날짜·키에 따라 바뀌는 파라미터
+
+
+class SourceTap:
+    """녹화/재생 번들 — {"meta", "http", "calls", "claude", "claude_parts"}"""
+
+    def __init__(self, mode, path):
+        self.mode, self.path = mode, Path(path)
+        self.lock = threading.Lock()
+        if mode == "replay":
+            with gzip.open(self.path, "rb") as f:
+                self.bundle = pickle.load(f)
+        else:
+            self.bundle = {"meta": {"recorded_at": datetime.now(KST).isoformat()},
+                           "http": {}, "calls": {}, "claude": None, "claude_parts": {}}
+
+    def through(self, kind, key, fetch):
+        """kind 저장소의 key 응답 — 재생이면 번들에서, 녹화면 fetch 후 보관"""
+        METRICS.incr(f"tap.{self.mode}")
+        if self.mode == "replay":
+            try:
+                return self.bundle[kind][key]
+            except KeyError:
+                raise LookupError(f"replay bundle has no {kind} entry for {key}") from None
+        value = fetch()
+        with self.lock:
+            self.bundle[kind][key] = value
+        return value
+
+    def save(self):
+        if self.mode != "record":
+            return
+        assets.write_atomic(self.path, gzip.compress(
+            pickle.dumps(self.bundle, protocol=pickle.HIGHEST_PROTOCOL), 6))
+        n = len(self.bundle["http"]) + len(self.bundle["calls"]) + bool(self.bundle["claude"]) \
+            + len(self.bundle.get("claude_parts", {}))
+        print(f"  📼 녹화 번들 저장 {self.path} ({n}개 응답)")
+
+
+_TAP = None
+
+
+def set_tap(mode=None, path=None):
+    """녹화/재생 모드 전환 (mode=None이면 실시간). 재생·녹화 중엔 디스크 캐시 비활성"""
+    global _TAP, CACHE_DIR
+    _TAP = SourceTap(mode, path) if mode else None
+    if mode:
+        CACHE_DIR = ""
+    return _TAP
+
+
+def replaying():
+    return _TAP is not None and _TAP.mode == "replay"
+
+
+def _tap_key(url, params):
+    return repr((url, sorted((k, v) for k, v in (params or {}).items()
+                             if k not in _TAP_SKIP_PARAMS)))
+
+
+def tap_claude(create, key=None):
+    """messages.create 응답 — 녹화 시 content 블록·usage를 dict로 저장, 재생 시 대체 객체
+
+    key가 있으면(지역 분할 모드) bundle["claude_parts"][key]에 따로 보관한다."""
+    if _TAP is None:
+        return create()
+    if _TAP.mode == "replay":
+        rec = _TAP.bundle.get("claude") if key is None else \
+            _TAP.bundle.get("claude_parts", {}).get(key)
+        if rec is None:
+            raise LookupError(f"replay bundle has no Claude response{f' for {key}' if key else ''}")
+        return SimpleNamespace(content=[SimpleNamespace(**b) for b in rec["content"]],
+                               usage=SimpleNamespace(**rec.get("usage") or {}))
+    resp = create()
+    rec = {"content": [b.model_dump() for b in resp.content],
+           "usage": resp.usage.model_dump() if getattr(resp, "usage", None) else {}}
+    with _TAP.lock:
+        if key is None:
+            _TAP.bundle["claude"] = rec
+        else:
+            _TAP.bundle.setdefault("claude_parts", {})[key] = rec
+    return resp
+
+
+# ───────────────────────────────────────────
+# HTTP — 실행 단위 공유 세션 + 요청 중복 제거
+# ───────────────────────────────────────────
+# 같은 (URL, params)는 한 실행에서 한 번만 받아 JSON 디코딩하고 모든 소비자가
+# 결과를 공유한다. 동시에 들어온 요청은 먼저 시작한 요청의 Future를 기다린다.
+# 공유 객체이므로 반환값을 변경하지 말 것.
+
+from concurrent.futures import Future
+
+_HTTP_LOCK = threading.Lock()
+_HTTP_SESSION = None
+_HTTP_MEMO = {}
+
+
+def http_session():
+    """keep-alive 커넥션 풀을 가진 실행 공유 세션"""
+    global _HTTP_SESSION
+    with _HTTP_LOCK:
+        if _HTTP_SESSION is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _HTTP_SESSION = s
+        return _HTTP_SESSION
+
+
+def new_http_run():
+    """실행 경계 — 메모를 비워 다음 실행은 새로 받는다 (세션 풀은 유지)"""
+    with _HTTP_LOCK:
+        _HTTP_MEMO.clear()
+
+
+def _http_key(url, params):
+    return (url, tuple(sorted((params or {}).items())))
+
+
+def http_json(url, params=None, headers=None, timeout=10, source=None):
+    """GET → JSON (실행 내 메모 + in-flight 공유, 성공한 응답만 메모). 200 외 응답은 HTTPError
+
+    source를 주면 CACHE_TTL[source] 기준 디스크 캐시를 거친다."""
+    key = _http_key(url, params)
+    with _HTTP_LOCK:
+        fut = _HTTP_MEMO.get(key)
+        owner = fut is None
+        if owner:
+            fut = _HTTP_MEMO[key] = Future()
+    if owner:
+        try:
+            if _TAP is not None:
+                fut.set_result(_TAP.through("http", _tap_key(url, params),
+                                            lambda: _http_get_json(url, params, headers, timeout)))
+            elif source:
+                fut.set_result(cached_http_json(source, url, params, headers, timeout))
+            else:
+                fut.set_result(_http_get_json(url, params, headers, timeout))
+        except Exception as e:
+            with _HTTP_LOCK:             # 실패는 메모하지 않음 — 기다리던 호출만 같은 예외, 다음 호출은 재요청
+                if _HTTP_MEMO.get(key) is fut:
+                    del _HTTP_MEMO[key]
+            fut.set_exception(e)
+    return fut.result()
+
+
+def http_get(url, params=None, headers=None, timeout=10):
+    """공유 세션 GET + 메트릭 (요청 수·전송 바이트·호스트별 건수)
+
+    timeout은 남은 실행 예산으로 자르고, 연결 오류·429·5xx는 지터 백오프로 재시도
+    (Retry-After 존중). HTTP_HEDGE 호스트는 느리면 같은 요청을 하나 더 보낸다.
+    재시도 끝에도 429·5xx면 그 응답을 그대로 돌려준다 (raise_for_status는 호출 쪽)."""
+    host = url.split("/")[2]
+
+    def send():
+        t = budget_timeout(timeout)
+        with METRICS.span(f"http {host}", path=url.split(host, 1)[1]) as a:
+            r = http_session().get(url, params=params, headers=headers, timeout=t)
+            a.update(status=r.status_code, bytes=len(r.content))
+        METRICS.incr("http.requests")
+        METRICS.incr(f"http.host.{host}")
+        METRICS.incr("http.bytes", len(r.content))
+        return r
+
+    def attempt():
+        r = hedged(send, HTTP_HEDGE[host]) if host in HTTP_HEDGE else send()
+        if r.status_code in RETRY_STATUS:
+            raise Retryable(f"HTTP {r.status_code}", retry_after(r.headers.get("Retry-After")), r)
+        return r
+
+    import requests
+    return retry_call(attempt, "http", retry_on=(requests.ConnectionError, requests.Timeout))
+
+
+# ───────────────────────────────────────────
+# 실행 예산 · 재시도 · 헤지 요청
+# ───────────────────────────────────────────
+# RUN_BUDGET: 모든 소스가 나눠 쓰는 실행 전체 마감(초). HTTP timeout·재시도 대기·단계
+# 데드라인·브리핑 데드라인을 모두 남은 예산으로 자른다 (렌더·기록 몫 BUDGET_RESERVE는 남김).
+# 재시도는 full jitter 지수 백오프, 서버가 Retry-After를 주면 그 값을 따른다.
+# 헤지: 첫 요청이 HTTP_HEDGE[호스트]초 안에 안 오면 같은 GET을 하나 더 보내 먼저 온 쪽을 쓴다.
+
+RUN_BUDGET = float(os.environ.get("RUN_BUDGET", "840"))
+BUDGET_RESERVE = 20
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "3"))
+RETRY_BASE, RETRY_CAP = 0.5, 8.0        # 백오프 상한 min(CAP, BASE·2^n) 안에서 균등 무작위
+RETRY_STATUS = {429, 500, 502, 503, 504}
+HTTP_HEDGE = {                           # 호스트: 헤지 요청까지 대기(초) — 응답 편차가 큰 곳만
+    "production.dataviz.cnn.io": 2.0,
+    "api.stlouisfed.org": 3.0,
+}
+_BUDGET_END = None
+_HEDGE_POOL = None
+
+
+def start_budget(seconds=None):
+    """실행 경계 — 지금부터 seconds(기본 RUN_BUDGET)초 예산"""
+    global _BUDGET_END
+    _BUDGET_END = time.monotonic() + (RUN_BUDGET if seconds is None else seconds)
+
+
+def budget_left(reserve=BUDGET_RESERVE):
+    """남은 수집 예산(초) — 예산을 시작하지 않았으면 inf"""
+    if _BUDGET_END is None:
+        return float("inf")
+    return max(0.0, _BUDGET_END - reserve - time.monotonic())
+
+
+def budget_timeout(timeout):
+    """요청 timeout을 남은 예산으로 자름 — 예산이 없으면 TimeoutError"""
+    left = budget_left()
+    if left <= 0:
+        METRICS.incr("budget.exhausted")
+        raise TimeoutError("실행 예산 소진")
+    return min(timeout, left)
+
+
+class Retryable(Exception):
+    """재시도할 실패 — hint: 서버가 준 대기(초), result: 재시도가 끝나면 돌려줄 마지막 결과"""
+
+    def __init__(self, msg, hint=None, result=None):
+        super().__init__(msg)
+        self.hint, self.result = hint, result
+
+
+def retry_after(value):
+    """Retry-After 헤더 (초 또는 HTTP 날짜) → 초. 없거나 해석 불가면 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, hint=None):
+    """attempt(0부터)번째 재시도 전 대기 — 서버 힌트 우선, 없으면 full jitter"""
+    if hint is not None:
+        return hint
+    return random.uniform(0, min(RETRY_CAP, RETRY_BASE * 2 ** attempt))
+
+
+def retry_call(fn, what, retries=None, retry_on=()):
+    """fn() — Retryable·retry_on 예외면 백오프 후 재시도. 대기가 남은 예산을 넘으면 중단
+
+    끝내 실패하면 Retryable.result가 있으면 그것을, 아니면 마지막 예외를 올린다."""
+    retries = HTTP_RETRIES if retries is None else retries
+    for n in range(retries + 1):
+        try:
+            return fn()
+        except Retryable as e:
+            err, hint = e, e.hint
+        except retry_on as e:
+            err, hint = e, None
+        delay = backoff_delay(n, hint)
+        if n == retries or delay >= budget_left():
+            break
+        METRICS.incr(f"retry.{what}")
+        time.sleep(delay)
+    if isinstance(err, Retryable) and err.result is not None:
+        return err.result
+    raise err
+
+
+def hedged(fn, delay):
+    """fn() 이 delay초 안에 끝나지 않으면 하나 더 실행 → 먼저 성공한 결과 (둘 다 실패면 마지막 예외)
+
+    늦은 쪽은 취소할 수 없어 결과만 버린다 (requests timeout이 상한). 멱등 GET 전용."""
+    global _HEDGE_POOL
+    with _HTTP_LOCK:
+        if _HEDGE_POOL is None:
+            _HEDGE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+    first = _HEDGE_POOL.submit(fn)
+    done, _ = wait([first], timeout=delay)
+    if done:
+        return first.result()
+    METRICS.incr("http.hedged")
+    second = _HEDGE_POOL.submit(fn)
+    err = None
+    for fut in as_completed([first, second]):
+        try:
+            r = fut.result()
+        except Exception as e:
+            err = e
+            continue
+        if fut is second:
+            METRICS.incr("http.hedge_won")
+        return r
+    raise err
+
+
+def _http_get_json(url, params, headers, timeout):
+    r = http_get(url, params=params, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    return r.json()
+
+
+def fetch_cnn_graphdata():
+    """CNN graphdata — 공포탐욕 게이지와 Put/Call 차트가 같은 응답을 공유"""
+    return http_json(CNN_FG_URL, headers=CNN_HEADERS, timeout=10, source="cnn")
+
 
 # ───────────────────────────────────────────
 # 실시간 지표 fetch — 공포탐욕 / MOVE / Put·Call
@@ -357,121 +1321,214 @@ def fetch_fear_greed():
               "pcc_now": 0, "pcc_rating": ""}
     # CNN Fear & Greed
     try:
-        r = requests.get("https://production.dataviz.cnn.io/index/fearandgreed/graphdata",
-                         headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
-                                  "Accept": "application/json"}, timeout=10)
-        if r.status_code == 200 and r.text:
-            d = r.json()
-            fg = d.get("fear_and_greed", {})
-            result["cnn"] = int(fg.get("score", 50))
-            result["cnn_label"] = fg.get("rating", "Neutral").replace("_", " ").title()
-            result["cnn_prev"] = int(fg.get("previous_close", result["cnn"]))
-            result["cnn_week"] = int(fg.get("previous_1_week", result["cnn"]))
-            result["cnn_month"] = int(fg.get("previous_1_month", result["cnn"]))
-            # Put/Call Ratio (CNN API에 포함)
-            pco = d.get("put_call_options", {})
-            if "data" in pco and isinstance(pco["data"], list) and pco["data"]:
-                result["pcc_now"] = round(pco["data"][-1].get("y", 0), 2)
-                result["pcc_rating"] = pco["data"][-1].get("rating", "")
+        d = fetch_cnn_graphdata()
+        fg = d.get("fear_and_greed", {})
+        result["cnn"] = int(fg.get("score", 50))
+        result["cnn_label"] = fg.get("rating", "Neutral").replace("_", " ").title()
+        result["cnn_prev"] = int(fg.get("previous_close", result["cnn"]))
+        result["cnn_week"] = int(fg.get("previous_1_week", result["cnn"]))
+        result["cnn_month"] = int(fg.get("previous_1_month", result["cnn"]))
+        # Put/Call Ratio (CNN API에 포함)
+        pco = d.get("put_call_options", {})
+        if "data" in pco and isinstance(pco["data"], list) and pco["data"]:
+            result["pcc_now"] = round(pco["data"][-1].get("y", 0), 2)
+            result["pcc_rating"] = pco["data"][-1].get("rating", "")
+        else:
+            result.setdefault("missing", []).append("pcc")
     except Exception as e:
         print(f"  ⚠️ CNN F&G err: {e}")
+        if not restore_parts("fear_greed", result, ("cnn", "cnn_label", "cnn_prev", "cnn_week",
+                                                    "cnn_month", "pcc_now", "pcc_rating"), "cnn"):
+            result.setdefault("missing", []).append("cnn")      # 기본값 — 히스토리에 남기지 않음
 
     # Crypto Fear & Greed (alternative.me — 무료 공개 API)
     try:
-        r = requests.get("https://api.alternative.me/fng/?limit=31", timeout=10)
-        if r.status_code == 200:
-            data = r.json().get("data", [])
-            if len(data) >= 1:
-                result["crypto"] = int(data[0]["value"])
-                result["crypto_label"] = data[0]["value_classification"]
-            if len(data) >= 2:
-                result["crypto_prev"] = int(data[1]["value"])
-            if len(data) >= 7:
-                result["crypto_week"] = int(data[7]["value"])
-            if len(data) >= 30:
-                result["crypto_month"] = int(data[30]["value"])
+        data = http_json(CRYPTO_FG_URL, params={"limit": 31}, timeout=10,
+                         source="crypto_fg").get("data", [])
+        if len(data) >= 1:
+            result["crypto"] = int(data[0]["value"])
+            result["crypto_label"] = data[0]["value_classification"]
+        if len(data) >= 2:
+            result["crypto_prev"] = int(data[1]["value"])
+        if len(data) >= 7:
+            result["crypto_week"] = int(data[7]["value"])
+        if len(data) >= 30:
+            result["crypto_month"] = int(data[30]["value"])
     except Exception as e:
         print(f"  ⚠️ Crypto F&G err: {e}")
+        if not restore_parts("fear_greed", result, ("crypto", "crypto_label", "crypto_prev",
+                                                    "crypto_week", "crypto_month"), "crypto_fg"):
+            result.setdefault("missing", []).append("crypto_fg")
     return result
 
 
-def fetch_move_pcc():
-    """MOVE Index (^MOVE via yfinance) & Put/Call Ratio (CNN API fallback)"""
-    import yfinance as yf
+MOVE_PCC_DAYS = 730         # MOVE 차트 기간 (달력일, 저장소에서 잘라 씀)
+MOVE_PCC_BUCKET = None      # None=일간 해상도, "ME"=월말 값 (이전 월별 차트)
+CHART_BUDGET = {            # 인라인 Plotly 배열 JSON 바이트 상한 → 초과분은 LTTB 축소
+    "fred": 40_000,
+    "move_pcc": 16_000,
+}
+
+
+def fetch_move_pcc(store=None):
+    """MOVE Index (OHLC 저장소의 ^MOVE 일봉) & Put/Call Ratio (CNN API fallback)"""
+    import timeseries as ts
     result = {"move_vals": [], "move_dates": [], "move_now": 0, "move_chg": 0,
               "pcc_vals": [], "pcc_dates": [], "pcc_now": 0, "pcc_chg": 0}
+    fmt = "%Y-%m" if MOVE_PCC_BUCKET else "%Y-%m-%d"
+    charts, failed = {}, []
     try:
-        # MOVE Index — 일봉 1년치 → 월별 마지막값 집계
-        mv = yf.download("^MOVE", period="1y", interval="1d", progress=False, timeout=15)
-        if len(mv) >= 2:
-            cl = mv["Close"].dropna()
-            from collections import OrderedDict as _OD
-            monthly = _OD()
-            for idx in range(len(cl)):
-                key = str(cl.index[idx])[:7]
-                monthly[key] = round(float(cl.iloc[idx]), 1)
-            items = list(monthly.items())[-14:]
-            result["move_dates"] = [k for k, v in items]
-            result["move_vals"] = [v for k, v in items]
-            if len(result["move_vals"]) >= 2:
-                result["move_now"] = result["move_vals"][-1]
-                result["move_chg"] = round(result["move_vals"][-1] - result["move_vals"][-2], 1)
+        # MOVE Index — 일봉 MOVE_PCC_DAYS치 (버킷 지정 시 기간별 마지막값)
+        if store is None:
+            store = market_store()
+        mv = store.closes(OHLC_SYMS["MOVE"], last=1)
+        if not mv:
+            raise ValueError("저장소에 ^MOVE 없음")
+        start = (datetime.strptime(mv[0][0], "%Y-%m-%d") - timedelta(days=MOVE_PCC_DAYS))
+        cl = ts.to_series(store.closes(OHLC_SYMS["MOVE"], start=start.strftime("%Y-%m-%d")))
+        if MOVE_PCC_BUCKET:
+            cl = ts.resample(cl, MOVE_PCC_BUCKET, "last")
+        if len(cl) < 2:
+            raise ValueError(f"^MOVE 봉 {len(cl)}개 — 변화를 낼 수 없음")
+        charts["move"] = ts.to_xy(cl, decimals=1, date_fmt=fmt)
+        vals = charts["move"]["y"]
+        result["move_now"] = vals[-1]
+        result["move_chg"] = round(vals[-1] - vals[-2], 1)
     except Exception as e:
         print(f"  ⚠️ MOVE err: {e}")
+        failed.append(("move", ("move_vals", "move_dates", "move_now", "move_chg")))
 
-    # Put/Call Ratio — CNN API에서 최근 14개월치 추출
+    # Put/Call Ratio — CNN API graphdata (일간, 약 1년치)
     try:
-        r = requests.get("https://production.dataviz.cnn.io/index/fearandgreed/graphdata",
-                         headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
-                                  "Accept": "application/json"}, timeout=10)
-        if r.status_code == 200 and r.text:
-            d = r.json()
-            pco = d.get("put_call_options", {}).get("data", [])
-            if pco:
-                # 월별 마지막 값만 추출 (최근 14개)
-                from collections import OrderedDict
-                monthly = OrderedDict()
-                for pt in pco:
-                    ts = pt.get("x", 0) / 1000
-                    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
-                    key = dt.strftime("%Y-%m")
-                    monthly[key] = round(pt.get("y", 0), 2)
-                items = list(monthly.items())[-14:]
-                result["pcc_dates"] = [k for k, v in items]
-                result["pcc_vals"] = [v for k, v in items]
-                if len(result["pcc_vals"]) >= 2:
-                    result["pcc_now"] = result["pcc_vals"][-1]
-                    result["pcc_chg"] = round(result["pcc_vals"][-1] - result["pcc_vals"][-2], 2)
+        d = fetch_cnn_graphdata()
+        pco = d.get("put_call_options", {}).get("data", [])
+        if not pco:
+            raise ValueError("put_call_options 없음")
+        pc = ts.from_epoch_ms(pco)
+        if MOVE_PCC_BUCKET:
+            pc = ts.resample(pc, MOVE_PCC_BUCKET, "last")
+        charts["pcc"] = ts.to_xy(pc, decimals=2, date_fmt=fmt)
+        vals = charts["pcc"]["y"]
+        if len(vals) < 2:
+            raise ValueError(f"PCC {len(vals)}개 — 변화를 낼 수 없음")
+        result["pcc_now"] = vals[-1]
+        result["pcc_chg"] = round(vals[-1] - vals[-2], 2)
     except Exception as e:
         print(f"  ⚠️ PCC err: {e}")
+        failed.append(("pcc", ("pcc_vals", "pcc_dates", "pcc_now", "pcc_chg")))
+
+    # 현재값·변화는 원 해상도로 계산한 뒤, 차트 배열만 바이트 예산에 맞춤
+    charts = ts.fit_budget(charts, CHART_BUDGET["move_pcc"])
+    if "move" in charts:
+        result["move_dates"], result["move_vals"] = charts["move"]["x"], charts["move"]["y"]
+    if "pcc" in charts:
+        result["pcc_dates"], result["pcc_vals"] = charts["pcc"]["x"], charts["pcc"]["y"]
+    for part, keys in failed:
+        if not restore_parts("move_pcc", result, keys, "move_pcc"):
+            result.setdefault("missing", []).append(part)       # 기본값 — 히스토리에 남기지 않음
     return result
 
 
-
 SYMS = {"SP500":"^GSPC","NASDAQ":"^IXIC","DOW":"^DJI","RUSSELL":"^RUT",
         "VIX":"^VIX","GOLD":"GC=F","SILVER":"SI=F","OIL":"CL=F","COPPER":"HG=F",
         "DXY":"DX-Y.NYB","BTC":"BTC-USD","ETH":"ETH-USD","SOL":"SOL-USD",
         "KRW":"KRW=X","JPY":"JPY=X","CNY":"CNY=X"}
+SPARK_POINTS = 22           # 카드 스파크라인 (최근 거래일 수)
 
-def fetch_market():
-    data = {k:{"price":0,"change":0} for k in SYMS}
-    try:
-        raw = yf.download(list(SYMS.values()), period="2d", interval="1d",
-                          group_by="ticker", progress=False, timeout=30)
-        for name, sym in SYMS.items():
+
+# ───────────────────────────────────────────
+# OHLC 저장소 — SYMS + ^MOVE 일봉을 SQLite에 누적 (marketstore.py)
+# ───────────────────────────────────────────
+# 실행마다 저장소의 마지막 봉 이후(− 개정 윈도)만 yf.download로 받는다 (보통 한 번).
+# 카드 시세·등락률·스파크라인·MOVE 차트는 모두 저장소에서 읽는다. 봉이 없는 심볼만
+# (최초 실행·심볼 추가) OHLC_BACKFILL 기간을 따로 받고, 나머지는 심볼별 마지막 봉 기준으로
+# 묶어 증분(marketstore.download_plan) — 죽은 티커 하나가 매 실행 전체 백필을 일으키지 않는다.
+# 녹화·재생 중엔 CACHE_DIR이 꺼져 메모리 DB라 요청 키가 항상 백필 키로 같아진다.
+
+OHLC_SYMS = {**SYMS, "MOVE": "^MOVE"}
+OHLC_BACKFILL = "2y"        # MOVE_PCC_DAYS 이상
+OHLC_REVISION_DAYS = 5      # 마지막 봉 앞쪽 재요청 — 장중 잠정 봉·수정 반영
+_OHLC_LOCK = threading.Lock()
+_OHLC_STORES = {}           # 경로 → 열린 저장소 (인트라데이 모드에서 연결·메모리 DB 유지)
+
+
+def _ohlc_path():
+    return Path(CACHE_DIR) / "market.sqlite" if CACHE_DIR else None
+
+
+def market_store(extra=()):
+    """OHLC 저장소를 빠진 구간만 갱신해 반환 — 갱신 실패 시 저장된 봉으로 계속
+
+    extra: SYMS 밖의 티커 (변형 페이지 워치리스트 카드) — 같은 다운로드에 합친다"""
+    import marketstore
+    with _OHLC_LOCK:
+        path = _ohlc_path()
+        store = _OHLC_STORES.get(path)
+        if store is None:
+            store = _OHLC_STORES[path] = marketstore.OHLCStore(path)
+        syms = list(dict.fromkeys([*OHLC_SYMS.values(), *extra]))
+        failed = None
+        for start, group in store.download_plan(syms, OHLC_REVISION_DAYS):
             try:
-                try:
-                    cl = raw[sym]["Close"].dropna()
-                except (KeyError, TypeError):
-                    cl = raw["Close"].dropna()
-                if len(cl)>=2:
-                    c,p = float(cl.iloc[-1]), float(cl.iloc[-2])
-                    data[name] = {"price":c,"change":(c-p)/p*100}
-                elif len(cl)==1:
-                    data[name] = {"price":float(cl.iloc[-1]),"change":0.0}
-            except: pass
-    except Exception as e:
-        print(f"yfinance error: {e}")
+                with METRICS.span("ohlc upsert") as a:
+                    a["bars"] = store.upsert(_ohlc_download(group, start), group)
+            except Exception as e:
+                if start is None and store.latest():
+                    # 봉이 없던 심볼(죽은 변형 티커·^MOVE 미제공)만 실패 — 나머지는 최신, 지연 아님
+                    print(f"  ⚠️ OHLC 백필 실패 {', '.join(group)} ({e})")
+                    continue
+                failed = e
+        if failed is not None:
+            last = store.latest()
+            if not last:
+                raise failed
+            print(f"  ♻️ OHLC 갱신 실패 — 저장된 {last}까지 사용 ({failed})")
+            METRICS.incr("cache.stale")
+            mark_stale("yf_ohlc", day_ts(last))
+        return store
+
+
+def _ohlc_download(syms, start=None):
+    """yf.download 한 번 — start가 None이면 OHLC_BACKFILL 기간 통째로 (캐시·재시도 경유)"""
+    span = {"start": start} if start else {"period": OHLC_BACKFILL}
+
+    def _dl():
+        import yfinance as yf
+        with _YF_LOCK:
+            df = yf.download(syms, interval="1d", group_by="ticker", progress=False,
+                             timeout=budget_timeout(30), **span)
+        if not len(df):
+            raise Retryable("empty download", result=df)
+        return df
+    return cached_call("yf_ohlc", (tuple(syms), tuple(span.items()), "1d"),
+                       lambda: retry_call(_dl, "yf_ohlc", retry_on=(OSError, ValueError)),
+                       ok=lambda df: len(df) > 0)
+
+
+def fetch_market(store=None, extra=()):
+    """SYMS 카드 시세 — 저장소의 최근 봉 (등락률은 그 심볼의 직전 거래일 종가 대비)
+
+    extra 티커는 티커 자체를 키로 싣는다."""
+    syms = {**SYMS, **{t: t for t in extra}}
+    data = {k:{"price":0,"change":0} for k in syms}
+    if store is None:
+        store = market_store(extra)
+    for name, sym in syms.items():
+        try:
+            bars = store.closes(sym, last=SPARK_POINTS)
+            if not bars:
+                print(f"  ⚠️ {name}({sym}) 시세 없음")
+                METRICS.incr("market.missing")
+                continue
+            c = bars[-1][1]
+            p = bars[-2][1] if len(bars) >= 2 else None
+            data[name] = {"price": c, "change": (c - p) / p * 100 if p else 0.0,
+                          "date": bars[-1][0], "spark": [round(v, 4) for _, v in bars]}
+        except Exception as e:
+            print(f"  ⚠️ {name}({sym}) 시세 오류: {e}")
+            METRICS.incr("market.error")
+    if not any(d.get("price") for d in data.values()):
+        raise ValueError("저장소에 시세 없음")
     return data
 
 def card(label, d, pre="", dec=2):
@@ -479,154 +1536,542 @@ def card(label, d, pre="", dec=2):
     ps = f"{pre}{p:,.{dec}f}" if p else "N/A"
     col = "#e53e3e" if c>=0 else "#3182ce"
     arr = "▲" if c>=0 else "▼"
+    spark = ""
+    if d.get("spark"):
+        import svgchart
+        spark = svgchart.sparkline(d["spark"])
     return (f'<div class="card"><div class="card-label">{label}</div>'
             f'<div class="card-value">{ps}</div>'
-            f'<div class="card-change" style="color:{col}">{arr} {abs(c):.2f}%</div></div>')
+            f'<div class="card-change" style="color:{col}">{arr} {abs(c):.2f}%</div>{spark}</div>')
 
-def fred_get(sid, limit=36):
-    if not FRED_API_KEY: return {"x":[],"y":[]}
-    try:
-        r = requests.get(FRED_URL, params={"series_id":sid,"api_key":FRED_API_KEY,
-            "file_type":"json","sort_order":"desc","limit":limit}, timeout=15)
-        d = r.json()
-        if "observations" not in d: return {"x":[],"y":[]}
-        obs = [o for o in d["observations"] if o["value"]!="."]
-        obs.reverse()
-        return {"x":[o["date"] for o in obs],"y":[float(o["value"]) for o in obs]}
-    except Exception as e:
-        print(f"FRED {sid}: {e}"); return {"x":[],"y":[]}
 
-def fred_yoy(sid):
-    if not FRED_API_KEY: return {"x":[],"y":[]}
+CARD_SETS = {   # 카드 슬롯: [(라벨, SYMS 이름 또는 티커[, 접두, 소수 자릿수])]
+    "index_cards": [("S&P 500", "SP500"), ("NASDAQ", "NASDAQ"), ("Dow Jones", "DOW"),
+                    ("Russell 2000", "RUSSELL"), ("VIX", "VIX")],
+    "commodity_cards": [("금 (XAU/USD)", "GOLD", "$", 0), ("은 (XAG/USD)", "SILVER", "$", 2),
+                        ("WTI 원유", "OIL", "$", 2), ("구리", "COPPER", "$", 3)],
+    "fx_cards": [("달러인덱스", "DXY"), ("원/달러", "KRW"), ("엔/달러", "JPY"),
+                 ("위안/달러", "CNY", "", 3)],
+}
+
+
+def card_slots(mkt, sets=None):
+    """카드 슬롯 값 — sets는 CARD_SETS 형식 (기본: CARD_SETS)"""
+    return {slot: "".join(card(label, mkt.get(key, {}), *fmt) for label, key, *fmt in items)
+            for slot, items in (sets or CARD_SETS).items()}
+
+# ───────────────────────────────────────────
+# FRED 관측치 저장소 — series_id별 증분 갱신 + 발표일 기반 스킵
+# ───────────────────────────────────────────
+# {CACHE_DIR}/fred_store/{series_id}.json 에 전체 관측치를 보관하고,
+# 매 실행은 (마지막 관측일 - 개정 윈도)부터만 요청해 병합한다.
+# 다음 정기 발표일이 아직 지나지 않았으면 요청 자체를 건너뛴다.
+
+FRED_RELEASE_URL = "https://api.stlouisfed.org/fred/series/release"
+FRED_RELEASE_DATES_URL = "https://api.stlouisfed.org/fred/release/dates"
+FRED_STORE_START = "2015-01-01"     # 최초 백필 시작일 (차트 확장 여유분)
+FRED_REVISION_DAYS = {              # 재요청할 개정 윈도(일) — 기본 120
+    "DGS10": 14, "DGS2": 14,
+}
+_FRED_LOCKS = {}
+
+
+def fred_enabled():
+    """FRED 키가 있거나 재생 번들에서 읽는 경우"""
+    return bool(FRED_API_KEY) or replaying()
+
+
+def _fred_store_path(sid):
+    return Path(CACHE_DIR) / "fred_store" / f"{sid}.json" if CACHE_DIR else None
+
+
+def _fred_next_release(sid, store, today):
+    """series → release_id (최초 1회 조회 후 저장) → today 이후 첫 정기 발표일"""
     try:
-        r = requests.get(FRED_URL, params={"series_id":sid,"api_key":FRED_API_KEY,
-            "file_type":"json","observation_start":"2022-01-01","sort_order":"asc"}, timeout=15)
-        d = r.json()
-        if "observations" not in d: return {"x":[],"y":[]}
-        obs = [o for o in d["observations"] if o["value"]!="."]
-        vm = {o["date"]:float(o["value"]) for o in obs}
-        rx,ry = [],[]
-        for o in obs:
-            dt=o["date"]
-            if dt<"2023-01-01": continue
-            prev_dt = f"{int(dt[:4])-1}{dt[4:]}"
-            cands = [k for k in vm if k<=prev_dt]
-            if not cands: continue
-            prev=vm[max(cands)]
-            if prev: rx.append(dt); ry.append(round((vm[dt]-prev)/prev*100,2))
-        return {"x":rx,"y":ry}
+        if not store.get("release_id"):
+            d = http_json(FRED_RELEASE_URL, params={"series_id": sid,
+                          "api_key": FRED_API_KEY, "file_type": "json"}, timeout=15)
+            store["release_id"] = d["releases"][0]["id"]
+        d = http_json(FRED_RELEASE_DATES_URL, params={
+            "release_id": store["release_id"], "api_key": FRED_API_KEY, "file_type": "json",
+            "realtime_start": today, "realtime_end": "9999-12-31",
+            "include_release_dates_with_no_data": "true", "sort_order": "asc", "limit": 10},
+            timeout=15)
+        dates = [r["date"] for r in d.get("release_dates", []) if r["date"] >= today]
+        return dates[0] if dates else None
     except Exception as e:
-        print(f"FRED yoy {sid}: {e}"); return {"x":[],"y":[]}
+        print(f"FRED release {sid}: {e}")
+        return None
+
 
-def fred_js(cpi, core, un, ff, d10, d2):
-    def ja(d): return json.dumps(d)
-    x0=cpi["x"][0] if cpi["x"] else ""
-    x1=cpi["x"][-1] if cpi["x"] else ""
+def fred_observations(sid, start=FRED_STORE_START):
+    """저장소 기준 [(date, value)] 오름차순 — 필요할 때만 증분 요청"""
+    if not fred_enabled(): return []
+    with _FRED_LOCKS.setdefault(sid, threading.Lock()):
+        path = _fred_store_path(sid)
+        store = {}
+        if path is not None and path.exists():
+            try:
+                store = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError:
+                store = {}
+        obs = [tuple(o) for o in store.get("observations", [])]
+        if store.get("start", "9999") > start:
+            obs = []                              # 요청 범위가 저장 범위보다 넓음 → 재백필
+        today = run_clock().now.strftime("%Y-%m-%d")
+        # KST 아침 실행 시점엔 미국 당일 발표가 아직 → 발표일 다음 날(KST)부터 갱신
+        nxt = store.get("next_release")
+        if obs and nxt and today <= nxt:
+            METRICS.incr("fred.release_skip")
+            return [o for o in obs if o[0] >= start]
+
+        base = min(start, FRED_STORE_START)
+        obs_start = base
+        if obs:
+            window = FRED_REVISION_DAYS.get(sid, 120)
+            last = datetime.strptime(obs[-1][0], "%Y-%m-%d")
+            obs_start = max(base, (last - timedelta(days=window)).strftime("%Y-%m-%d"))
+        try:
+            d = http_json(FRED_URL, params={"series_id":sid,"api_key":FRED_API_KEY,
+                "file_type":"json","observation_start":obs_start,"sort_order":"asc"},
+                timeout=15)
+            if "observations" not in d:
+                raise ValueError(d.get("error_message", "no observations"))
+        except Exception as e:
+            if not obs: raise
+            print(f"  ♻️ FRED {sid} 갱신 실패 — 저장된 {obs[-1][0]}까지 사용 ({e})")
+            mark_stale(f"fred_{sid}", day_ts(store.get("updated_at") or obs[-1][0]))
+            return [o for o in obs if o[0] >= start]
+        clear_stale(f"fred_{sid}")
+
+        fresh = [(o["date"], float(o["value"])) for o in d["observations"] if o["value"]!="."]
+        obs = [o for o in obs if o[0] < obs_start] + fresh
+        store.update(series_id=sid, start=min(base, store.get("start", base)),
+                     observations=obs, updated_at=today,
+                     next_release=_fred_next_release(sid, store, today))
+        if path is not None:
+            assets.write_atomic(path, json.dumps(store, separators=(",", ":")).encode("utf-8"))
+        return [o for o in obs if o[0] >= start]
+
+
+def fred_get(sid, limit=36, start=None):
+    """최근 limit개 관측 — start를 주면 그 이후 전체 (일간 시리즈용)
+
+    저장소도 없이 요청이 실패하면 예외를 올린다 — 단계(Stage)가 마지막 정상값·빈 시리즈로 대체"""
+    if not fred_enabled(): return {"x":[],"y":[]}
+    import timeseries as ts
+    if start:
+        return ts.to_xy(ts.to_series(fred_observations(sid, start)))
+    return ts.to_xy(ts.to_series(fred_observations(sid)).iloc[-limit:])
+
+def fred_get_daily(sid, start="2023-01-01"):
+    """일간 시리즈(국채 수익률) — start 이후 일간 해상도, 차트 예산은 fred_js에서 적용"""
+    return fred_get(sid, start=start)
+
+def fred_yoy(sid, start="2023-01-01"):
+    """전년比 % — 1년 전 기준값은 as-of 조인 (timeseries.yoy). 실패는 fred_get과 같이 올림"""
+    if not fred_enabled(): return {"x":[],"y":[]}
+    import timeseries as ts
+    base = (datetime.strptime(start, "%Y-%m-%d") - timedelta(days=366)).strftime("%Y-%m-%d")
+    s = ts.to_series(fred_observations(sid, base))
+    return ts.to_xy(ts.yoy(s), decimals=2, start=start)
+
+def fred_fit(cpi, core, un, ff, d10, d2):
+    """FRED 6개 시리즈 → 차트 바이트 예산(CHART_BUDGET["fred"])에 맞춘 {이름: {"x","y"}}"""
+    def ja(d): return json.dumps(d, separators=(",", ":"))
+    fit = {"cpi": cpi, "core": core, "un": un, "ff": ff, "d10": d10, "d2": d2}
+    # 날짜 문자열만으로 예산을 넘는 대용량은 바로 축소, 나머지는 실제 크기로 판정
+    if (sum(len(v["x"]) for v in fit.values()) * len('"YYYY-MM-DD",') > CHART_BUDGET["fred"]
+            or sum(len(ja(v["x"])) + len(ja(v["y"])) for v in fit.values()) > CHART_BUDGET["fred"]):
+        import timeseries as ts                   # 예산 초과일 때만 numpy/pandas 로드
+        fit = ts.fit_budget(fit, CHART_BUDGET["fred"])
+    return fit
+
+
+def fred_js(cpi, core, un, ff, d10, d2, ref=None):
+    """FRED 차트 스크립트 — ref가 있으면 배열 리터럴 대신 JS 식 ref.이름.x/y (분할 출력용)"""
+    if ref is None:
+        fit = fred_fit(cpi, core, un, ff, d10, d2)
+        def ja(d): return json.dumps(d, separators=(",", ":"))
+        X = lambda k: ja(fit[k]["x"])
+        Y = lambda k: ja(fit[k]["y"])
+        xs = fit["cpi"]["x"]
+        x0, x1 = (f"'{xs[0]}'", f"'{xs[-1]}'") if xs else ("''", "''")
+    else:
+        X = lambda k: f"{ref}.{k}.x"
+        Y = lambda k: f"{ref}.{k}.y"
+        x0, x1 = f"{ref}.cpi.x[0]", f"{ref}.cpi.x[{ref}.cpi.x.length-1]"
     lines = [
         "const fredCfg={margin:{t:10,b:40,l:50,r:10},legend:{orientation:'h',y:-0.25,font:{size:11}},paper_bgcolor:'transparent',plot_bgcolor:'transparent',xaxis:{gridcolor:'#f1f5f9',tickfont:{size:10}},yaxis:{gridcolor:'#f1f5f9',tickfont:{size:10}}};",
         "const fredOpt={responsive:true,displayModeBar:false};",
         "Plotly.newPlot('fred1',[",
-        f"  {{x:{ja(cpi['x'])},y:{ja(cpi['y'])},name:'CPI YoY%',type:'scatter',mode:'lines',line:{{color:'#2563eb',width:2}}}},",
-        f"  {{x:{ja(core['x'])},y:{ja(core['y'])},name:'Core CPI YoY%',type:'scatter',mode:'lines',line:{{color:'#dc2626',width:2}}}}",
-        f"],{{...fredCfg,yaxis:{{...fredCfg.yaxis,ticksuffix:'%'}},shapes:[{{type:'line',x0:'{x0}',x1:'{x1}',y0:2,y1:2,line:{{color:'#9ca3af',width:1,dash:'dot'}}}}]}},fredOpt);",
+        f"  {{x:{X('cpi')},y:{Y('cpi')},name:'CPI YoY%',type:'scatter',mode:'lines',line:{{color:'#2563eb',width:2}}}},",
+        f"  {{x:{X('core')},y:{Y('core')},name:'Core CPI YoY%',type:'scatter',mode:'lines',line:{{color:'#dc2626',width:2}}}}",
+        f"],{{...fredCfg,yaxis:{{...fredCfg.yaxis,ticksuffix:'%'}},shapes:[{{type:'line',x0:{x0},x1:{x1},y0:2,y1:2,line:{{color:'#9ca3af',width:1,dash:'dot'}}}}]}},fredOpt);",
         "Plotly.newPlot('fred2',[",
-        f"  {{x:{ja(un['x'])},y:{ja(un['y'])},name:'실업률',type:'scatter',mode:'lines',line:{{color:'#7c3aed',width:2}}}},",
-        f"  {{x:{ja(ff['x'])},y:{ja(ff['y'])},name:'Fed Funds',type:'scatter',mode:'lines',line:{{color:'#d97706',width:2}}}}",
+        f"  {{x:{X('un')},y:{Y('un')},name:'실업률',type:'scatter',mode:'lines',line:{{color:'#7c3aed',width:2}}}},",
+        f"  {{x:{X('ff')},y:{Y('ff')},name:'Fed Funds',type:'scatter',mode:'lines',line:{{color:'#d97706',width:2}}}}",
         "],{...fredCfg,yaxis:{...fredCfg.yaxis,ticksuffix:'%'}},fredOpt);",
         "Plotly.newPlot('fred3',[",
-        f"  {{x:{ja(d10['x'])},y:{ja(d10['y'])},name:'10년물',type:'scatter',mode:'lines',line:{{color:'#2563eb',width:2}}}},",
-        f"  {{x:{ja(d2['x'])},y:{ja(d2['y'])},name:'2년물',type:'scatter',mode:'lines',line:{{color:'#dc2626',width:2}}}}",
+        f"  {{x:{X('d10')},y:{Y('d10')},name:'10년물',type:'scatter',mode:'lines',line:{{color:'#2563eb',width:2}}}},",
+        f"  {{x:{X('d2')},y:{Y('d2')},name:'2년물',type:'scatter',mode:'lines',line:{{color:'#dc2626',width:2}}}}",
         "],{...fredCfg,yaxis:{...fredCfg.yaxis,ticksuffix:'%'}},fredOpt);",
     ]
     return "\n".join(lines)
 
 
+def move_pcc_js(xm, mv, pcc, xp, ref=None):
+    """MOVE & PCC 차트 스크립트 — ref가 있으면 배열 리터럴 대신 ref.move / ref.pcc 참조"""
+    if ref is None:
+        def ja(d): return json.dumps(d, separators=(",", ":"))
+        data = f"const xm={ja(xm)};\nconst mv={ja(mv)};\nconst pcc={ja(pcc)};\nconst xp={ja(xp)};"
+    else:
+        data = f"const xm={ref}.move.x;\nconst mv={ref}.move.y;\nconst pcc={ref}.pcc.y;\nconst xp={ref}.pcc.x;"
+    return "\n".join([
+        "// ====== MOVE & PCC 차트 ======",
+        "(function(){",
+        data,
+        "const base={margin:{t:10,b:40,l:55,r:10},paper_bgcolor:'transparent',plot_bgcolor:'transparent',xaxis:{gridcolor:'#f1f5f9',tickfont:{size:10}},yaxis:{gridcolor:'#f1f5f9',tickfont:{size:10}},showlegend:false};",
+        "const opt={responsive:true,displayModeBar:false};",
+        "Plotly.newPlot('chart-move',[{x:xm,y:mv,type:'scatter',mode:xm.length>40?'lines':'lines+markers',line:{color:'#7c3aed',width:2},marker:{size:5,color:'#7c3aed'},fill:'tozeroy',fillcolor:'rgba(124,58,237,0.07)'}],"
+        "{...base,shapes:[{type:'line',x0:xm[0],x1:xm[xm.length-1],y0:100,y1:100,line:{color:'#ef4444',width:1.5,dash:'dot'}}],annotations:[{x:xm[xm.length-2],y:103,text:'위험구간 100',showarrow:false,font:{size:10,color:'#ef4444'}}]},opt);",
+        "Plotly.newPlot('chart-pcc',[{x:xp,y:pcc,type:'bar',marker:{color:pcc.map(v=>v>=1.0?'rgba(239,68,68,0.75)':'rgba(59,130,246,0.65)')}}],"
+        "{...base,shapes:[{type:'line',x0:xp[0],x1:xp[xp.length-1],y0:1.0,y1:1.0,line:{color:'#ef4444',width:1.5,dash:'dash'}}],annotations:[{x:xp[xp.length-2],y:1.04,text:'공포선 1.0',showarrow:false,font:{size:10,color:'#ef4444'}}],yaxis:{...base.yaxis,range:[0.6,1.45]}},opt);",
+        "})();",
+    ])
+
+
 # ═══════════════════════════════════════════
 # PART C — HTML 템플릿 패치 (브리핑 + 데이터 → 최종 HTML)
 # ═══════════════════════════════════════════
 
-def patch_html(src, mkt, fscript, briefing_html="", fg=None, move_pcc=None):
-    """템플릿 HTML에서 동적 부분만 re.sub으로 교체 — format() 절대 사용 안함"""
-    h = src
-    if fg is None: fg = {}
-    if move_pcc is None: move_pcc = {}
-
-    # 날짜
-    h = re.sub(r'\d{4}년 \d{2}월 \d{2}일 \([월화수목금토일]\)', TODAY_STR, h)
-
-    # 브리핑 삽입 (briefing-content div 내부 교체)
-    if briefing_html:
-        h = re.sub(
-            r'(<div id="briefing-content">)[\s\S]*?(</div>\s*</div>\s*<!-- 3\.)',
-            lambda m: m.group(1) + briefing_html + m.group(2),
-            h, count=1)
-
-    # 지수 카드
-    idx = (card("S&P 500",mkt.get("SP500",{})) +
-           card("NASDAQ",mkt.get("NASDAQ",{})) +
-           card("Dow Jones",mkt.get("DOW",{})) +
-           card("Russell 2000",mkt.get("RUSSELL",{})) +
-           card("VIX",mkt.get("VIX",{})))
-    h = re.sub(
-        r'(<!-- 3\. 주요 지수 카드[\s\S]*?<div class="cards">)[\s\S]*?(</div>\s*</div>\s*<!-- 4\.)',
-        lambda m: m.group(1) + idx + m.group(2), h, count=1)
-
-    # 원자재 카드
-    com = (card("금 (XAU/USD)",mkt.get("GOLD",{}),"$",0) +
-           card("은 (XAG/USD)",mkt.get("SILVER",{}),"$",2) +
-           card("WTI 원유",mkt.get("OIL",{}),"$",2) +
-           card("구리",mkt.get("COPPER",{}),"$",3))
-    h = re.sub(
-        r'(원자재 — 가격 스냅샷</div>\s*<div class="cards">)[\s\S]*?(</div>\s*<div class="subsection-label"[^>]*>원자재 — TradingView)',
-        lambda m: m.group(1) + com + m.group(2), h, count=1)
-
-    # 환율 카드
-    fx = (card("달러인덱스",mkt.get("DXY",{})) +
-          card("원/달러",mkt.get("KRW",{})) +
-          card("엔/달러",mkt.get("JPY",{})) +
-          card("위안/달러",mkt.get("CNY",{}),dec=3))
-    h = re.sub(
-        r'(subsection-label">환율</div>\s*<div class="cards">)[\s\S]*?(</div>\s*<div class="subsection-label"[^>]*>원자재)',
-        lambda m: m.group(1) + fx + m.group(2), h, count=1)
-
-    # ── 공포탐욕 게이지 (실시간) ──
+# ───────────────────────────────────────────
+# 위젯 매니페스트 — TradingView 차트·임베드 목록 (페이지가 뷰포트 근처에서 지연 마운트)
+# ───────────────────────────────────────────
+# 그룹마다 템플릿 블록 하나(widgets_<그룹> 슬롯)에 라벨 + 빈 컨테이너를 렌더하고,
+# 심볼·옵션은 TV_MANIFEST JSON으로 넘긴다. 템플릿 head의 mountWidgets()가 컨테이너가
+# 화면에 가까워질 때 tv.js를 한 번만 받아 위젯을 만든다 (Plotly도 같은 방식).
+# WIDGET_MANIFEST=path.json 이면 {그룹: [[id, 라벨, 심볼, 높이(, 라벨 색)], ...]}로 그룹을 교체.
+
+TV_SCRIPT = "https://s3.tradingview.com/tv.js"
+TV_CHART_OPTIONS = {"autosize": False, "width": "100%", "interval": "D",
+                    "timezone": "Asia/Seoul", "theme": "light", "style": "1", "locale": "kr",
+                    "toolbar_bg": "#f8f9fb", "enable_publishing": False,
+                    "hide_side_toolbar": True, "allow_symbol_change": False, "save_image": False}
+
+TV_CHARTS = {   # 그룹: [(컨테이너 id, 라벨 HTML, 심볼, 높이[, 라벨 색])]
+    "index": [("tv_spy", "S&P 500 — SPY", "AMEX:SPY", 200),
+              ("tv_qqq", "NASDAQ — QQQ", "NASDAQ:QQQ", 200),
+              ("tv_dia", "Dow Jones — DIA", "AMEX:DIA", 200),
+              ("tv_iwm", "Russell 2000 — IWM", "AMEX:IWM", 200)],
+    # !포함 선물심볼은 embed 불가 → TVC 심볼로 교체
+    "commodity": [("tv_gold", "금 — TVC:GOLD (XAU/USD)", "TVC:GOLD", 200),
+                  ("tv_silver", "은 — TVC:SILVER (XAG/USD)", "TVC:SILVER", 200),
+                  ("tv_wti", "WTI 원유 — TVC:USOIL", "TVC:USOIL", 200),
+                  ("tv_copper", "구리 — CAPITALCOM:COPPER", "CAPITALCOM:COPPER", 200)],
+    "dxy": [("tv_dxy", "US Dollar Index (DXY) — CAPITALCOM:DXY", "CAPITALCOM:DXY", 200)],
+    "coin": [("tv_btc", "Bitcoin — BTC/USDT", "BINANCE:BTCUSDT", 200),
+             ("tv_eth", "Ethereum — ETH/USDT", "BINANCE:ETHUSDT", 200),
+             ("tv_sol", "Solana — SOL/USDT", "BINANCE:SOLUSDT", 200)],
+    "etf": [("tv_xle", "XLE — 에너지", "AMEX:XLE", 160),
+            ("tv_soxx", "SOXX — 반도체", "NASDAQ:SOXX", 160),
+            ("tv_arkk", "ARKK — 혁신", "AMEX:ARKK", 160),
+            ("tv_rsp", "RSP — S&P 동일가중", "AMEX:RSP", 160),
+            # VIX 직접 embed 차단 → VIXY(VIX 단기선물 ETF)로 대체
+            ("tv_vix", "VIX — 변동성지수 (VIXY)", "AMEX:VIXY", 160, "#e53e3e")],
+    "stock": [(f"tv_{t.lower()}", t, f"NASDAQ:{t}", 160)
+              for t in ("AAPL", "NVDA", "MSFT", "TSLA", "META", "MSTR", "COIN")],
+}
+
+_TV_EMBED = "https://s3.tradingview.com/external-embedding/embed-widget-{}.js"
+_HEATMAP = {"blockSize": "market_cap_basic", "blockColor": "change", "locale": "kr",
+            "symbolUrl": "", "colorTheme": "light", "isZoomEnabled": True,
+            "hasSymbolTooltip": True, "width": "100%"}
+TV_EMBEDS = [   # (래퍼 id, 임베드 스크립트, 높이, 설정, 실패 문구)
+    ("tv_heatmap_wrap", _TV_EMBED.format("stock-heatmap"), 400,
+     {**_HEATMAP, "exchanges": [], "dataSource": "SPX500", "grouping": "sector",
+      "hasTopBar": False, "isDataSetEnabled": False, "height": 400},
+     "📊 TradingView S&P500 섹터 히트맵 로딩 실패"),
+    ("tv_crypto_heatmap_wrap", _TV_EMBED.format("crypto-coins-heatmap"), 480,
+     {**_HEATMAP, "dataSource": "Crypto", "blockSize": "market_cap_calc",
+      "hasTopBar": True, "isDataSetEnabled": True, "height": 480},
+     "📊 코인 히트맵 로딩 실패"),
+]
+
+
+def script_json(obj):
+    """<script> 안에 그대로 넣을 수 있는 JSON (</script>·<!-- 무력화)"""
+    js = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return js.replace("</", "<\\/").replace("<!--", "<\\u0021--")
+
+
+def widget_groups():
+    """TV_CHARTS + WIDGET_MANIFEST 파일의 그룹 교체분"""
+    groups = dict(TV_CHARTS)
+    path = os.environ.get("WIDGET_MANIFEST")
+    if path:
+        for name, items in json.loads(Path(path).read_text(encoding="utf-8")).items():
+            if name not in groups:
+                print(f"  ⚠️ WIDGET_MANIFEST: 알 수 없는 그룹 {name!r} (무시)")
+                continue
+            groups[name] = [tuple(w) for w in items]
+    return groups
+
+
+def widget_block(items):
+    """그룹 → 라벨 + 빈 컨테이너 마크업 (높이를 미리 잡아 마운트 때 레이아웃이 밀리지 않음)"""
+    rows = []
+    for n, (wid, label, _, h, *color) in enumerate(items):
+        style = ";".join(filter(None, ["margin-top:0" if n == 0 else "",
+                                       f"color:{color[0]}" if color else ""]))
+        attr = f' style="{style}"' if style else ""
+        rows.append(f'  <div class="chart-label"{attr}>{label}</div>')
+        gap = ";margin-bottom:20px" if n < len(items) - 1 else ""
+        rows.append(f'  <div id="{wid}" style="height:{h}px{gap}"></div>')
+    return "\n".join(rows)
+
+
+def widget_slots(groups=None):
+    """위젯 슬롯 값 — widgets_<그룹> 마크업 + widget_manifest (TV_MANIFEST JSON)"""
+    groups = groups or widget_groups()
+    v = {f"widgets_{name}": widget_block(items) for name, items in groups.items()}
+    manifest = {
+        "tv": TV_SCRIPT, "options": TV_CHART_OPTIONS,
+        "charts": [{"id": w[0], "symbol": w[2], "height": w[3]}
+                   for items in groups.values() for w in items],
+        "embeds": [{"id": i, "src": src, "height": h, "config": cfg, "fail": fail}
+                   for i, src, h, cfg, fail in TV_EMBEDS],
+    }
+    v["widget_manifest"] = f"const TV_MANIFEST={script_json(manifest)};"
+    return v
+
+
+# ───────────────────────────────────────────
+# 차트 렌더 — svg(기본): 서버에서 정적 인라인 SVG / plotly: 브라우저 Plotly (지연 로드)
+# ───────────────────────────────────────────
+# svg 모드는 차트 div 슬롯을 svgchart.py 결과로 채우고 Plotly 스크립트 슬롯
+# (fred_script, move_pcc_script)을 비워, 페이지가 스크립트 없이 차트를 보여준다.
+# 데이터가 없는 차트는 기존 div·스크립트(클라이언트 FRED 로더 등)를 그대로 둔다.
+
+CHART_RENDER = os.environ.get("CHART_RENDER", "svg").lower()
+CHART_DIVS = {"fred1": 260, "fred2": 260, "fred3": 260,     # div id: 높이(px)
+              "chart-move": 220, "chart-pcc": 220}
+CHART_WIDTH = 720                                           # SVG viewBox 폭
+FRED_PANELS = {   # div id: ([(시리즈 키, 이름, 색)], 기준선) — fred_js 와 같은 구성
+    "fred1": ([("cpi", "CPI YoY%", "#2563eb"), ("core", "Core CPI YoY%", "#dc2626")],
+              [{"y": 2, "label": "Fed 목표 2%"}]),
+    "fred2": ([("un", "실업률", "#7c3aed"), ("ff", "Fed Funds", "#d97706")], []),
+    "fred3": ([("d10", "10년물", "#2563eb"), ("d2", "2년물", "#dc2626")], []),
+}
+
+
+def _chart_slot(cid):
+    return "chart_" + cid.removeprefix("chart-")
+
+
+def chart_div(cid, svg=""):
+    """차트 컨테이너 — SVG가 있으면 높이를 SVG 비율에 맡기고, 없으면 Plotly용 고정 높이 div"""
+    if svg:
+        return f'<div id="{cid}" class="svg-chart">{svg}</div>'
+    return f'<div id="{cid}" style="width:100%;height:{CHART_DIVS[cid]}px"></div>'
+
+
+def inversion_bands(d10, d2, fill="rgba(239,68,68,0.05)"):
+    """2년물 > 10년물(장단기 역전) 구간 [(시작, 끝, 색)] — 10년물은 as-of 값으로 비교"""
+    from bisect import bisect_right
+    xs, ys = d10.get("x") or [], d10.get("y") or []
+    bands, start, prev = [], None, None
+    for x, y in zip(d2.get("x") or [], d2.get("y") or []):
+        i = bisect_right(xs, x) - 1
+        if i < 0:
+            continue
+        if y > ys[i] and start is None:
+            start = x
+        elif y <= ys[i] and start is not None:
+            bands.append((start, prev, fill))
+            start = None
+        prev = x
+    if start is not None:
+        bands.append((start, prev, fill))
+    return bands
+
+
+def chart_slots(fred=None, move_pcc=None):
+    """차트 div 슬롯 값 (+ svg 모드에서 데이터가 있으면 Plotly 스크립트 슬롯을 비움)"""
+    return {**fred_chart_slots(fred), **move_pcc_chart_slots(move_pcc)}
+
+
+def fred_chart_slots(fred=None):
+    """FRED 패널 div 슬롯 (svg 모드면 SVG + fred_script 비움)"""
+    v = {_chart_slot(c): chart_div(c) for c in FRED_PANELS}
+    if CHART_RENDER != "svg":
+        return v
+    import svgchart as sc
+    fred = fred or {}
+    if any((fred.get(k) or {}).get("x") for k in ("cpi", "core", "un", "ff", "d10", "d2")):
+        for cid, (lines, refs) in FRED_PANELS.items():
+            series = [{"name": name, "color": color, **(fred.get(k) or {})}
+                      for k, name, color in lines]
+            bands = inversion_bands(fred.get("d10") or {}, fred.get("d2") or {}) \
+                if cid == "fred3" else ()
+            v[_chart_slot(cid)] = chart_div(cid, sc.line_chart(
+                series, CHART_WIDTH, CHART_DIVS[cid], refs=refs, bands=bands, y_suffix="%",
+                label=" / ".join(name for _, name, _ in lines)))
+        v["fred_script"] = ""
+    return v
+
+
+def move_pcc_chart_slots(move_pcc=None):
+    """MOVE·PCC div 슬롯 (svg 모드면 SVG + move_pcc_script 비움)"""
+    v = {_chart_slot(c): chart_div(c) for c in ("chart-move", "chart-pcc")}
+    if CHART_RENDER != "svg":
+        return v
+    import svgchart as sc
+    mp = move_pcc or {}
+    if mp.get("move_dates") and mp.get("move_vals"):
+        xm = mp["move_dates"]
+        v["chart_move"] = chart_div("chart-move", sc.line_chart(
+            [{"name": "MOVE", "x": xm, "y": mp["move_vals"], "color": "#7c3aed", "kind": "area"}],
+            CHART_WIDTH, CHART_DIVS["chart-move"],
+            refs=[{"y": 100, "label": "위험구간 100", "color": "#ef4444"}], label="MOVE Index"))
+        if mp.get("pcc_vals"):
+            v["chart_pcc"] = chart_div("chart-pcc", sc.line_chart(
+                [{"name": "P/C", "x": mp.get("pcc_dates") or xm, "y": mp["pcc_vals"], "kind": "bar",
+                  "bar_color": lambda x: "rgba(239,68,68,0.75)" if x >= 1.0 else "rgba(59,130,246,0.65)"}],
+                CHART_WIDTH, CHART_DIVS["chart-pcc"], y_range=(0.6, 1.45),
+                refs=[{"y": 1.0, "label": "공포선 1.0", "color": "#ef4444", "dash": "4,3"}],
+                label="Put/Call Ratio"))
+        v["move_pcc_script"] = ""
+    return v
+
+
+# ───────────────────────────────────────────
+# 슬롯 템플릿 — 한 번 파싱해 (리터럴 조각 + 이름 붙은 슬롯)으로 캐시
+# ───────────────────────────────────────────
+# 각 슬롯은 (?P<slot>...) 그룹이 교체 구간인 정규식 목록. 컴파일 때만 스캔하고
+# 렌더는 슬롯 값을 끼워 한 번 join 한다. 값이 None이면 템플릿 기존 내용을
+# 유지하되 unbound로 보고한다 (조용히 남는 stale 내용 방지).
+
+DASHBOARD_SLOTS = [
+    # (이름, [패턴...], 여러 곳 매칭 여부, re 플래그)
+    ("date", [r'(?P<slot>\d{4}년 \d{2}월 \d{2}일 \([월화수목금토일]\))'], True, 0),
+    ("stale_notice", [r'<div class="stale-notice" id="stale-notice">(?P<slot>[^<]*)</div>'], False, 0),
+    ("briefing", [r'<div id="briefing-content">(?P<slot>[\s\S]*?)</div>\s*</div>\s*<!-- 3\.'], False, 0),
+    ("index_cards", [r'<!-- 3\. 주요 지수 카드[\s\S]*?<div class="cards">(?P<slot>[\s\S]*?)</div>\s*</div>\s*<!-- 4\.'], False, 0),
+    ("fx_cards", [r'subsection-label">환율</div>\s*<div class="cards">(?P<slot>[\s\S]*?)</div>\s*<div class="subsection-label"[^>]*>원자재'], False, 0),
+    ("commodity_cards", [r'원자재 — 가격 스냅샷</div>\s*<div class="cards">(?P<slot>[\s\S]*?)</div>\s*<div class="subsection-label"[^>]*>원자재 — TradingView'], False, 0),
+    ("gauge_cnn", [r"(?P<slot>drawGauge\('gauge-cnn',\s*\d+,\s*'[^']*'\))"], True, 0),
+    ("gauge_crypto", [r"(?P<slot>drawGauge\('gauge-crypto',\s*\d+,\s*'[^']*'\))"], True, 0),
+    ("cnn_history", [r'📺 CNN 공포탐욕지수.*?fg-history[^>]*>(?P<slot>\s*<span>어제.*?</span>\s*<span>지난주.*?</span>\s*<span>지난달.*?</span>)'], False, re.DOTALL),
+    ("crypto_history", [r'₿ 크립토 공포탐욕지수.*?fg-history[^>]*>(?P<slot>\s*<span>어제.*?</span>\s*<span>지난주.*?</span>\s*<span>지난달.*?</span>)'], False, re.DOTALL),
+    ("move_text", [r'ICE BofAML MOVE Index.*?현재 <strong[^>]*>(?P<slot>[\d.]+</strong>\s*[^|]*\|)'], False, 0),
+    ("pcc_text", [r'현재 <strong[^>]*>(?P<slot>[\d.]+</strong>\s*[^|]*\|)(?=(?:&nbsp;|\s)*1\.0 이상)'], False, 0),
+    ("move_pcc_script", [r"(?P<slot><script>\s*// ====== MOVE & PCC 차트 ======[\s\S]*?</script>)"], False, 0),
+    # FRED 스크립트 — 템플릿 원본 or 이전 생성 결과 모두 매칭
+    ("fred_script", [r'(?P<slot><script>\s*// ====== FRED 실시간 API[\s\S]+?loadFredData\(\);\s*</script>)',
+                     r"(?P<slot><script>\s*const fredCfg=\{[\s\S]+?Plotly\.newPlot\('fred3'[\s\S]+?\);\s*</script>)"], False, 0),
+    # TradingView 위젯 — 블록 제목 다음부터 블록 끝까지 (TV_CHARTS 그룹별)
+    ("widgets_index", [r'<!-- 4\. 지수 캔들차트 -->\s*<div class="block">\s*<div class="block-title">.*?</div>\n(?P<slot>[\s\S]*?)\n</div>'], False, 0),
+    ("widgets_commodity", [r'원자재 — TradingView 차트</div>\n(?P<slot>[\s\S]*?)\n</div>'], False, 0),
+    ("widgets_dxy", [r'<!-- 8\. DXY -->\s*<div class="block">\s*<div class="block-title">.*?</div>\n(?P<slot>[\s\S]*?)\n</div>'], False, 0),
+    ("widgets_coin", [r'<!-- 11\. 코인 캔들차트 -->\s*<div class="block">\s*<div class="block-title">.*?</div>\n(?P<slot>[\s\S]*?)\n</div>'], False, 0),
+    ("widgets_etf", [r'<!-- 13\. ETF·VIX -->\s*<div class="block">\s*<div class="block-title">.*?</div>\n(?P<slot>[\s\S]*?)\n</div>'], False, 0),
+    ("widgets_stock", [r'<!-- 14\. 종목 -->\s*<div class="block">\s*<div class="block-title">.*?</div>\n(?P<slot>[\s\S]*?)\n</div>'], False, 0),
+    ("widget_manifest", [r"(?P<slot>const TV_MANIFEST=.*?;)\n"], False, 0),
+    # 차트 컨테이너 div 전체 (svg 모드면 안에 SVG, 아니면 Plotly용 빈 div)
+    *[(_chart_slot(c), [rf'(?P<slot><div id="{c}"[^>]*>[\s\S]*?</div>)'], False, 0) for c in CHART_DIVS],
+]
+
+
+class SlotTemplate:
+    """템플릿 → [리터럴, 슬롯, 리터럴, ...] 조각 목록 (슬롯 자리는 이름으로 보관)"""
+
+    def __init__(self, src, specs):
+        spans = []                       # (start, end, name)
+        self.missing = []                # 앵커를 못 찾은 슬롯
+        for name, patterns, many, flags in specs:
+            found = []
+            for pat in patterns:
+                it = re.finditer(pat, src, flags)
+                found = [m.span("slot") for m in (it if many else [next(it, None)]) if m]
+                if found:
+                    break
+            if not found:
+                self.missing.append(name)
+            spans += [(a, b, name) for a, b in found]
+
+        # 다른 슬롯 안쪽에 걸린 매칭(예: 브리핑 본문 속 날짜)은 버림
+        spans.sort(key=lambda t: (t[0], -t[1]))
+        kept, end = [], -1
+        for a, b, name in spans:
+            if a >= end:
+                kept.append((a, b, name))
+                end = b
+
+        self.parts, self.slots, pos = [], [], 0   # slots: (parts 인덱스, 이름, 기본값)
+        for a, b, name in kept:
+            self.parts.append(src[pos:a])
+            self.slots.append((len(self.parts), name, src[a:b]))
+            self.parts.append(None)
+            pos = b
+        self.parts.append(src[pos:])
+        self.names = {name for _, name, _ in self.slots}
+        self.externalized = {}           # 자산 경로 접두 → 정적 블록을 뺀 사본 (asset_template)
+
+    def render(self, values):
+        """values {슬롯: 문자열|None} → (html, 바인딩 안 된 슬롯 목록)"""
+        parts = list(self.parts)
+        unbound = set(self.missing)
+        for i, name, default in self.slots:
+            v = values.get(name)
+            if v is None:
+                unbound.add(name)
+                v = default
+            parts[i] = v
+        return "".join(parts), sorted(unbound)
+
+
+_TEMPLATE_CACHE = {}
+
+
+def compile_template(src, specs=DASHBOARD_SLOTS):
+    """소스 문자열별 컴파일 결과 캐시 (대량 렌더 시 재스캔 없음)"""
+    key = (src, id(specs))
+    tpl = _TEMPLATE_CACHE.get(key)
+    if tpl is None:
+        if len(_TEMPLATE_CACHE) >= 8:
+            _TEMPLATE_CACHE.clear()
+        tpl = _TEMPLATE_CACHE[key] = SlotTemplate(src, specs)
+    return tpl
+
+
+def fg_slots(fg=None):
+    """공포탐욕 게이지·히스토리 슬롯 (실시간)"""
+    fg = fg or {}
+    v = {}
     cnn_val = fg.get("cnn", 50)
     cnn_label = fg.get("cnn_label", "Neutral")
-    cnn_prev = fg.get("cnn_prev", cnn_val)
-    cnn_week = fg.get("cnn_week", cnn_val)
-    cnn_month = fg.get("cnn_month", cnn_val)
     crypto_val = fg.get("crypto", 50)
     crypto_label = fg.get("crypto_label", "Neutral")
-    crypto_prev = fg.get("crypto_prev", crypto_val)
-    crypto_week = fg.get("crypto_week", crypto_val)
-    crypto_month = fg.get("crypto_month", crypto_val)
-
-    # CNN 게이지 값 + 라벨
-    h = re.sub(r"drawGauge\('gauge-cnn',\s*\d+,\s*'[^']*'\)",
-               f"drawGauge('gauge-cnn', {cnn_val}, '{cnn_label}')", h)
-    # Crypto 게이지 값 + 라벨
-    h = re.sub(r"drawGauge\('gauge-crypto',\s*\d+,\s*'[^']*'\)",
-               f"drawGauge('gauge-crypto', {crypto_val}, '{crypto_label}')", h)
-
-    # CNN 히스토리 (어제/지난주/지난달)
-    h = re.sub(
-        r'(📺 CNN 공포탐욕지수.*?fg-history[^>]*>)\s*<span>어제.*?</span>\s*<span>지난주.*?</span>\s*<span>지난달.*?</span>',
-        lambda m: m.group(1) +
-        f'\n        <span>어제 <strong style="color:#374151">{cnn_prev}</strong></span>'
-        f'\n        <span>지난주 <strong style="color:#374151">{cnn_week}</strong></span>'
-        f'\n        <span>지난달 <strong style="color:#374151">{cnn_month}</strong></span>',
-        h, flags=re.DOTALL)
-
-    # Crypto 히스토리 (어제/지난주/지난달)
-    h = re.sub(
-        r'(₿ 크립토 공포탐욕지수.*?fg-history[^>]*>)\s*<span>어제.*?</span>\s*<span>지난주.*?</span>\s*<span>지난달.*?</span>',
-        lambda m: m.group(1) +
-        f'\n        <span>어제 <strong style="color:#374151">{crypto_prev}</strong></span>'
-        f'\n        <span>지난주 <strong style="color:#374151">{crypto_week}</strong></span>'
-        f'\n        <span>지난달 <strong style="color:#374151">{crypto_month}</strong></span>',
-        h, flags=re.DOTALL)
-
-    # ── MOVE Index & Put/Call Ratio (실시간) ──
+    v["gauge_cnn"] = f"drawGauge('gauge-cnn', {cnn_val}, '{cnn_label}')"
+    v["gauge_crypto"] = f"drawGauge('gauge-crypto', {crypto_val}, '{crypto_label}')"
+
+    # 히스토리 (어제/지난주/지난달)
+    def hist(prev, week, month):
+        return (f'\n        <span>어제 <strong style="color:#374151">{prev}</strong></span>'
+                f'\n        <span>지난주 <strong style="color:#374151">{week}</strong></span>'
+                f'\n        <span>지난달 <strong style="color:#374151">{month}</strong></span>')
+    v["cnn_history"] = hist(fg.get("cnn_prev", cnn_val), fg.get("cnn_week", cnn_val),
+                            fg.get("cnn_month", cnn_val))
+    v["crypto_history"] = hist(fg.get("crypto_prev", crypto_val), fg.get("crypto_week", crypto_val),
+                               fg.get("crypto_month", crypto_val))
+    return v
+
+
+def move_pcc_slots(move_pcc=None):
+    """MOVE Index & Put/Call Ratio 텍스트·차트 슬롯 (실시간)"""
+    move_pcc = move_pcc or {}
+    v = {}
     mv_dates = move_pcc.get("move_dates", [])
     mv_vals = move_pcc.get("move_vals", [])
     mv_now = move_pcc.get("move_now", 0)
@@ -636,99 +2081,991 @@ def patch_html(src, mkt, fscript, briefing_html="", fg=None, move_pcc=None):
     pcc_now = move_pcc.get("pcc_now", 0)
     pcc_chg = move_pcc.get("pcc_chg", 0)
 
-    # MOVE 현재값 텍스트
+    v["move_text"] = None
     if mv_now:
         mv_arrow = "▲" if mv_chg >= 0 else "▼"
-        h = re.sub(
-            r'(ICE BofAML MOVE Index.*?현재 <strong[^>]*>)[\d.]+</strong>\s*[^|]*\|',
-            f'\\g<1>{mv_now}</strong> &nbsp;{mv_arrow} {mv_chg:+.1f} 전일比 &nbsp;|',
-            h)
-    # Put/Call 현재값 텍스트
+        v["move_text"] = f'{mv_now}</strong> &nbsp;{mv_arrow} {mv_chg:+.1f} 전일比 &nbsp;|'
+    v["pcc_text"] = None
     if pcc_now:
         pcc_arrow = "▲" if pcc_chg >= 0 else "▼"
-        h = re.sub(
-            r'(현재 <strong[^>]*>)[\d.]+</strong>\s*[^|]*\|\s*1\.0 이상',
-            f'\\g<1>{pcc_now}</strong> &nbsp;{pcc_arrow} {pcc_chg:+.2f} &nbsp;| 1.0 이상',
-            h)
+        v["pcc_text"] = f'{pcc_now}</strong> &nbsp;{pcc_arrow} {pcc_chg:+.2f} &nbsp;|'
 
-    # MOVE & PCC 차트 데이터 (JS 배열 교체)
+    # MOVE & PCC 차트 스크립트 — 일간 해상도에선 두 시리즈 날짜가 달라 x축 분리
+    v["move_pcc_script"] = None
     if mv_dates and mv_vals:
-        mv_d_js = json.dumps(mv_dates)
-        mv_v_js = json.dumps(mv_vals)
-        h = re.sub(r"const xm=\[.*?\];\s*const mv=\[.*?\];\s*const pcc=\[.*?\];",
-                   f"const xm={mv_d_js};\nconst mv={mv_v_js};\nconst pcc={json.dumps(pcc_vals if pcc_vals else [0]*len(mv_vals))};",
-                   h)
+        xp = pcc_dates if pcc_vals and pcc_dates else mv_dates
+        pv = pcc_vals if pcc_vals else [0]*len(mv_vals)
+        v["move_pcc_script"] = "<script>\n" + move_pcc_js(mv_dates, mv_vals, pv, xp) + "\n</script>"
+    v.update(move_pcc_chart_slots(move_pcc))
+    return v
+
+
+def fred_slots(fscript, fred=None):
+    """FRED 스크립트·패널 슬롯"""
+    v = {"fred_script": '<script>\n' + fscript + '\n</script>' if fscript else None}
+    v.update(fred_chart_slots(fred))
+    return v
+
+
+def stale_notice(stale=None):
+    """지연 데이터 알림 — {문구: 기준 시각} (오늘이면 시:분, 아니면 월/일). 없으면 빈 문자열"""
+    if not stale:
+        return {"stale_notice": ""}
+    today = run_clock().now.date()
+    parts = []
+    for label, ts in sorted(stale.items(), key=lambda kv: kv[1]):
+        t = datetime.fromtimestamp(ts, KST)
+        parts.append(f"{label} {t:%H:%M}" if t.date() == today else f"{label} {t:%m/%d}")
+    return {"stale_notice": f"⚠️ 지연 데이터 — {' · '.join(parts)} 기준 값입니다 (갱신 실패)"}
+
+
+def dashboard_slots(mkt, fscript, briefing_html="", fg=None, move_pcc=None, fred=None):
+    """수집 데이터 → 대시보드 슬롯 값 (데이터 없는 슬롯은 None)
+
+    fred: fred_fit 결과 {이름: {"x","y"}} — svg 차트 모드에서 FRED 패널을 그릴 때 사용"""
+    v = {"date": run_clock().today_str, "briefing": briefing_html or None}
+    v.update(card_slots(mkt))             # 지수·원자재·환율 카드
+    v.update(fg_slots(fg))
+    v.update(move_pcc_slots(move_pcc))
+    v.update(fred_slots(fscript, fred))
+    v.update(widget_slots())
+    v.update(stale_notice(stale_sources()))
+    return v
+
+
+def patch_html(src, mkt, fscript, briefing_html="", fg=None, move_pcc=None, fred=None, out=None):
+    """템플릿 HTML에서 동적 슬롯만 교체 — format() 절대 사용 안함
+
+    바인딩되지 않은 슬롯(데이터 없음·앵커 없음)은 기존 내용을 유지하고 경고한다.
+    out: 출력 경로 — DASHBOARD_ASSETS면 정적 CSS·JS를 그 위치 기준 자산 참조로 바꾼다."""
+    tpl = asset_template(compile_template(src), out)
+    html, unbound = tpl.render(dashboard_slots(mkt, fscript, briefing_html, fg, move_pcc, fred))
+    if unbound:
+        print(f"  ⚠️ 템플릿 슬롯 미바인딩 (기존 내용 유지): {', '.join(unbound)}")
+    return html
 
-    # FRED 스크립트 (템플릿 원본 or 이전 생성 결과 모두 매칭)
-    h = re.sub(r'<script>\s*// ====== FRED 실시간 API[\s\S]+?loadFredData\(\);\s*</script>',
-               '<script>\n' + fscript + '\n</script>', h)
-    h = re.sub(r'<script>\s*const fredCfg=\{[\s\S]+?Plotly\.newPlot\(\'fred3\'[\s\S]+?\);\s*</script>',
-               '<script>\n' + fscript + '\n</script>', h)
 
-    return h
+# ───────────────────────────────────────────
+# 분할 출력 — 고정 셸 + 일별 데이터 (DASHBOARD_SPLIT=1)
+# ───────────────────────────────────────────
+# docs/index.html 은 템플릿 리터럴 조각과 로더만 담은 셸이라 템플릿이 바뀔 때만 달라지고
+# (장기 캐시 가능), 그날의 값은 docs/data.json 하나에 담긴다. 차트 시리즈는 날짜 간격과
+# 정수 스케일 값의 델타로 인코딩(pack_series)하고, 로더가 풀어 window.S 에 둔 뒤
+# 조각을 이어 파싱해 #app 에 넣고 스크립트를 문서 순서대로 다시 실행한다 (document.write 없음).
+# 둘 다 .gz (+ brotli 설치 시 .br) 사전 압축본을 같이 쓴다. JS가 꺼졌거나 데이터를 못 받으면
+# 같은 날 통째로 렌더한 docs/full.html 로 안내한다.
+
+DASHBOARD_SPLIT = os.environ.get("DASHBOARD_SPLIT", "").lower() not in ("", "0", "false")
+SPLIT_DATA_FILE = "data.json"
+SPLIT_FULL_FILE = "full.html"     # 정적 대체 페이지 (patch_html 전체 렌더)
+
+SHELL_HTML = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Market Sentinel</title>
+</head>
+<body>
+<div id="app"></div>
+<noscript><p style="padding:24px;font-family:sans-serif">JavaScript가 꺼져 있어 대시보드를 그릴 수 없습니다 — <a href="/*FULL*/">정적 전체 페이지 보기</a></p></noscript>
+<script>
+const P=/*PARTS*/;
+function unpack(p){
+  if(!p)return{x:[],y:[]};
+  if(p.x)return p;
+  const f=10**p.k,x=[p.x0],y=[];let v=0;
+  for(const d of p.y){v+=d;y.push(v/f)}
+  if(p.t==='m'){let m=+p.x0.slice(0,4)*12+(+p.x0.slice(5,7))-1;
+    for(const d of p.dx){m+=d;x.push(Math.floor(m/12)+'-'+String(m%12+1).padStart(2,'0'))}}
+  else{let t=Date.parse(p.x0+'T00:00:00Z');
+    for(const d of p.dx){t+=d*864e5;x.push(new Date(t).toISOString().slice(0,10))}}
+  return{x,y}}
+function run(old){
+  // 파싱해 옮긴 스크립트는 실행되지 않으므로 새로 만들어 교체 — async 없는 외부 스크립트는
+  // 로드를 기다려 파서와 같은 순서를 지킨다
+  const s=document.createElement('script');
+  for(const a of old.attributes)s.setAttribute(a.name,a.value);
+  s.textContent=old.textContent;
+  let done=null;
+  if(s.src&&!old.hasAttribute('async')){s.async=false;done=new Promise(ok=>{s.onload=s.onerror=ok})}
+  old.replaceWith(s);
+  return done;
+}
+async function mount(h){
+  const doc=new DOMParser().parseFromString(h,'text/html'),app=document.getElementById('app');
+  document.title=doc.title;
+  doc.head.querySelector('title')?.remove();
+  for(const a of doc.body.attributes)document.body.setAttribute(a.name,a.value);
+  document.head.append(...doc.head.childNodes);
+  app.append(...doc.body.childNodes);
+  for(const s of [...document.head.querySelectorAll('script'),...app.querySelectorAll('script')])await run(s);
+  document.dispatchEvent(new Event('DOMContentLoaded'));
+  window.dispatchEvent(new Event('load'));
+}
+fetch('/*DATA*/',{cache:'no-cache'}).then(r=>{if(!r.ok)throw new Error(r.status);return r.json()}).then(D=>Promise.all(
+  Object.entries(D.f||{}).map(([k,u])=>fetch(u).then(r=>r.text()).then(t=>{D.v[k]=t}))).then(()=>D)
+).then(D=>{
+  const S=window.S={};for(const k in D.s)S[k]=unpack(D.s[k]);
+  return mount(P.map(p=>typeof p==='string'?p:(D.v[p[0]]??p[1])).join(''));
+}).catch(e=>{
+  const app=document.getElementById('app'),p=document.createElement('p'),a=document.createElement('a');
+  p.style.cssText='padding:24px;font-family:sans-serif';
+  p.textContent='데이터를 불러오지 못했습니다 ('+e+') — ';
+  a.href='/*FULL*/';a.textContent='정적 전체 페이지 보기';
+  p.append(a);app.replaceChildren(p);
+});
+</script>
+</body>
+</html>
+"""
 
 
-# ═══════════════════════════════════════════
-# 엔트리포인트
-# ═══════════════════════════════════════════
+def _decimals(ys, max_k=6):
+    """모든 값을 정수로 만드는 최소 소수 자릿수"""
+    for k in range(max_k + 1):
+        f = 10 ** k
+        if all(abs(v * f - round(v * f)) < 1e-6 for v in ys):
+            return k
+    return max_k
 
-def main():
-    print(f"START {TODAY_STR}")
 
-    # ① Claude API 브리핑 생성
-    briefing_html = ""
-    try:
-        briefing_md = generate()
-        briefing_html = briefing_to_html(briefing_md)
-        print("  📝 브리핑 HTML 변환 완료")
-    except Exception as e:
-        print(f"  ⚠️ 브리핑 생성 오류: {e}")
-        briefing_html = f'<p style="color:#ef4444">브리핑 생성 실패: {e}</p>'
+def pack_series(xy):
+    """{"x": 날짜 문자열, "y": 값} → {"t": d|m, "x0", "dx": 간격, "k": 소수 자릿수, "y": 정수 델타}
 
-    # ② yfinance 시장 데이터
+    일간('YYYY-MM-DD')은 일 수, 월간('YYYY-MM')은 개월 수 간격. 그 밖의 형식은 그대로 둔다."""
+    xs, ys = xy.get("x") or [], xy.get("y") or []
+    if not xs:
+        return None
     try:
-        mkt = fetch_market()
-        print("  📊 yfinance ok")
-    except Exception as e:
-        print(f"  ⚠️ market err: {e}"); mkt = {}
+        if all(len(x) == 7 for x in xs):
+            t, ords = "m", [int(x[:4]) * 12 + int(x[5:7]) - 1 for x in xs]
+        else:
+            t, ords = "d", [datetime.strptime(x, "%Y-%m-%d").toordinal() for x in xs]
+    except ValueError:
+        return {"x": xs, "y": ys}
+    k = _decimals(ys)
+    iv = [round(v * 10 ** k) for v in ys]
+    return {"t": t, "x0": xs[0], "dx": [b - a for a, b in zip(ords, ords[1:])],
+            "k": k, "y": iv[:1] + [b - a for a, b in zip(iv, iv[1:])]}
+
+
+def split_payload(values, fred=None, move_pcc=None):
+    """슬롯 값 → data.json 객체 {"v": 슬롯 값, "s": 인코딩 시리즈}
+
+    Plotly 차트 스크립트 슬롯(move_pcc_script, fred_script)은 S.* 를 참조하는 고정 코드로 바꾼다.
+    svg 모드처럼 스크립트 슬롯이 비어 있으면 시리즈를 싣지 않는다."""
+    v, series = dict(values), {}
+    mp = move_pcc or {}
+    if v.get("move_pcc_script") and mp.get("move_dates") and mp.get("move_vals"):
+        pv = mp.get("pcc_vals") or [0] * len(mp["move_vals"])
+        xp = mp["pcc_dates"] if mp.get("pcc_vals") and mp.get("pcc_dates") else mp["move_dates"]
+        series["move"] = pack_series({"x": mp["move_dates"], "y": mp["move_vals"]})
+        series["pcc"] = pack_series({"x": xp, "y": pv})
+        v["move_pcc_script"] = "<script>\n" + move_pcc_js(*(None,) * 4, ref="S") + "\n</script>"
+    if v.get("fred_script") and fred:
+        for k, xy in fred.items():
+            series[k] = pack_series(xy)
+        v["fred_script"] = "<script>\n" + fred_js(*(None,) * 6, ref="S") + "\n</script>"
+    return {"v": v, "s": series}
+
+
+def shell_html(tpl, data_file=SPLIT_DATA_FILE, full_file=SPLIT_FULL_FILE):
+    """컴파일된 템플릿 → 셸 HTML (템플릿이 같으면 바이트 동일)"""
+    parts = list(tpl.parts)
+    for i, name, default in tpl.slots:
+        parts[i] = [name, default]
+    return (SHELL_HTML.replace("/*PARTS*/", script_json(parts)).replace("/*DATA*/", data_file)
+            .replace("/*FULL*/", full_file))
+
+
+def split_html(src, mkt, fscript, briefing_html="", fg=None, move_pcc=None, fred=None, out=None):
+    """분할 출력 → (셸 HTML, data.json 문자열)"""
+    tpl = asset_template(compile_template(src), out)
+    values = dashboard_slots(mkt, fscript, briefing_html, fg, move_pcc, fred)
+    data = asset_fragments(split_payload(values, fred, move_pcc), out)
+    unbound = sorted(set(tpl.missing) | {n for n in tpl.names
+                                         if data["v"].get(n) is None and n not in data.get("f", ())})
+    if unbound:
+        print(f"  ⚠️ 템플릿 슬롯 미바인딩 (기존 내용 유지): {', '.join(unbound)}")
+    return shell_html(tpl), json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def write_changed(path, data: bytes):
+    """assets.write_changed + 건너뛴 출력 수(output.unchanged) 집계 → 기록 여부"""
+    if assets.write_changed(path, data):
+        return True
+    METRICS.incr("output.unchanged")
+    return False
+
+
+def write_precompressed(path, data: bytes):
+    """path 와 .gz (+ .br) 사전 압축본 — 내용이 같으면 그대로 두고 False"""
+    path = Path(path)
+    if not write_changed(path, data):
+        return False
+    assets.write_atomic(path.with_name(path.name + ".gz"), gzip.compress(data, 9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    if brotli is not None:
+        assets.write_atomic(path.with_name(path.name + ".br"), brotli.compress(data, quality=11))
+    return True
+
 
-    # ③ FRED 경제지표
+# ───────────────────────────────────────────
+# 콘텐츠 주소 출력 — 공통 CSS·JS·브리핑 조각을 해시 파일로 (DASHBOARD_ASSETS=1)
+# ───────────────────────────────────────────
+# 템플릿 리터럴 조각 안의 정적 <style>·<script> 블록(슬롯이 없는 것)은 docs/assets/{해시}.css|js
+# 로 한 번만 쓰고 페이지는 참조만 한다 — 메인·변형·분할 셸·인트라데이 모두 같은 파일을 공유.
+# 분할 출력이면 ASSET_FRAGMENTS 슬롯 값(브리핑)도 해시 조각으로 빼서 data.json엔 경로만 남긴다.
+# 그날 값(카드·게이지·차트)은 인라인 그대로 — 새로 커밋되는 바이트는 실제로 바뀐 내용뿐이다.
+# 더 이상 참조되지 않는 옛 해시 파일은 지우지 않는다(정리 없음) — 템플릿이 바뀔 때마다 쌓인다.
+
+DASHBOARD_ASSETS = os.environ.get("DASHBOARD_ASSETS", "").lower() not in ("", "0", "false")
+ASSET_DIR = "docs/assets"
+ASSET_FRAGMENTS = ("briefing",)
+_ASSET_STORES = {}
+_ASSET_LOCK = threading.Lock()
+
+
+def asset_store(root=ASSET_DIR):
+    with _ASSET_LOCK:
+        store = _ASSET_STORES.get(root)
+        if store is None:
+            store = _ASSET_STORES[root] = assets.AssetStore(root, compress=DASHBOARD_SPLIT)
+        return store
+
+
+def asset_template(tpl, out):
+    """out 위치 기준으로 정적 블록을 자산 참조로 바꾼 템플릿 사본 (비활성·out 없음이면 tpl)"""
+    if not DASHBOARD_ASSETS or out is None:
+        return tpl
+    base = assets.relative_base(ASSET_DIR, out)
+    ext = tpl.externalized.get(base)
+    if ext is None:
+        store = asset_store()
+        ext = copy.copy(tpl)
+        ext.parts = [p if p is None else assets.externalize(p, store, base) for p in tpl.parts]
+        ext.externalized = {}
+        tpl.externalized[base] = ext
+    return ext
+
+
+def asset_fragments(data, out):
+    """split_payload 결과의 ASSET_FRAGMENTS 슬롯 → 해시 조각 경로 data["f"] (로더가 받아 끼움)"""
+    if not DASHBOARD_ASSETS or out is None:
+        return data
+    base, store = assets.relative_base(ASSET_DIR, out), asset_store()
+    for slot in ASSET_FRAGMENTS:
+        v = data["v"].get(slot)
+        if v and len(v) >= assets.MIN_BYTES:
+            data.setdefault("f", {})[slot] = base + store.put(v, "html")
+            data["v"][slot] = None
+    return data
+
+
+def _asset_report():
+    """새로 쓴 자산 바이트를 출력량에 더하고 로그 꼬리(새로 쓴·재사용 자산 수)를 만든 뒤 집계 초기화"""
+    store = _ASSET_STORES.get(ASSET_DIR)
+    if store is None:
+        return ""
+    METRICS.incr("output.bytes", store.bytes_written)
+    note = f" | 자산 새로 {store.written}개 ({store.bytes_written:,} bytes)·재사용 {store.reused}개"
+    store.written = store.reused = store.bytes_written = 0
+    return note
+
+
+# ───────────────────────────────────────────
+# 다중 변형 렌더 — 한 번 수집한 데이터로 N개 페이지 (RENDER_VARIANTS)
+# ───────────────────────────────────────────
+# RENDER_VARIANTS: 변형 목록 JSON 파일
+#   [{"name": "fx-desk", "template": "templates/dashboard.html", "out": "docs/fx-desk.html",
+#     "cards": {"index_cards": [["USD/KRW", "KRW"], ["TSMC", "TSM", "$", 2]]},
+#     "widgets": {"stock": [["tv-tsm", "TSMC", "NYSE:TSM", 400]]}}, ...]
+# template·out 생략 시 기본 템플릿·docs/<name>.html. cards 키는 CARD_SETS 슬롯이고
+# SYMS에 없는 키는 yfinance 티커로 보고 OHLC 다운로드에 합친다. widgets는 TV_CHARTS 그룹 교체.
+# 공통 슬롯(브리핑·차트·게이지)은 부모에서 한 번 계산해 워커 초기화 때 한 번만 넘기고,
+# 워커는 변형별 카드·위젯 슬롯만 만들어 (템플릿별 컴파일 캐시로) 렌더·기록한다.
+
+RENDER_VARIANTS = os.environ.get("RENDER_VARIANTS", "")
+# 1 = 현재 프로세스에서 직렬 렌더(기본), N>1 = 프로세스 풀, 0 = CPU 수.
+# bench.py 300개 기준 직렬 ~0.16s(변형당 ~0.5ms) vs 풀 ~0.55s — spawn + import 비용이
+# 렌더 시간보다 커서 풀은 변형 수천 개·다코어에서나 이득. 측정해 보고 켤 것.
+VARIANT_WORKERS = int(os.environ.get("VARIANT_WORKERS", "1"))
+DEFAULT_TEMPLATE = "templates/dashboard.html"
+
+
+def load_variants(path=None):
+    """변형 목록 JSON → 정규화된 dict 목록 (파일 미지정이면 [])"""
+    path = path or RENDER_VARIANTS
+    if not path:
+        return []
+    specs = []
+    for v in json.loads(Path(path).read_text(encoding="utf-8")):
+        name = v["name"]
+        cards = {}
+        for slot, items in (v.get("cards") or {}).items():
+            if slot not in CARD_SETS:
+                print(f"  ⚠️ 변형 {name}: 알 수 없는 카드 슬롯 {slot!r} (무시)")
+                continue
+            cards[slot] = [tuple(c) for c in items]
+        widgets = {}
+        for group, items in (v.get("widgets") or {}).items():
+            if group not in TV_CHARTS:
+                print(f"  ⚠️ 변형 {name}: 알 수 없는 위젯 그룹 {group!r} (무시)")
+                continue
+            widgets[group] = [tuple(w) for w in items]
+        specs.append({"name": name, "template": v.get("template") or DEFAULT_TEMPLATE,
+                      "out": v.get("out") or f"docs/{name}.html",
+                      "cards": cards, "widgets": widgets})
+    return specs
+
+
+def variant_tickers(specs):
+    """변형 카드 중 SYMS 밖의 티커 (등장 순서, 중복 제거)"""
+    keys = (key for v in specs for items in v["cards"].values() for _, key, *_ in items)
+    return list(dict.fromkeys(k for k in keys if k not in SYMS))
+
+
+_VARIANT_BUNDLE = None
+
+
+def _variant_init(bundle):
+    """워커 초기화 — 공통 슬롯 값·시세·기본 위젯 그룹을 한 번만 받아 둔다"""
+    global _VARIANT_BUNDLE
+    _VARIANT_BUNDLE = bundle
+
+
+def render_variant(spec):
+    """변형 하나 렌더·기록 → (이름, 출력 경로, 바이트 수, 미바인딩 슬롯)"""
+    b = _VARIANT_BUNDLE
+    values = dict(b["values"])
+    if spec["cards"]:
+        values.update(card_slots(b["mkt"], spec["cards"]))
+    if spec["widgets"]:
+        values.update(widget_slots({**b["groups"], **spec["widgets"]}))
+    out = Path(spec["out"])
+    tpl = asset_template(compile_template(Path(spec["template"]).read_text(encoding="utf-8")), out)
+    html, unbound = tpl.render(values)
+    data = html.encode("utf-8")
+    write_changed(out, data)
+    return spec["name"], str(out), len(data), tuple(unbound)
+
+
+def render_variants(specs, values, mkt, workers=None):
+    """공통 슬롯 값 + 시세 → 변형 페이지들 (workers > 1이면 프로세스 풀) → 결과 목록
+
+    spawn 컨텍스트 — 부모는 스테이지 스레드가 도는 중이라 fork는 쓰지 않는다.
+    결과 순서는 specs 순서와 같다."""
+    bundle = {"values": values, "mkt": mkt, "groups": widget_groups()}
+    workers = workers or VARIANT_WORKERS or os.cpu_count() or 1
+    if workers == 1 or len(specs) <= 1:
+        _variant_init(bundle)
+        return [render_variant(v) for v in specs]
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    workers = min(workers, len(specs))
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_variant_init, initargs=(bundle,)) as pool:
+        return list(pool.map(render_variant, specs,
+                             chunksize=max(1, len(specs) // (workers * 4))))
+
+
+# ═══════════════════════════════════════════
+# PART D — 수집 오케스트레이터 (의존성 그래프 + 소스별 데드라인)
+# ═══════════════════════════════════════════
+
+class Stage:
+    """오케스트레이터 실행 단위 — deps 결과를 인자로 fn 호출
+
+    deadline: 시작 후 허용 시간(초). 초과하면 더 기다리지 않고 fallback 사용
+              (REQUIRED가 아니면 실행 예산 마감도 데드라인)
+    fallback: 예외·타임아웃 시 값 (callable이면 fallback(e) 결과).
+              REQUIRED면 예외를 그대로 올림
+    lkg:      성공 결과를 마지막 정상값으로 저장하고, 실패하면 fallback보다 먼저 그 값을
+              지연 데이터로 표시해 사용 (fn은 실패를 삼키지 말고 예외로 올려야 복원된다)
+    """
+    REQUIRED = object()
+
+    def __init__(self, name, fn, deps=(), deadline=None, fallback=REQUIRED, lkg=False):
+        self.name, self.fn, self.deps = name, fn, tuple(deps)
+        self.deadline, self.fallback, self.lkg = deadline, fallback, lkg
+
+    def recover(self, err):
+        if self.lkg:
+            value, saved_at = lkg_load(self.name)
+            if value is not None:
+                print(f"  ♻️ {self.name} — 마지막 정상값 사용 "
+                      f"({datetime.fromtimestamp(saved_at, KST):%m/%d %H:%M})")
+                mark_stale(self.name, saved_at)
+                return value
+        if self.fallback is Stage.REQUIRED:
+            raise err
+        return self.fallback(err) if callable(self.fallback) else self.fallback
+
+    def keep(self, value, as_of=None):
+        """성공 결과 → 마지막 정상값 저장. as_of: 지난 값이 섞였으면 그중 가장 오래된 기준 시각
+
+        지난 값도 없어 기본값(50·Neutral 등)이 남은 결과("missing")는 저장하지 않는다 —
+        다음 실패 때 그 가짜 값이 지연 데이터로 복원되지 않도록."""
+        if self.lkg and not (isinstance(value, dict) and value.get("missing")):
+            lkg_save(self.name, value, as_of)
+
+
+def _run_stage(stage, args):
+    _STALE_LOCAL.marks = []
+    with METRICS.span(f"stage {stage.name}"):
+        value = stage.fn(*args)
+    stage.keep(value, min(_STALE_LOCAL.marks, default=None))
+    return value
+
+
+def run_stages(stages, max_workers=8, done=None):
+    """의존성이 충족된 단계부터 스레드풀에서 동시 실행 → {이름: 결과}
+
+    done: 이미 가진 단계 결과 {이름: 값} — 다시 돌리지 않는 의존성 (인트라데이 모드)
+    데드라인을 넘긴 스레드는 강제 종료할 수 없으므로 결과만 버린다
+    (각 fetch의 requests timeout이 최종 상한)."""
+    done = dict(done or {})
+    names = {s.name for s in stages} | set(done)
+    for s in stages:
+        missing = [d for d in s.deps if d not in names]
+        if missing:
+            raise ValueError(f"stage {s.name!r}: unknown deps {missing}")
+
+    results, running, pending = done, {}, list(stages)
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage")
     try:
-        cpi = fred_yoy("CPIAUCSL"); core = fred_yoy("CPILFESL")
-        un = fred_get("UNRATE"); ff = fred_get("FEDFUNDS")
-        d10 = fred_get("DGS10"); d2 = fred_get("DGS2")
+        while pending or running:
+            for s in [s for s in pending if all(d in results for d in s.deps)]:
+                pending.remove(s)
+                fut = pool.submit(_run_stage, s, [results[d] for d in s.deps])
+                limit = time.monotonic() + s.deadline if s.deadline else None
+                if s.fallback is not Stage.REQUIRED and budget_left() != float("inf"):
+                    end = time.monotonic() + budget_left()
+                    limit = end if limit is None else min(limit, end)
+                running[fut] = (s, limit)
+            if not running:
+                raise ValueError(f"stage dependency cycle: {[s.name for s in pending]}")
+
+            limits = [t for _, t in running.values() if t is not None]
+            timeout = max(0.0, min(limits) - time.monotonic()) if limits else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for fut in done:
+                s, _ = running.pop(fut)
+                try:
+                    results[s.name] = fut.result()
+                except Exception as e:
+                    if s.fallback is not Stage.REQUIRED:
+                        print(f"  ⚠️ {s.name} err: {e}")
+                    results[s.name] = s.recover(e)
+
+            t_now = time.monotonic()
+            for fut, (s, limit) in list(running.items()):
+                if limit is not None and t_now >= limit:
+                    running.pop(fut)
+                    fut.cancel()
+                    print(f"  ⏱ {s.name} 데드라인 초과"
+                          f"{f' ({s.deadline}s)' if s.deadline else ' (실행 예산)'} — 대체값 사용")
+                    METRICS.incr("stage.deadline_exceeded")
+                    results[s.name] = s.recover(TimeoutError(f"{s.name} deadline"))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+# ───────────────────────────────────────────
+# 파이프라인 단계
+# ───────────────────────────────────────────
+
+def _stage_briefing():
+    doc = generate_briefing()          # 섹션별 HTML은 도착하는 대로 이미 변환됨
+    print(f"  📝 브리핑 HTML 변환 완료 ({len(doc.md)}개 섹션)")
+    return doc
+
+
+def _briefing_failed(err):
+    """briefing 단계 fallback — 마지막 완성 브리핑 + 안내 (없으면 오류 문단만). 아카이브하지 않음"""
+    doc = BriefingSections()
+    doc.stale = True
+    md, saved_at = lkg_load("briefing")
+    if md:
+        doc.feed(md)
+        doc.close()
+        when = datetime.fromtimestamp(saved_at, KST)
+        doc.html.insert(0, f'<p style="color:#b45309">⚠️ 오늘 브리핑 생성 실패 ({type(err).__name__})'
+                           f' — {when:%m월 %d일 %H:%M} 브리핑을 표시합니다.</p>')
+        mark_stale("briefing", saved_at)
+        return doc
+    doc.html.append(f'<p style="color:#ef4444">브리핑 생성 실패: {err}</p>')
+    return doc
+
+
+def _stage_ohlc(extra=()):
+    store = market_store(extra)
+    print(f"  🗄 OHLC 저장소 {store.count():,}봉 (~{store.latest()})")
+    return store
+
+
+def _ohlc_failed(err):
+    """갱신 실패·데드라인 — 저장된 봉 그대로 (잠금 없이 새 연결). 저장분도 없으면 빈 메모리 저장소"""
+    import marketstore
+    path = _ohlc_path()
+    store = marketstore.OHLCStore(path if path and path.exists() else None)
+    last = store.latest()
+    if last:
+        print(f"  ♻️ OHLC 갱신 실패 — 저장된 {last}까지 사용 ({err})")
+        mark_stale("yf_ohlc", day_ts(last))
+    else:
+        print(f"  ⚠️ OHLC 저장소 없음: {err}")
+    return store
+
+
+def _stage_market(store, extra=()):
+    mkt = fetch_market(store, extra)
+    print("  📊 yfinance ok")
+    return mkt
+
+
+def _stage_fred_js(cpi, core, un, ff, d10, d2):
+    with METRICS.span("transform fred_js") as a:
         fscript = fred_js(cpi, core, un, ff, d10, d2)
-        print("  📈 FRED ok")
-    except Exception as e:
-        print(f"  ⚠️ fred err: {e}"); fscript = "// no fred"
+        a["bytes"] = len(fscript)
+    print("  📈 FRED ok")
+    return fscript
 
-    # ④ 실시간 지표: 공포탐욕 / MOVE·Put/Call
-    try:
-        fg_data = fetch_fear_greed()
-        print(f"  😱 공포탐욕 ok — CNN:{fg_data['cnn']} Crypto:{fg_data['crypto']}")
-    except Exception as e:
-        print(f"  ⚠️ 공포탐욕 err: {e}"); fg_data = {}
 
-    try:
-        move_pcc_data = fetch_move_pcc()
-        print(f"  📉 MOVE:{move_pcc_data.get('move_now',0)} PCC:{move_pcc_data.get('pcc_now',0)}")
-    except Exception as e:
-        print(f"  ⚠️ MOVE/PCC err: {e}"); move_pcc_data = {}
+def _stage_fear_greed():
+    fg_data = fetch_fear_greed()
+    print(f"  😱 공포탐욕 ok — CNN:{fg_data['cnn']} Crypto:{fg_data['crypto']}")
+    return fg_data
+
+
+def _stage_move_pcc(store):
+    move_pcc_data = fetch_move_pcc(store)
+    print(f"  📉 MOVE:{move_pcc_data.get('move_now',0)} PCC:{move_pcc_data.get('pcc_now',0)}")
+    return move_pcc_data
+
 
-    # ⑤ 템플릿 패치 → docs/index.html (브리핑 + 카드 + 차트 + 실시간지표)
+def _stage_render(briefing, mkt, fscript, fg_data, move_pcc_data, fred_data):
+    """템플릿 패치 → docs/index.html (브리핑 + 카드 + 차트 + 실시간지표)
+
+    DASHBOARD_SPLIT이면 고정 셸 docs/index.html + 일별 docs/data.json (사전 압축본 포함)"""
     tmpl_path = Path("templates/dashboard.html")
-    if tmpl_path.exists():
-        src = tmpl_path.read_text(encoding="utf-8")
-        html = patch_html(src, mkt, fscript, briefing_html,
-                          fg=fg_data, move_pcc=move_pcc_data)
-        out = Path("docs/index.html")
-        out.parent.mkdir(exist_ok=True)
-        out.write_text(html, encoding="utf-8")
-        print(f"  ✅ 대시보드 완료 {len(html):,} bytes → {out}")
-    else:
+    if not tmpl_path.exists():
         print("  ❌ templates/dashboard.html 없음 — 대시보드 스킵")
+        return None
+    src = tmpl_path.read_text(encoding="utf-8")
+    with METRICS.span("transform briefing_to_html", chars=len(briefing.markdown),
+                      sections=len(briefing.md)):
+        briefing_html = briefing.to_html()
+    if DASHBOARD_SPLIT:
+        return _render_split(src, briefing_html, mkt, fscript, fg_data, move_pcc_data, fred_data)
+    out = Path("docs/index.html")
+    with METRICS.span("render patch_html") as a:
+        html = patch_html(src, mkt, fscript, briefing_html,
+                          fg=fg_data, move_pcc=move_pcc_data, fred=fred_data, out=out)
+        a["bytes"] = len(html.encode("utf-8"))
+    with METRICS.span("write index.html"):
+        changed = write_changed(out, html.encode("utf-8"))
+    if changed:
+        METRICS.incr("output.bytes", a["bytes"])
+    print(f"  ✅ 대시보드 완료 {len(html):,} bytes{'' if changed else ' (변경 없음)'}"
+          f"{_asset_report()} → {out}")
+    return out
+
+
+def _render_split(src, briefing_html, mkt, fscript, fg_data, move_pcc_data, fred_data):
+    out = Path("docs/index.html")
+    with METRICS.span("render split_html") as a:
+        shell, data = split_html(src, mkt, fscript, briefing_html, fg=fg_data,
+                                 move_pcc=move_pcc_data, fred=fred_data, out=out)
+        shell, data = shell.encode("utf-8"), data.encode("utf-8")
+        a.update(shell_bytes=len(shell), data_bytes=len(data))
+        full = patch_html(src, mkt, fscript, briefing_html, fg=fg_data, move_pcc=move_pcc_data,
+                          fred=fred_data, out=out)
+    with METRICS.span("write split"):
+        changed = write_precompressed(out, shell)
+        data_changed = write_precompressed(out.with_name(SPLIT_DATA_FILE), data)
+        write_changed(out.with_name(SPLIT_FULL_FILE), full.encode("utf-8"))
+    METRICS.incr("output.bytes", (len(data) if data_changed else 0) + (len(shell) if changed else 0))
+    print(f"  ✅ 대시보드 완료 — 셸 {len(shell):,} bytes{'' if changed else ' (변경 없음)'}"
+          f" + 데이터 {len(data):,} bytes (gz {len(gzip.compress(data, 9, mtime=0)):,})"
+          f"{'' if data_changed else ' (변경 없음)'}{_asset_report()} → {out.parent}/")
+    return out
+
+
+def _stage_variants(specs, briefing, mkt, fscript, fg_data, move_pcc_data, fred_data):
+    """RENDER_VARIANTS 페이지들 — 메인 대시보드와 같은 수집 결과로 렌더"""
+    with METRICS.span("render variants", variants=len(specs)) as a:
+        values = dashboard_slots(mkt, fscript, briefing.to_html(), fg_data, move_pcc_data,
+                                 fred_data)
+        results = render_variants(specs, values, mkt)
+        a["bytes"] = sum(r[2] for r in results)
+    METRICS.incr("output.bytes", a["bytes"])
+    unbound = {}
+    for name, _, _, miss in results:
+        if miss:
+            unbound.setdefault(miss, []).append(name)
+    for miss, names in unbound.items():
+        print(f"  ⚠️ 변형 {len(names)}개 슬롯 미바인딩 (기존 내용 유지): {', '.join(miss)}"
+              f" — {', '.join(names[:3])}{' …' if len(names) > 3 else ''}")
+    print(f"  🧩 변형 {len(results)}개 렌더 {a['bytes']:,} bytes")
+    return results
+
+
+# output/ 날짜별 아카이브 (빈 값이면 비활성) — archive.py 참고
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", "output")
+
+
+def _stage_archive(briefing):
+    """오늘 브리핑 → {ARCHIVE_DIR}/YYYYMMDD.md·html + meta.json + 목록 페이지 증분 갱신"""
+    if not ARCHIVE_DIR or not briefing.markdown or briefing.stale or replaying():
+        return None                    # 생성 실패(지난 브리핑 대체)·재생 실행은 기록하지 않음
+    import archive
+    c = run_clock()
+    with METRICS.span("write archive"):
+        store = asset_store(str(Path(ARCHIVE_DIR) / "assets")) if DASHBOARD_ASSETS else None
+        entry = archive.Archive(ARCHIVE_DIR, store=store).add(
+            c.file_date, c.date_ko, f"{c.today_str} 모닝 브리핑",
+            c.now.strftime("%Y-%m-%d %H:%M KST"), briefing.markdown, briefing.to_html())
+    print(f"  🗂 아카이브 {ARCHIVE_DIR}/{entry['file']}")
+    return entry
+
+
+def _stage_search(briefing, entry):
+    """아카이브한 오늘 브리핑 → {ARCHIVE_DIR}/search/ 역색인 증분 갱신 (searchindex.py 참고)"""
+    if entry is None:
+        return None                    # 아카이브하지 않은 날(실패·재생·비활성)은 색인도 없음
+    import searchindex
+    with METRICS.span("write search") as a:
+        status, written = searchindex.SearchIndex(ARCHIVE_DIR).add(
+            entry["date"], entry["label"], entry["file"], briefing.markdown)
+        a["shards"] = written
+    print(f"  🔎 검색 색인 {entry['date']} {status} — 샤드 {written}개 기록")
+    return status
+
+
+# history/{소스}/ 일별 스냅샷 컬럼 저장소 (빈 값이면 비활성) — snapshots.py 참고
+# 실행 날짜(KST)당 한 행, 같은 날 재실행·인트라데이 갱신은 그 행을 교체한다.
+HISTORY_DIR = os.environ.get("HISTORY_DIR", "history")
+FRED_KEYS = ("cpi", "core", "un", "ff", "d10", "d2")
+HISTORY_SCHEMA = {   # 소스: {열: dtype | "cat"(라벨)} — 열 추가는 기존 행을 결측으로 채움
+    "fear_greed": {**{k: "<f4" for k in ("cnn", "cnn_prev", "cnn_week", "cnn_month", "crypto",
+                                         "crypto_prev", "crypto_week", "crypto_month", "pcc_now")},
+                   "cnn_label": "cat", "crypto_label": "cat", "pcc_rating": "cat"},
+    "move_pcc": {k: "<f4" for k in ("move_now", "move_chg", "pcc_now", "pcc_chg")},
+    "market": {f"{k}.{f}": dt for k in SYMS for f, dt in (("price", "<f8"), ("change", "<f4"))},
+    "fred": {k: "<f4" for k in FRED_KEYS},
+}
+HISTORY_STALE = {   # 지연 소스(접두) → {히스토리 소스: 비울 열 접두} — 지난 값을 오늘 값으로 남기지 않음
+    "market": {"market": ("",)}, "yf_ohlc": {"market": ("",), "move_pcc": ("move",)},
+    "fear_greed": {"fear_greed": ("",)}, "cnn": {"fear_greed": ("cnn", "pcc"), "move_pcc": ("pcc",)},
+    "crypto_fg": {"fear_greed": ("crypto",)}, "move_pcc": {"move_pcc": ("",)},
+    "fred": {"fred": ("",)},
+    # 지난 값도 없어 기본값(0)이 남은 부분 — fetch_* 결과의 "missing"
+    "move": {"move_pcc": ("move",)}, "pcc": {"fear_greed": ("pcc",), "move_pcc": ("pcc",)},
+}
+
+
+def _last_y(xy):
+    ys = (xy or {}).get("y") or [None]
+    return ys[-1]
+
+
+def history_rows(mkt=None, fg=None, move_pcc=None, fred=None, stale=()):
+    """수집 결과 → {소스: 행 {열: 값}} — stale 소스·결과의 "missing" 부분 열은 결측,
+    모든 값이 결측인 소스는 뺌"""
+    stale = [*stale, *(fg or {}).get("missing", []), *(move_pcc or {}).get("missing", [])]
+    flat = {
+        "fear_greed": fg or {},
+        "move_pcc": move_pcc or {},
+        "market": {f"{k}.{f}": d.get(f) for k, d in (mkt or {}).items() if d.get("price")
+                   for f in ("price", "change")},
+        "fred": {k: _last_y((fred or {}).get(k)) for k in FRED_KEYS},
+    }
+    rows = {}
+    for source, schema in HISTORY_SCHEMA.items():
+        blank = tuple(p for s in stale for k, by in HISTORY_STALE.items() if s.startswith(k)
+                      for p in by.get(source, ()))
+        row = {}
+        for col in schema:
+            v = flat[source].get(col)
+            if col.startswith(blank):
+                v = None
+            row[col] = v
+        if any(v is not None for v in row.values()):
+            rows[source] = row
+    return rows
+
+
+def open_history(source):
+    """소스별 일별 스냅샷 저장소 — query(start, end, 열)·xy(열)로 다년 구간 조회"""
+    import snapshots
+    return snapshots.ColumnStore(Path(HISTORY_DIR) / source, HISTORY_SCHEMA[source])
+
+
+def _stage_history(mkt, fg_data, move_pcc_data, fred_data):
+    """오늘 수집값 → {HISTORY_DIR}/{소스}/ 에 한 행 (지연 데이터·기본값으로 대체된 열은 비움)"""
+    if not HISTORY_DIR or replaying():
+        return None
+    day = run_clock().now.strftime("%Y-%m-%d")
+    with _STALE_LOCK:
+        stale = list(_STALE)
+    rows = history_rows(mkt, fg_data, move_pcc_data, fred_data, stale)
+    with METRICS.span("write history", sources=len(rows)):
+        done = {source: open_history(source).append({"date": day, **row})
+                for source, row in rows.items()}
+    print(f"  🧮 히스토리 {day} — {', '.join(f'{s}:{op}' for s, op in done.items()) or '기록 없음'}")
+    return done
+
+
+_EMPTY_SERIES = {"x": [], "y": []}
+
+
+def build_stages():
+    """수집·렌더 의존성 그래프 — 네트워크 단계는 서로 독립이라 Claude 호출 뒤에 숨는다"""
+    fred = [("fred_cpi", fred_yoy, "CPIAUCSL"), ("fred_core", fred_yoy, "CPILFESL"),
+            ("fred_un", fred_get, "UNRATE"), ("fred_ff", fred_get, "FEDFUNDS"),
+            ("fred_d10", fred_get_daily, "DGS10"), ("fred_d2", fred_get_daily, "DGS2")]
+    variants = load_variants()
+    extra = variant_tickers(variants)
+    stages = [
+        # ① Claude API 브리핑 생성 (web_search 최대 15회 — 가장 느림)
+        Stage("briefing", _stage_briefing, deadline=900, fallback=_briefing_failed),
+        # ② yfinance 일봉 → OHLC 저장소 (SYMS + ^MOVE + 변형 티커 한 번에) → 카드 시세
+        Stage("ohlc", lambda: _stage_ohlc(extra), deadline=60, fallback=_ohlc_failed),
+        Stage("market", lambda store: _stage_market(store, extra), deps=["ohlc"], deadline=30,
+              fallback={}, lkg=True),
+        # ④ 실시간 지표: 공포탐욕 / MOVE·Put/Call
+        Stage("fear_greed", _stage_fear_greed, deadline=30, fallback={}, lkg=True),
+        Stage("move_pcc", _stage_move_pcc, deps=["ohlc"], deadline=60, fallback={}, lkg=True),
+    ]
+    # ③ FRED 경제지표 — 시리즈별 독립 요청 후 fred_js에서 합류
+    for name, fn, sid in fred:
+        stages.append(Stage(name, lambda fn=fn, sid=sid: fn(sid), deadline=30,
+                            fallback=_EMPTY_SERIES, lkg=True))
+    stages.append(Stage("fred_script", _stage_fred_js, deps=[n for n, _, _ in fred],
+                        fallback="// no fred"))
+    stages.append(Stage("fred_data", fred_fit, deps=[n for n, _, _ in fred], fallback=None))
+    # ⑤ 렌더 — 필요한 입력이 모두 도착(또는 데드라인 만료)하는 즉시 시작
+    render_deps = ["briefing", "market", "fred_script", "fear_greed", "move_pcc", "fred_data"]
+    stages.append(Stage("render", _stage_render, deps=render_deps))
+    # ⑤' 변형 페이지 — 같은 입력으로 프로세스 풀 렌더 (실패해도 메인 대시보드는 유지)
+    if variants:
+        stages.append(Stage("variants", lambda *a: _stage_variants(variants, *a),
+                            deps=render_deps, fallback=None))
+    # ⑥ 날짜별 아카이브 + 검색 색인 — 브리핑만 있으면 렌더와 별개로 진행
+    stages.append(Stage("archive", _stage_archive, deps=["briefing"], deadline=30, fallback=None))
+    stages.append(Stage("search", _stage_search, deps=["briefing", "archive"], deadline=30,
+                        fallback=None))
+    # ⑦ 일별 스냅샷 히스토리 — 지표 단계가 끝나는 대로 (브리핑을 기다리지 않음)
+    stages.append(Stage("history", _stage_history,
+                        deps=["market", "fear_greed", "move_pcc", "fred_data"],
+                        deadline=30, fallback=None))
+    return stages
+
+
+# ═══════════════════════════════════════════
+# PART E — 인트라데이 갱신 (--watch)
+# ═══════════════════════════════════════════
+# 프로세스를 띄워 둔 채 소스 단계마다 자기 주기로 다시 수집한다. 다시 돈 단계의
+# 하위 단계만 이어서 돌리고(run_stages done=), 슬롯은 입력이 바뀐 그룹만 다시 만든다.
+# 출력 해시가 바뀔 때만 docs/index.html 을 원자적으로 교체한다.
+# import·HTTP 세션·OHLC 저장소(연결)·이전 결과는 틱 사이에 그대로 유지된다.
+
+WATCH_SCHEDULE = {          # 소스 단계(이름 또는 접두): 갱신 주기(초) — None = 날짜가 바뀔 때 한 번
+    "ohlc": int(os.environ.get("WATCH_MARKET_EVERY", 5 * 60)),
+    "fear_greed": 15 * 60,
+    "fred": 24 * 3600,
+    "briefing": None,
+}
+WATCH_TICK = 30             # 최대 대기(초) — 날짜 변경 확인 간격
+WATCH_SKIP = ("render", "variants")   # 렌더는 LiveDashboard가 직접
+
+SLOT_GROUPS = [   # (그룹, 입력 단계, 슬롯 값 함수(입력...)) — dashboard_slots 와 같은 구성
+    ("date", ("clock",), lambda today: {"date": today}),
+    ("briefing", ("briefing",), lambda b: {"briefing": b.to_html() or None}),
+    ("cards", ("market",), card_slots),
+    ("fear_greed", ("fear_greed",), fg_slots),
+    ("move_pcc", ("move_pcc",), move_pcc_slots),
+    ("fred", ("fred_script", "fred_data"), fred_slots),
+    ("widgets", (), widget_slots),
+    ("stale", ("stale",), stale_notice),
+]
+
+
+def _schedule(name):
+    if name in WATCH_SCHEDULE:
+        return WATCH_SCHEDULE[name]
+    return WATCH_SCHEDULE.get(name.split("_")[0], False)     # False = 주기 없음 (처음 한 번)
+
+
+def _dependents(stages, names):
+    """names 와 그 하위 단계 전체"""
+    out, grew = set(names), True
+    while grew:
+        grew = False
+        for s in stages:
+            if s.name not in out and out.intersection(s.deps):
+                out.add(s.name)
+                grew = True
+    return out
+
+
+class LiveDashboard:
+    """인트라데이 렌더 상태 — 그룹별 입력·슬롯 값과 마지막 출력 해시를 유지"""
+
+    def __init__(self, out=Path("docs/index.html"), template=Path(DEFAULT_TEMPLATE), variants=()):
+        self.out, self.template, self.variants = Path(out), Path(template), list(variants)
+        self.inputs, self.values, self.digest = {}, {}, None
+        if self.out.exists() and not DASHBOARD_SPLIT:
+            self.digest = hashlib.sha256(self.out.read_bytes()).hexdigest()
+
+    def update(self, results):
+        """입력이 바뀐 그룹만 다시 계산 → 다시 만든 그룹 목록"""
+        redone = []
+        for group, deps, fn in SLOT_GROUPS:
+            args = tuple(results.get(d) for d in deps)
+            prev = self.inputs.get(group)
+            if prev is not None and all(a is b or a == b for a, b in zip(prev, args)):
+                continue
+            with METRICS.span(f"slots {group}"):
+                self.values.update(fn(*args))
+            self.inputs[group] = args
+            redone.append(group)
+        return redone
+
+    def render(self, results):
+        """현재 슬롯 값 → 출력 (해시가 같으면 건너뜀) → 기록 여부"""
+        tpl = asset_template(compile_template(self.template.read_text(encoding="utf-8")), self.out)
+        if DASHBOARD_SPLIT:
+            data = asset_fragments(split_payload(self.values, results.get("fred_data"),
+                                                 results.get("move_pcc")), self.out)
+            body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        else:
+            html, unbound = tpl.render(self.values)
+            body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        if digest == self.digest:
+            METRICS.incr("watch.unchanged")
+            return False
+        with METRICS.span("write watch", bytes=len(body)):
+            if DASHBOARD_SPLIT:
+                write_precompressed(self.out, shell_html(tpl).encode("utf-8"))
+                write_precompressed(self.out.with_name(SPLIT_DATA_FILE), body)
+                write_changed(self.out.with_name(SPLIT_FULL_FILE), tpl.render(self.values)[0].encode("utf-8"))
+            else:
+                write_changed(self.out, body)
+            if self.variants:
+                render_variants(self.variants, self.values, results.get("market") or {})
+        self.digest = digest
+        METRICS.incr("output.bytes", len(body))
+        return True
+
+
+def watch(max_ticks=None):
+    """인트라데이 루프 — 소스별 주기로 다시 수집하고 바뀐 부분만 다시 렌더 (Ctrl-C로 종료)"""
+    graph = [s for s in build_stages() if s.name not in WATCH_SKIP]
+    live = LiveDashboard(variants=load_variants())
+    results, last = {}, {}              # last: 소스 단계 → (monotonic, file_date)
+    ticks = 0
+    print(f"👀 인트라데이 모드 — " + ", ".join(
+        f"{k} {'일 1회' if v is None else f'{v // 60}분'}" for k, v in WATCH_SCHEDULE.items()))
+    try:
+        while max_ticks is None or ticks < max_ticks:
+            clock = start_run_clock()
+            t = time.monotonic()
+            due = set()
+            for s in graph:
+                if s.deps:
+                    continue
+                every, prev = _schedule(s.name), last.get(s.name)
+                if (prev is None or (every is None and prev[1] != clock.file_date)
+                        or (every and t - prev[0] >= every)):
+                    due.add(s.name)
+            new_http_run()
+            start_budget()
+            metrics = new_run_metrics()
+            if due:
+                rerun = _dependents(graph, due)
+                # 다시 도는 단계가 실패하면 직전 값 유지 (카드가 비지 않게)
+                stages = [s if s.name not in results else
+                          Stage(s.name, s.fn, s.deps, s.deadline,
+                                fallback=lambda e, p=results[s.name]: p, lkg=s.lkg)
+                          for s in graph if s.name in rerun]
+                results = run_stages(stages, done={k: v for k, v in results.items()
+                                                   if k not in rerun})
+                last.update({n: (t, clock.file_date) for n in due})
+            results["clock"] = clock.today_str
+            results["stale"] = stale_sources()
+            redone = live.update(results)
+            wrote = live.render(results) if redone else False
+            metrics.write(history=None, mode="watch")
+            if due or wrote:
+                print(f"  🔄 {clock.now:%H:%M:%S} 갱신 {', '.join(sorted(due)) or '-'}"
+                      f" | 슬롯 {', '.join(redone) or '-'}"
+                      f" | {'기록' if wrote else '변경 없음'}")
+            ticks += 1
+            if max_ticks is not None and ticks >= max_ticks:
+                break
+            nxt = [last[n][0] + e - time.monotonic() for n in last
+                   if (e := _schedule(n))]
+            time.sleep(max(1.0, min([WATCH_TICK, *nxt])))
+    except KeyboardInterrupt:
+        print("👋 인트라데이 모드 종료")
+    return results
 
-    print(f"DONE {TODAY_STR}")
+
+# ═══════════════════════════════════════════
+# 엔트리포인트
+# ═══════════════════════════════════════════
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Market Sentinel 대시보드 생성")
+    tap = ap.add_mutually_exclusive_group()
+    tap.add_argument("--record", metavar="BUNDLE", help="외부 소스 응답을 번들로 녹화")
+    tap.add_argument("--replay", metavar="BUNDLE", help="녹화 번들로 오프라인 실행")
+    ap.add_argument("--refresh-briefing", action="store_true",
+                    help="오늘 브리핑 캐시를 무시하고 Claude로 새로 생성")
+    ap.add_argument("--watch", action="store_true",
+                    help="계속 실행하며 소스별 주기로 갱신 (WATCH_SCHEDULE)")
+    args = ap.parse_args(argv)
+    if args.watch and (args.record or args.replay):
+        ap.error("--watch 는 --record/--replay 와 함께 쓸 수 없습니다")
+
+    global BRIEFING_REFRESH
+    BRIEFING_REFRESH = BRIEFING_REFRESH or args.refresh_briefing
+    if args.watch:
+        return watch()
+    t0 = time.perf_counter()
+    clock = start_run_clock()
+    print(f"START {clock.today_str}")
+    if args.record:
+        set_tap("record", args.record)
+    elif args.replay:
+        set_tap("replay", args.replay)
+        print(f"  📼 재생 모드 — {args.replay} (녹화 {_TAP.bundle['meta'].get('recorded_at', '?')})")
+    new_http_run()
+    start_budget()
+    metrics = new_run_metrics()
+    mode = "record" if args.record else "replay" if args.replay else "live"
+    try:
+        run_stages(build_stages())
+    finally:
+        if _TAP is not None:
+            _TAP.save()
+        # 녹화·재생 실행은 추세 기록(history)에 섞지 않음
+        summ = metrics.write(history=RUN_HISTORY if mode == "live" else None, mode=mode)
+        slow = sorted(summ["stages"].items(), key=lambda kv: -kv[1])[:3]
+        print("  ⏱ " + " · ".join(f"{k} {v:.2f}s" for k, v in slow) +
+              f" | HTTP {summ['counters'].get('http.requests', 0)}건"
+              f" {summ['counters'].get('http.bytes', 0)/1024:.0f}KB → {RUN_REPORT}")
+    print(f"DONE {clock.today_str} ({time.perf_counter() - t0:.2f}s)")
 
 
 if __name__ == "__main__":
@@ -737,16 +3074,18 @@ if __name__ == "__main__":
     except EnvironmentError as e:
         print(f"\n❌ 환경 오류:\n{e}")
         sys.exit(1)
-    except anthropic.AuthenticationError:
-        print("\n❌ API 인증 실패 — ANTHROPIC_API_KEY를 확인하세요.")
-        sys.exit(1)
-    except anthropic.RateLimitError:
-        print("\n❌ API 한도 초과 — 잠시 후 재시도하세요.")
-        sys.exit(1)
-    except anthropic.APIConnectionError:
-        print("\n❌ API 연결 오류 — 네트워크를 확인하세요.")
-        sys.exit(1)
     except Exception as e:
+        # anthropic이 로드된 적 없으면 API 오류일 수 없음 — 여기서 SDK를 새로 import 하지 않는다
+        anthropic = sys.modules.get("anthropic")
+        if anthropic and isinstance(e, anthropic.AuthenticationError):
+            print("\n❌ API 인증 실패 — ANTHROPIC_API_KEY를 확인하세요.")
+            sys.exit(1)
+        if anthropic and isinstance(e, anthropic.RateLimitError):
+            print("\n❌ API 한도 초과 — 잠시 후 재시도하세요.")
+            sys.exit(1)
+        if anthropic and isinstance(e, anthropic.APIConnectionError):
+            print("\n❌ API 연결 오류 — 네트워크를 확인하세요.")
+            sys.exit(1)
         print(f"\n❌ 예기치 않은 오류: {e}")
         import traceback; traceback.print_exc()
         sys.exit(1)
@@ -0,0 +1,135 @@
+"""
+OHLC 저장소 — 심볼별 일봉을 SQLite 한 파일에 누적 (yfinance 일괄 다운로드의 증분 갱신)
+
+  bars(symbol, date, open, high, low, close, volume)  PRIMARY KEY (symbol, date) WITHOUT ROWID
+휴장일·주말엔 그 심볼의 행이 없으므로 '직전 거래일'은 바로 앞 행이다.
+일괄 다운로드 프레임은 전 심볼 날짜의 합집합이라 종가가 빈 행(휴장)은 저장하지 않는다.
+path=None 이면 메모리 DB (재생·캐시 비활성 실행용).
+"""
+
+import math
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    open   REAL, high REAL, low REAL, close REAL NOT NULL, volume REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+"""
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+def _num(v):
+    try:
+        v = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(v) else v
+
+
+class OHLCStore:
+    """SQLite 일봉 저장소 — 스레드 간 공유 가능 (연결 하나 + 락)"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path) if self.path else ":memory:",
+                                  check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    # ── 조회 ──
+    def last_dates(self, symbols=None):
+        """{심볼: 마지막 봉 날짜}"""
+        with self.lock:
+            rows = self.db.execute("SELECT symbol, MAX(date) FROM bars GROUP BY symbol").fetchall()
+        last = dict(rows)
+        return last if symbols is None else {s: last.get(s) for s in symbols}
+
+    def download_plan(self, symbols, revision_days=5, slack_days=7):
+        """심볼별 빠진 구간 → [(시작일 | None, [심볼...])] 다운로드 묶음 (None = 전체 백필)
+
+        봉이 없는 심볼만 백필 묶음으로 빼고 나머지는 증분으로 받는다. 마지막 봉이 가장 최근
+        심볼과 slack_days 이내인 심볼(주말 거래하는 코인 등)은 한 요청으로 묶어 그중 가장 이른
+        날짜부터, 더 뒤처진 심볼은 따로 묶어 다른 심볼의 구간을 늘리지 않는다.
+        시작일은 마지막 봉 앞 revision_days일 — 잠정치(장중 봉)·수정분을 덮어쓴다."""
+        last = self.last_dates(symbols)
+        groups, group, anchor = [], [], None
+        for d, sym in sorted(((d, s) for s, d in last.items() if d), reverse=True):
+            day = date.fromisoformat(d)
+            if group and anchor - day > timedelta(days=slack_days):
+                groups.append(group)
+                group = []
+            if not group:
+                anchor = day
+            group.append((day, sym))
+        if group:
+            groups.append(group)
+        fresh = [s for s in symbols if last[s] is None]
+        order = {s: i for i, s in enumerate(symbols)}
+        return [(None, fresh)] * bool(fresh) + [
+            ((min(d for d, _ in g) - timedelta(days=revision_days)).isoformat(),
+             sorted((s for _, s in g), key=order.get)) for g in groups]
+
+    def closes(self, symbol, start=None, last=None):
+        """[(날짜, 종가)] 오름차순 — start 이후 전체 또는 마지막 last개"""
+        with self.lock:
+            if last is not None:
+                rows = self.db.execute(
+                    "SELECT date, close FROM bars WHERE symbol=? ORDER BY date DESC LIMIT ?",
+                    (symbol, last)).fetchall()
+                return rows[::-1]
+            return self.db.execute(
+                "SELECT date, close FROM bars WHERE symbol=? AND date>=? ORDER BY date",
+                (symbol, start or "")).fetchall()
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM bars").fetchone()[0]
+
+    def latest(self):
+        with self.lock:
+            return self.db.execute("SELECT MAX(date) FROM bars").fetchone()[0]
+
+    # ── 갱신 ──
+    def upsert(self, df, symbols):
+        """yfinance 일괄 다운로드 프레임 → 저장 (같은 날짜는 교체). 저장한 봉 수
+
+        열 구성은 (심볼, 필드)·(필드, 심볼) MultiIndex 또는 단일 심볼 평면 열 모두 허용."""
+        rows = []
+        cols = df.columns
+        if getattr(cols, "nlevels", 1) == 2:
+            field_level = 0 if "Close" in cols.get_level_values(0) else 1
+            present = set(cols.get_level_values(1 - field_level))
+            for sym in symbols:
+                if sym in present:
+                    rows += self._rows(sym, df.xs(sym, axis=1, level=1 - field_level))
+        elif len(symbols) == 1:
+            rows = self._rows(symbols[0], df)
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO bars VALUES (?,?,?,?,?,?,?)", rows)
+        return len(rows)
+
+    @staticmethod
+    def _rows(sym, sub):
+        if "Close" not in sub.columns:
+            return []
+        days = [d.strftime("%Y-%m-%d") for d in sub.index]
+        cols = [sub[f].tolist() if f in sub.columns else [None] * len(days) for f in FIELDS]
+        out = []
+        for d, *vals in zip(days, *cols):
+            o, h, l, c, v = map(_num, vals)
+            if c is not None:
+                out.append((sym, d, o, h, l, c, v))
+        return out
@@ -1,8 +1,10 @@
 """샘플 페이지 생성 — API 없이 mock 브리핑으로 대시보드 확인"""
 import sys
 sys.path.insert(0, ".")
-from generate import briefing_to_html, patch_html, card, fred_js, TODAY_STR, date_ko, weekday_ko
+from generate import briefing_to_html, patch_html, card, fred_js
 from pathlib import Path
+import random
+import assets
 
 SAMPLE = """\
 # 🇺🇸 PART 1 — 미국 시장
@@ -128,9 +130,16 @@ mock_mkt = {
     "CNY":{"price":7.244,"change":0.05},"BTC":{"price":97832,"change":2.14},
     "ETH":{"price":2741,"change":1.87},"SOL":{"price":198.45,"change":3.52},
 }
+# 카드 스파크라인 — 오늘 값으로 끝나는 22일 랜덤워크 (심볼별 고정 시드)
+for k, d in mock_mkt.items():
+    rnd, v, walk = random.Random(k), d["price"], []
+    for _ in range(22):
+        walk.append(round(v, 4))
+        v /= 1 + rnd.gauss(d["change"] / 2200, 0.008)
+    d["spark"] = walk[::-1]
 
 months = ["2024-01","2024-03","2024-05","2024-07","2024-09","2024-11","2025-01","2025-02"]
-mock_fred = fred_js(
+mock_fred_series = dict(
     cpi={"x":months,"y":[3.1,3.5,3.3,2.9,2.4,2.7,3.0,2.8]},
     core={"x":months,"y":[3.9,3.8,3.4,3.2,3.3,3.3,3.2,3.1]},
     un={"x":months,"y":[3.7,3.8,4.0,4.3,4.1,4.2,4.0,4.0]},
@@ -138,6 +147,7 @@ mock_fred = fred_js(
     d10={"x":months,"y":[4.15,4.35,4.51,4.28,3.78,4.24,4.54,4.52]},
     d2={"x":months,"y":[4.38,4.62,4.87,4.51,3.58,4.15,4.21,4.27]},
 )
+mock_fred = fred_js(**mock_fred_series)
 
 mock_fg = {"cnn":38,"cnn_label":"Fear","cnn_prev":37,"cnn_week":48,"cnn_month":55,
            "crypto":8,"crypto_label":"Extreme Fear","crypto_prev":10,"crypto_week":11,"crypto_month":44}
@@ -148,12 +158,18 @@ mock_move = {
     "pcc_dates":["2025-02","2025-03","2025-04","2025-05","2025-06","2025-07","2025-08","2025-09","2025-10","2025-11","2025-12","2026-01","2026-02"],
     "pcc_vals":[0.72,0.78,0.91,0.82,0.75,0.69,0.81,0.77,0.88,0.85,0.79,0.72,0.82],
     "pcc_now":0.82,"pcc_chg":0.10}
-briefing_html = briefing_to_html(SAMPLE)
-tmpl = Path("templates/dashboard.html").read_text(encoding="utf-8")
-html = patch_html(tmpl, mock_mkt, mock_fred, briefing_html,
-                  fg=mock_fg, move_pcc=mock_move)
-
-out = Path("docs/index.html")
-out.parent.mkdir(exist_ok=True)
-out.write_text(html, encoding="utf-8")
-print(f"✅ 샘플 페이지 생성: {out} ({len(html):,} bytes)")
+
+
+def main():
+    briefing_html = briefing_to_html(SAMPLE)
+    tmpl = Path("templates/dashboard.html").read_text(encoding="utf-8")
+    html = patch_html(tmpl, mock_mkt, mock_fred, briefing_html,
+                      fg=mock_fg, move_pcc=mock_move, fred=mock_fred_series)
+
+    out = Path("docs/index.html")
+    assets.write_atomic(out, html)
+    print(f"✅ 샘플 페이지 생성: {out} ({len(html):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+브리핑 아카이브 전문 검색 색인 — 정적 샤드 파일 (output/search/)
+
+  meta.json          {"v", "shards", "years": [...], "docs": [{d, l, f, t, h}]}
+                     docs 순서가 문서 번호. d=YYYYMMDD, l=라벨, f=페이지, t=티커, h=본문 해시
+  {연도}/{xx}.json   {토큰: 문서 번호 델타 목록} — 토큰 해시 % shards 별 역색인
+토큰: 한글 연속 구간은 2-gram(한 글자 구간은 그대로), 영문·숫자 단어는 소문자, 6자리 종목 코드.
+샤드를 연도로 나누므로 지난 해 파일은 바뀌지 않고, 실행마다 오늘 문서가 닿는 그해 샤드만 다시 쓴다.
+브라우저(templates/archive.html)는 같은 규칙으로 질의를 토큰화해 필요한 샤드만 받아 교집합한다.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from assets import write_changed
+
+VERSION = 1
+SHARDS = 64
+_HANGUL_RE = re.compile(r"[가-힣]+")
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9&]+|(?<![0-9A-Za-z])\d{6}(?![0-9A-Za-z])")
+_TICKER_RE = re.compile(r"\$([A-Z]{1,5})\b|\(([A-Z]{1,5}|\d{6})(?:\.[A-Z]{1,2})?\)")
+_URL_RE = re.compile(r"https?://\S+")
+STOPWORDS = {"the", "and", "of", "to", "in", "for", "on", "at", "is", "by", "vs", "with", "from"}
+
+
+def tokens(text):
+    """검색 토큰 집합 — templates/archive.html 의 tokens()와 같은 규칙"""
+    text = _URL_RE.sub(" ", text)
+    out = set()
+    for run in _HANGUL_RE.findall(text):
+        out.update([run] if len(run) == 1 else (run[i:i + 2] for i in range(len(run) - 1)))
+    out.update(w for w in (m.lower() for m in _WORD_RE.findall(text)) if w not in STOPWORDS)
+    return out
+
+
+def tickers(text):
+    """$NVDA·(TSLA)·(005930) 형태로 표기된 종목 — 등장 순서, 중복 제거"""
+    return list(dict.fromkeys(a or b for a, b in _TICKER_RE.findall(text)))
+
+
+def shard_of(token, shards=SHARDS):
+    """FNV-1a 32비트 (UTF-16 코드 단위 — 한글·영문은 코드 포인트와 같음) % shards"""
+    h = 0x811C9DC5
+    for ch in token:
+        h = ((h ^ ord(ch)) * 0x01000193) & 0xFFFFFFFF
+    return h % shards
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode(deltas):
+    out, v = [], 0
+    for d in deltas:
+        v += d
+        out.append(v)
+    return out
+
+
+def _encode(ids):
+    ids = sorted(ids)
+    return ids[:1] + [b - a for a, b in zip(ids, ids[1:])]
+
+
+class SearchIndex:
+    """{archive}/search/ 역색인 — add()가 오늘 문서 하나만 토큰화해 그해 샤드에 반영"""
+
+    def __init__(self, archive_root="output", shards=SHARDS):
+        self.archive = Path(archive_root)
+        self.root = self.archive / "search"
+        self.shards = shards
+        self.meta_path = self.root / "meta.json"
+
+    # ── 메타 ──
+    def _meta(self):
+        """없거나 샤드 수가 바뀌었으면 아카이브 전체(meta.json + YYYYMMDD.md)로 한 번 재구축"""
+        if self.meta_path.exists():
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+            if meta.get("v") == VERSION and meta.get("shards") == self.shards:
+                return meta
+        return self.rebuild()
+
+    def _save_meta(self, meta):
+        meta["years"] = sorted({d["d"][:4] for d in meta["docs"]})
+        write_changed(self.meta_path, _dumps(meta))
+
+    # ── 샤드 ──
+    def _shard_path(self, year, no):
+        return self.root / year / f"{no:02x}.json"
+
+    def _load(self, year, no):
+        path = self._shard_path(year, no)
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    def _post(self, year, doc_id, toks):
+        """문서 토큰 → 그해 샤드에 문서 번호 추가 → 다시 쓴 샤드 수"""
+        by_shard = {}
+        for t in toks:
+            by_shard.setdefault(shard_of(t, self.shards), []).append(t)
+        written = 0
+        for no, ts in by_shard.items():
+            shard = self._load(year, no)
+            for t in ts:
+                ids = _decode(shard.get(t, []))
+                if doc_id not in ids:
+                    shard[t] = _encode(ids + [doc_id])
+            written += write_changed(self._shard_path(year, no), _dumps(dict(sorted(shard.items()))))
+        return written
+
+    def _scrub(self, year, doc_id):
+        """그해 샤드 전체에서 문서 번호 제거 — 같은 날 본문이 바뀐 재실행에서만 (드문 경로)"""
+        for no in range(self.shards):
+            shard = self._load(year, no)
+            if not shard:
+                continue
+            kept = {}
+            for t, deltas in shard.items():
+                ids = [i for i in _decode(deltas) if i != doc_id]
+                if ids:
+                    kept[t] = _encode(ids)
+            if kept != shard:
+                write_changed(self._shard_path(year, no), _dumps(kept))
+
+    # ── 추가 ──
+    def add(self, date, label, file, md_text):
+        """문서 하나 색인 → ("added"|"replaced"|"unchanged", 다시 쓴 샤드 수). date='YYYYMMDD'"""
+        meta = self._meta()
+        digest = hashlib.sha256(md_text.encode("utf-8")).hexdigest()[:12]
+        doc = {"d": date, "l": label, "f": file, "t": tickers(md_text)[:12], "h": digest}
+        docs = meta["docs"]
+        doc_id = next((i for i, d in enumerate(docs) if d["d"] == date), None)
+        if doc_id is not None and docs[doc_id].get("h") == digest:
+            return "unchanged", 0
+        status = "added"
+        if doc_id is None:
+            doc_id = len(docs)
+            docs.append(doc)
+        else:
+            self._scrub(date[:4], doc_id)
+            docs[doc_id] = doc
+            status = "replaced"
+        written = self._post(date[:4], doc_id, tokens(md_text))
+        self._save_meta(meta)
+        return status, written
+
+    def rebuild(self):
+        """아카이브에 있는 모든 날짜를 처음부터 색인 (최초 실행·샤드 수 변경)"""
+        meta = {"v": VERSION, "shards": self.shards, "years": [], "docs": []}
+        for year_dir in self.root.glob("[0-9][0-9][0-9][0-9]"):
+            for f in year_dir.glob("*.json"):
+                f.unlink()
+        items_path = self.archive / "meta.json"
+        items = json.loads(items_path.read_text(encoding="utf-8")) if items_path.exists() else []
+        by_year = {}
+        for e in items:
+            md = self.archive / f"{e['date']}.md"
+            if not md.exists():
+                continue
+            text = md.read_text(encoding="utf-8")
+            doc_id = len(meta["docs"])
+            meta["docs"].append({"d": e["date"], "l": e["label"], "f": e["file"],
+                                 "t": tickers(text)[:12],
+                                 "h": hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]})
+            year = by_year.setdefault(e["date"][:4], {})
+            for t in tokens(text):
+                year.setdefault(shard_of(t, self.shards), {}).setdefault(t, []).append(doc_id)
+        for year, shards in by_year.items():
+            for no, shard in shards.items():
+                write_changed(self._shard_path(year, no),
+                              _dumps({t: _encode(ids) for t, ids in sorted(shard.items())}))
+        self._save_meta(meta)
+        return meta
@@ -0,0 +1,184 @@
+"""
+일별 스냅샷 히스토리 — 소스별 append-only 컬럼 저장소 (메모리 맵 NumPy 배열)
+
+  {root}/meta.json     {"schema": {열: dtype}, "vocab": {열: [라벨...]}, "rows": 행 수}
+  {root}/date.bin      <i4 1970-01-01 기준 일 수 (오름차순, 날짜당 한 행)
+  {root}/{열}.bin      열마다 고정 폭 리틀엔디언 원시 배열
+
+하루 한 행을 덧붙이고(같은 날짜면 마지막 행 교체) 조회는 date 열을 메모리 맵으로 열어
+이진 탐색한 구간만 읽으므로 기간이 몇 년이어도 날짜별 파일을 파싱하지 않는다.
+dtype "cat"은 라벨 문자열을 vocab 인덱스(<u1, 255 = 없음)로 저장한다.
+모든 파일은 사본 + 교체(assets.write_atomic)로 써서 반쯤 쓴 파일이 남지 않는다.
+meta.json의 rows가 커밋 지점 — 열 파일을 먼저 쓰고 rows를 마지막에 교체하므로
+중간에 죽어도 rows 뒤의 꼬리 바이트는 다음 기록 때 잘라낸다.
+"""
+
+import json
+import math
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from assets import write_atomic
+
+DATE_DTYPE = np.dtype("<i4")
+CAT_DTYPE = np.dtype("<u1")
+CAT_MISSING = 255
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def day_number(iso):
+    return date.fromisoformat(iso).toordinal() - _EPOCH
+
+
+def day_iso(n):
+    return date.fromordinal(int(n) + _EPOCH).isoformat()
+
+
+class ColumnStore:
+    """한 소스의 일별 스냅샷 — schema {열: numpy dtype 문자열 | "cat"}
+
+    schema에 새 열이 생기면 기존 행은 결측(NaN·255)으로 채운다. schema 밖의 키는 버린다."""
+
+    def __init__(self, root, schema):
+        self.root = Path(root)
+        self.schema = dict(schema)
+
+    # ── 메타 ──
+    def _meta(self):
+        path = self.root / "meta.json"
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+        return {"schema": {}, "vocab": {}, "rows": 0}
+
+    def _save_meta(self, meta):
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.root / "meta.json", json.dumps(meta, ensure_ascii=False, indent=1).encode("utf-8"))
+
+    @staticmethod
+    def _dtype(kind):
+        return CAT_DTYPE if kind == "cat" else np.dtype(kind)
+
+    def _path(self, col):
+        return self.root / f"{col}.bin"
+
+    def __len__(self):
+        return self._meta()["rows"]
+
+    # ── 기록 ──
+    def _encode(self, meta, col, value):
+        kind = meta["schema"][col]
+        if kind == "cat":
+            if value is None or value == "":
+                return CAT_MISSING
+            vocab = meta["vocab"].setdefault(col, [])
+            if value not in vocab:
+                if len(vocab) >= CAT_MISSING:
+                    raise ValueError(f"{col}: 라벨 종류가 {CAT_MISSING}개를 넘음")
+                vocab.append(value)
+            return vocab.index(value)
+        if value is None:
+            return math.nan if np.dtype(kind).kind == "f" else 0
+        return value
+
+    def _missing(self, kind, n):
+        if kind == "cat":
+            return np.full(n, CAT_MISSING, CAT_DTYPE)
+        dt = np.dtype(kind)
+        return np.full(n, np.nan if dt.kind == "f" else 0, dt)
+
+    def _grow_schema(self, meta, row):
+        """row에 처음 나온 열 → 기존 행 수만큼 결측으로 채운 파일 생성"""
+        n = meta["rows"]
+        for col, kind in self.schema.items():
+            if col in meta["schema"] or col not in row:
+                continue
+            write_atomic(self._path(col), self._missing(kind, n).tobytes())
+            meta["schema"][col] = kind
+
+    def append(self, row):
+        """row {"date": 'YYYY-MM-DD', 열: 값} 기록 → "append" | "replace" | "insert"
+
+        마지막 행과 같은 날짜면 교체, 이전 날짜(백필)면 정렬 위치에 끼워 전체를 다시 쓴다."""
+        day = day_number(row["date"])
+        meta = self._meta()
+        meta["schema"].setdefault("date", "<i4")
+        self._grow_schema(meta, row)
+        n = meta["rows"]
+        last = self._last_day(n)
+        if last is not None and day < last:
+            return self._insert(meta, day, row)
+        pos = n - 1 if last == day else n
+        for col, kind in meta["schema"].items():
+            dt = self._dtype(kind)
+            v = day if col == "date" else self._encode(meta, col, row.get(col))
+            path = self._path(col)
+            keep = pos * dt.itemsize                     # 지난 실패가 남긴 꼬리는 버림
+            head = path.read_bytes()[:keep] if path.exists() else b""
+            write_atomic(path, head.ljust(keep, b"\0") + np.array([v], dt).tobytes())
+        meta["rows"] = pos + 1
+        self._save_meta(meta)
+        return "replace" if pos < n else "append"
+
+    def _last_day(self, n):
+        if not n:
+            return None
+        with open(self._path("date"), "rb") as f:
+            f.seek((n - 1) * DATE_DTYPE.itemsize)
+            return int(np.frombuffer(f.read(DATE_DTYPE.itemsize), DATE_DTYPE)[0])
+
+    def _insert(self, meta, day, row):
+        n = meta["rows"]
+        cols = {c: np.fromfile(self._path(c), self._dtype(k), count=n)
+                for c, k in meta["schema"].items()}
+        i = int(np.searchsorted(cols["date"], day))
+        replace = i < n and cols["date"][i] == day
+        for col, arr in cols.items():
+            v = day if col == "date" else self._encode(meta, col, row.get(col))
+            if replace:
+                arr[i] = v
+            else:
+                arr = np.insert(arr, i, np.array(v, arr.dtype))
+            write_atomic(self._path(col), arr.tobytes())
+        meta["rows"] = n if replace else n + 1
+        self._save_meta(meta)
+        return "replace" if replace else "insert"
+
+    # ── 조회 ──
+    def query(self, start=None, end=None, columns=None):
+        """[start, end] 구간 (ISO 날짜, 생략 시 열린 구간) → {"date": datetime64[D], 열: 배열}
+
+        cat 열은 라벨 문자열(object 배열, 결측 None)로 풀어 준다. 없는 열은 결측 배열."""
+        meta = self._meta()
+        n = meta["rows"]
+        cols = list(columns) if columns is not None else [c for c in meta["schema"] if c != "date"]
+        if not n:
+            return {"date": np.array([], "datetime64[D]"),
+                    **{c: self._missing(self.schema.get(c, "<f8"), 0) for c in cols}}
+        days = np.memmap(self._path("date"), DATE_DTYPE, "r", shape=(n,))
+        i = int(np.searchsorted(days, day_number(start), "left")) if start else 0
+        j = int(np.searchsorted(days, day_number(end), "right")) if end else n
+        out = {"date": np.asarray(days[i:j]).astype("int64").astype("datetime64[D]")}
+        for c in cols:
+            kind = meta["schema"].get(c)
+            if kind is None:
+                out[c] = self._missing(self.schema.get(c, "<f8"), j - i)
+                continue
+            arr = np.array(np.memmap(self._path(c), self._dtype(kind), "r", shape=(n,))[i:j])
+            if kind == "cat":
+                labels = np.array(meta["vocab"].get(c, []) + [None] * (CAT_MISSING + 1
+                                  - len(meta["vocab"].get(c, []))), dtype=object)
+                arr = labels[arr]
+            out[c] = arr
+        return out
+
+    def xy(self, col, start=None, end=None, decimals=None):
+        """차트용 {"x": ['YYYY-MM-DD'], "y": [값]} — 결측 행은 뺀다"""
+        q = self.query(start, end, [col])
+        ys = q[col]
+        keep = ~np.isnan(ys) if ys.dtype.kind == "f" else np.ones(len(ys), bool)
+        vals = ys[keep].astype(float)
+        if decimals is not None:
+            vals = np.round(vals, decimals)
+        return {"x": np.datetime_as_string(q["date"][keep]).tolist(), "y": vals.tolist()}
@@ -0,0 +1,248 @@
+"""
+서버 사이드 SVG 차트 — Plotly 번들 없이 정적 인라인 SVG (스크립트 실행 불필요)
+
+입력은 fred_js / fetch_move_pcc 와 같은 {"x": 날짜 문자열, "y": 값} 시리즈.
+  - line_chart(): 꺾은선·영역·막대 + 기준선 + 음영 구간 + 축 눈금 + 범례 + <title> 툴팁
+  - sparkline(): 카드용 미니 추세선
+좌표는 픽셀 열 단위 min/max로 줄여(decimate) 점 수가 화면 폭에 비례하고,
+툴팁은 x축을 hover 구간으로 나눠 구간마다 <title> 하나(전 시리즈 값)만 넣는다.
+"""
+
+import math
+from bisect import bisect_left
+from datetime import date
+from html import escape
+
+FONT = "font-family=\"'Noto Sans KR',sans-serif\" font-size=\"10\""
+AXIS_COLOR = "#9ca3af"
+GRID_COLOR = "#f1f5f9"
+MARGIN = (10, 10, 34, 46)            # 위·오른쪽·아래·왼쪽 (px, viewBox 기준)
+LEGEND_H = 16
+
+
+# ───────────────────────────────────────────
+# 축 계산
+# ───────────────────────────────────────────
+
+def day_number(x):
+    """'YYYY-MM-DD' / 'YYYY-MM' (월초로 간주) → 일 단위 서수"""
+    return date(int(x[:4]), int(x[5:7]), int(x[8:10]) if len(x) >= 10 else 1).toordinal()
+
+
+def nice_ticks(lo, hi, n=5):
+    """lo~hi 를 덮는 '보기 좋은' 눈금 (1·2·2.5·5 × 10^k 간격)"""
+    if hi <= lo:
+        lo, hi = lo - 1, hi + 1
+    raw = (hi - lo) / max(1, n - 1)
+    mag = 10 ** math.floor(math.log10(raw))
+    step = next(m * mag for m in (1, 2, 2.5, 5, 10) if m * mag >= raw)
+    start = math.floor(lo / step + 1e-9) * step
+    ticks, t = [], start
+    while t < hi + step * 0.999:
+        ticks.append(round(t, 10))
+        t += step
+    return ticks, step
+
+
+def _fmt(v, step, suffix=""):
+    dec = max(0, -math.floor(math.log10(step) + 1e-9)) if step < 1 else 0
+    if step * 10 ** dec % 1:                      # 2.5 × 10^k
+        dec += 1
+    return f"{v:,.{dec}f}{suffix}"
+
+
+def date_ticks(d0, d1, n=6):
+    """서수 구간 → [(서수, 라벨)] — 기간에 따라 연/분기/월/주 경계"""
+    span = d1 - d0
+    a, b = date.fromordinal(d0), date.fromordinal(d1)
+    if span > 365 * 3:
+        years = list(range(a.year + 1, b.year + 1))
+        k = max(1, math.ceil(len(years) / n))
+        return [(date(y, 1, 1).toordinal(), str(y)) for y in years[::k]]
+    if span > 45:
+        months, y, m = [], a.year, a.month
+        while True:
+            m += 1
+            y, m = (y + 1, 1) if m > 12 else (y, m)
+            if date(y, m, 1) > b:
+                break
+            months.append((y, m))
+        k = next(s for s in (1, 2, 3, 6, 12) if len(months) / s <= n)
+        months = [(y, m) for y, m in months if (m - 1) % k == 0]
+        return [(date(y, m, 1).toordinal(), f"{y % 100:02d}.{m:02d}") for y, m in months]
+    k = max(1, math.ceil(span / n))
+    return [(d, date.fromordinal(d).strftime("%m/%d")) for d in range(d0, d1 + 1, k)]
+
+
+# ───────────────────────────────────────────
+# 좌표
+# ───────────────────────────────────────────
+
+def decimate(pts, bucket=2.0):
+    """[(px, py)] → 폭 bucket 픽셀마다 첫·최소·최대·마지막 점만 (모양 보존)"""
+    if len(pts) <= 4:
+        return pts
+    keep, start = [], 0
+    for i in range(1, len(pts) + 1):
+        if i < len(pts) and int(pts[i][0] // bucket) == int(pts[start][0] // bucket):
+            continue
+        grp = range(start, i)
+        keep += sorted({start, i - 1, min(grp, key=lambda j: pts[j][1]),
+                        max(grp, key=lambda j: pts[j][1])})
+        start = i
+    return [pts[j] for j in keep]
+
+
+def _points(pts):
+    return " ".join(f"{x:.1f},{y:.1f}" for x, y in pts)
+
+
+# ───────────────────────────────────────────
+# 차트
+# ───────────────────────────────────────────
+
+def line_chart(series, width=640, height=260, refs=(), bands=(), y_suffix="",
+               y_range=None, hover=48, label=""):
+    """시리즈 목록 → <svg> 문자열
+
+    series: [{"name", "x", "y", "color", "kind": line|area|bar, "bar_color": fn(v)→색}]
+    refs:   [{"y", "label", "color", "dash"}]   수평 기준선 (예: Fed 목표 2%)
+    bands:  [(x0, x1, fill)]                   x 구간 음영 (예: 장단기 역전)
+    y_range: (lo, hi) 고정 범위 — 없으면 데이터·기준선으로 자동"""
+    series = [s for s in series if s.get("x") and s.get("y")]
+    if not series:
+        return ""
+    legend = len(series) > 1
+    mt, mr, mb, ml = MARGIN
+    pw, ph = width - ml - mr, height - mt - mb - (LEGEND_H if legend else 0)
+
+    xs = [[day_number(x) for x in s["x"]] for s in series]
+    d0, d1 = min(x[0] for x in xs), max(x[-1] for x in xs)
+    bars = any(s.get("kind") == "bar" for s in series)
+    if bars:                                   # 막대가 양 끝에서 잘리지 않게 반 칸 여유
+        gap = max(1, (d1 - d0) // max(1, max(len(x) for x in xs)))
+        d0, d1 = d0 - gap / 2, d1 + gap / 2
+    if d1 <= d0:
+        d1 = d0 + 1
+    if y_range:
+        lo, hi = y_range
+        ticks, step = nice_ticks(lo, hi)
+        ticks = [t for t in ticks if lo - 1e-9 <= t <= hi + 1e-9]
+    else:
+        vals = [v for s in series for v in s["y"]] + [r["y"] for r in refs]
+        lo, hi = min(vals), max(vals)
+        pad = (hi - lo) * 0.05 or abs(hi) * 0.05 or 1
+        ticks, step = nice_ticks(lo - pad, hi + pad)
+        lo, hi = ticks[0], ticks[-1]
+    sx = lambda d: ml + (d - d0) / (d1 - d0) * pw
+    sy = lambda v: mt + (hi - v) / (hi - lo) * ph
+    dx = lambda px: d0 + (px - ml) / pw * (d1 - d0)          # sx 역변환 (툴팁 구간 → 날짜)
+
+    aria = f' aria-label="{escape(label)}"' if label else ""
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+           f'width="100%" height="100%" role="img"{aria}>',
+           f'<g {FONT} fill="{AXIS_COLOR}">']
+    # 격자 + y 눈금
+    for t in ticks:
+        y = sy(t)
+        out.append(f'<line x1="{ml}" x2="{ml + pw}" y1="{y:.1f}" y2="{y:.1f}" stroke="{GRID_COLOR}"/>'
+                   f'<text x="{ml - 6}" y="{y + 3:.1f}" text-anchor="end">{_fmt(t, step, y_suffix)}</text>')
+    # x 눈금
+    for d, text in date_ticks(math.ceil(d0), math.floor(d1)):
+        x = sx(d)
+        out.append(f'<line x1="{x:.1f}" x2="{x:.1f}" y1="{mt}" y2="{mt + ph}" stroke="{GRID_COLOR}"/>'
+                   f'<text x="{x:.1f}" y="{mt + ph + 14}" text-anchor="middle">{text}</text>')
+    out.append("</g>")
+    # 음영 구간
+    for b0, b1, fill in bands:
+        if b0 and b1:
+            x0, x1 = sx(day_number(b0)), sx(day_number(b1))
+            out.append(f'<rect x="{x0:.1f}" y="{mt}" width="{max(0.5, x1 - x0):.1f}" '
+                       f'height="{ph}" fill="{fill}"/>')
+    # 시리즈
+    for s, sxs in zip(series, xs):
+        color = s.get("color", "#2563eb")
+        kind = s.get("kind", "line")
+        if kind == "bar":                      # 색별로 막대를 path 하나에 모음
+            bw = max(1.0, pw / len(sxs) * 0.8)
+            base = sy(max(lo, min(hi, 0)))
+            fn = s.get("bar_color") or (lambda v: color)
+            paths = {}
+            for d, v in zip(sxs, s["y"]):
+                y = sy(min(hi, max(lo, v)))
+                paths.setdefault(fn(v), []).append(
+                    f"M{sx(d) - bw / 2:.1f} {base:.1f}V{y:.1f}h{bw:.1f}V{base:.1f}z")
+            out += [f'<path d="{"".join(d)}" fill="{c}"/>' for c, d in paths.items()]
+            continue
+        pts = decimate([(sx(d), sy(v)) for d, v in zip(sxs, s["y"])])
+        if kind == "area":
+            y0 = mt + ph
+            out.append(f'<polygon points="{pts[0][0]:.1f},{y0} {_points(pts)} {pts[-1][0]:.1f},{y0}" '
+                       f'fill="{color}" fill-opacity="0.07"/>')
+        out.append(f'<polyline points="{_points(pts)}" fill="none" stroke="{color}" '
+                   f'stroke-width="{s.get("width", 2)}" stroke-linejoin="round"/>')
+    # 기준선
+    for r in refs:
+        y = sy(r["y"])
+        color = r.get("color", AXIS_COLOR)
+        out.append(f'<line x1="{ml}" x2="{ml + pw}" y1="{y:.1f}" y2="{y:.1f}" stroke="{color}" '
+                   f'stroke-width="1.5" stroke-dasharray="{r.get("dash", "2,3")}"/>')
+        if r.get("label"):
+            out.append(f'<text x="{ml + pw - 4}" y="{y - 4:.1f}" text-anchor="end" {FONT} '
+                       f'fill="{color}">{escape(r["label"])}</text>')
+    # 범례
+    if legend:
+        x, y = ml, height - 6
+        for s in series:
+            name = escape(s.get("name", ""))
+            out.append(f'<line x1="{x}" x2="{x + 14}" y1="{y - 3}" y2="{y - 3}" '
+                       f'stroke="{s.get("color", "#2563eb")}" stroke-width="2"/>'
+                       f'<text x="{x + 18}" y="{y}" {FONT} fill="#374151">{name}</text>')
+            x += 30 + len(s.get("name", "")) * 7
+    out.append(_hover(series, xs, sx, dx, mt, ph, ml, pw, hover, y_suffix))
+    out.append("</svg>")
+    return "".join(out)
+
+
+def _hover(series, xs, sx, dx, top, ph, ml, pw, n, suffix):
+    """플롯 폭을 n 구간(최대 관측 수)으로 나눠 구간마다 투명 rect + <title> (중앙에 가장 가까운 관측치)
+
+    이웃 구간의 툴팁이 같으면 rect 하나로 합친다."""
+    n = min(n, max(len(x) for x in xs))
+    w, cols = pw / n, []                       # cols: [시작 구간, 끝 구간, 텍스트]
+    for i in range(n):
+        cx = ml + (i + 0.5) * w
+        target = dx(cx)
+        lines, when = [], None
+        for s, sxs in zip(series, xs):
+            j = min(len(sxs) - 1, bisect_left(sxs, target))
+            if j and target - sxs[j - 1] < sxs[j] - target:
+                j -= 1
+            if abs(sx(sxs[j]) - cx) > w:                      # 구간 근처에 관측치 없음
+                continue
+            when = when or s["x"][j]
+            lines.append(f'{s.get("name", "")} {s["y"][j]:,}{suffix}')
+        text = "&#10;".join(escape(t) for t in [when, *lines]) if lines else ""
+        if cols and cols[-1][2] == text:
+            cols[-1][1] = i
+        else:
+            cols.append([i, i, text])
+    rects = "".join(f'<rect x="{ml + a * w:.1f}" y="{top}" width="{(b - a + 1) * w:.1f}" '
+                    f'height="{ph}"><title>{text}</title></rect>' for a, b, text in cols if text)
+    return f'<g fill="transparent">{rects}</g>'
+
+
+def sparkline(ys, width=96, height=24, color=None, up="#e53e3e", down="#3182ce"):
+    """값 목록 → 카드용 미니 추세선 <svg> (색은 첫 값 대비 상승/하락)"""
+    ys = [v for v in ys if v is not None and not (isinstance(v, float) and math.isnan(v))]
+    if len(ys) < 2:
+        return ""
+    lo, hi = min(ys), max(ys)
+    span = (hi - lo) or 1
+    step = (width - 2) / (len(ys) - 1)
+    pts = [(1 + i * step, 1 + (hi - v) / span * (height - 2)) for i, v in enumerate(ys)]
+    color = color or (up if ys[-1] >= ys[0] else down)
+    return (f'<svg class="spark" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+            f'width="{width}" height="{height}" aria-hidden="true">'
+            f'<polyline points="{_points(pts)}" fill="none" stroke="{color}" stroke-width="1.5" '
+            f'stroke-linejoin="round"/></svg>')
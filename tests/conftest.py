@@ -0,0 +1,22 @@
+"""공통 픽스처 — 저장소 루트 import 경로, 실행 상태(캐시·지연 표시·예산) 격리"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import generate  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_run(tmp_path, monkeypatch):
+    """디스크 캐시는 임시 디렉터리로, 녹화·재생·예산·지연 표시·HTTP 메모는 비운 채 시작"""
+    monkeypatch.setattr(generate, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(generate, "_TAP", None)
+    monkeypatch.setattr(generate, "_BUDGET_END", None)
+    generate._STALE.clear()
+    generate.new_http_run()
+    yield
+    generate._STALE.clear()
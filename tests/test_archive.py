@@ -0,0 +1,76 @@
+"""아카이브 — meta.json 끝부분 덧붙이기/교체/백필, 고정 분할 목록 페이지"""
+
+import json
+from pathlib import Path
+
+import archive
+
+TEMPLATE = Path(archive.__file__).parent / "templates" / "archive.html"
+
+
+def entry(date, label=None):
+    return {"date": date, "label": label or f"{date} 브리핑", "file": f"{date}.html"}
+
+
+def full_dump(items):
+    return json.dumps(items, ensure_ascii=False, indent=2)
+
+
+def test_append_keeps_full_dump_format(tmp_path):
+    path = tmp_path / "meta.json"
+    items = [entry(d) for d in ("20250101", "20250102", "20250103")]
+    assert [archive.append_meta(path, e) for e in items] == [1, 1, 1]
+    assert path.read_text(encoding="utf-8") == full_dump(items)
+
+
+def test_same_date_replaces_last_entry(tmp_path):
+    path = tmp_path / "meta.json"
+    archive.append_meta(path, entry("20250101"))
+    archive.append_meta(path, entry("20250102"))
+    assert archive.append_meta(path, entry("20250102", "다시 실행")) == 0
+    assert path.read_text(encoding="utf-8") == full_dump([entry("20250101"), entry("20250102", "다시 실행")])
+
+
+def test_backfill_rewrites_in_order(tmp_path):
+    path = tmp_path / "meta.json"
+    archive.append_meta(path, entry("20250103"))
+    assert archive.append_meta(path, entry("20250101")) == 1
+    assert archive.append_meta(path, entry("20250101", "교체")) == 0
+    assert json.loads(path.read_text(encoding="utf-8")) == [entry("20250101", "교체"), entry("20250103")]
+
+
+def test_long_entries_beyond_tail_and_corrupt_file(tmp_path):
+    path = tmp_path / "meta.json"
+    big = entry("20250101", "가" * (archive._TAIL * 2))
+    archive.append_meta(path, big)
+    archive.append_meta(path, entry("20250102"))
+    assert json.loads(path.read_text(encoding="utf-8")) == [big, entry("20250102")]
+    path.write_text("[{broken", encoding="utf-8")
+    assert archive.append_meta(path, entry("20250103")) == 1
+    assert json.loads(path.read_text(encoding="utf-8")) == [entry("20250103")]
+
+
+def add(arc, date):
+    return arc.add(date, f"{date} 브리핑", "h", "now", "# md", "<p>body</p>")
+
+
+def test_pages_split_by_page_size_and_link_forward(tmp_path):
+    arc = archive.Archive(tmp_path, page_size=2, template=TEMPLATE)
+    for d in ("20250101", "20250102", "20250103"):
+        add(arc, d)
+    assert [e["date"] for e in arc._load_page(1)] == ["20250101", "20250102"]
+    assert [e["date"] for e in arc._load_page(2)] == ["20250103"]
+    assert "pages/0002.html" in arc._page_path(1, "html").read_text(encoding="utf-8")
+    assert json.loads(arc.state_path.read_text()) == {"count": 3, "latest": "20250103", "page_size": 2}
+    assert "총 3건" in (tmp_path / "archive.html").read_text(encoding="utf-8")
+
+
+def test_rerun_and_backfill_keep_pages_consistent(tmp_path):
+    arc = archive.Archive(tmp_path, page_size=2, template=TEMPLATE)
+    for d in ("20250102", "20250103", "20250104"):
+        add(arc, d)
+    add(arc, "20250104")                                     # 같은 날 재실행
+    add(arc, "20250101")                                     # 백필 → 경계 재계산
+    assert [[e["date"] for e in arc._load_page(n)] for n in (1, 2)] == \
+        [["20250101", "20250102"], ["20250103", "20250104"]]
+    assert json.loads(arc.state_path.read_text())["count"] == 4
@@ -0,0 +1,71 @@
+"""브리핑 섹션 누적기 — 제목 경계로 섹션 완성, 중단 시 완성된 섹션까지만"""
+
+import pytest
+
+import generate
+
+MD = ("검색 결과를 정리하겠습니다.\n"
+      "# 📊 2025년 03월 10일 브리핑\n\n요약\n\n"
+      "## 🇺🇸 미국\n\n- S&P 500 상승\n\n"
+      "## 🇰🇷 한국\n\n- 코스피 하락\n")
+
+
+def chunks(text, n=7):
+    return [text[i:i + n] for i in range(0, len(text), n)]
+
+
+def test_sections_complete_at_next_heading_and_preamble_is_dropped():
+    doc = generate.BriefingSections()
+    done = [sec for c in chunks(MD) for sec in doc.feed(c)]
+    assert [s.splitlines()[0] for s in done] == ["# 📊 2025년 03월 10일 브리핑", "## 🇺🇸 미국"]
+    doc.close()
+    assert doc.markdown == MD[MD.index("# "):].strip()
+    assert len(doc.html) == 3 and "검색 결과" not in doc.to_html()
+
+
+def test_chunking_does_not_change_result():
+    whole = generate.BriefingSections()
+    whole.feed(MD)
+    whole.close()
+    split = generate.BriefingSections()
+    for c in chunks(MD, 1):
+        split.feed(c)
+    split.close()
+    assert split.md == whole.md
+
+
+def test_incomplete_close_drops_tail_section():
+    doc = generate.BriefingSections()
+    doc.feed(MD[:MD.index("- 코스피")])
+    doc.close(complete=False)
+    assert doc.markdown.endswith("- S&P 500 상승")
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """스트리밍 이벤트 대체 — 텍스트를 흘린 뒤 cut 지점에서 마감 초과"""
+    monkeypatch.setattr(generate, "BRIEFING_STREAM", True)
+    monkeypatch.setattr(generate, "METRICS", generate.RunMetrics())
+
+    def run(text):
+        def events(open_stream, deadline=None, tap_key=None):
+            for c in chunks(text):
+                yield "text", c
+            raise TimeoutError
+        monkeypatch.setattr(generate, "claude_events", events)
+        doc = generate.BriefingSections()
+        return doc, generate.run_briefing_request({}, doc, None, 0)
+    return run
+
+
+def test_deadline_truncates_at_section_boundary(stream):
+    doc, (searches, response, complete) = stream(MD[:MD.index("- 코스피") + 3])
+    assert complete is False
+    assert [m.splitlines()[0] for m in doc.md[:2]] == ["# 📊 2025년 03월 10일 브리핑", "## 🇺🇸 미국"]
+    assert "한국" not in doc.markdown and "시간 초과" in doc.md[-1]
+    assert generate.METRICS.counters["claude.deadline_exceeded"] == 1
+
+
+def test_deadline_without_complete_section_raises(stream):
+    with pytest.raises(TimeoutError):
+        stream(MD[:MD.index("요약")])
@@ -0,0 +1,89 @@
+"""디스크 응답 캐시 — TTL 적중·만료, 304 재검증, 갱신 실패 시 지난 값(지연 표시)"""
+
+import pytest
+
+import generate
+
+
+class Resp:
+    def __init__(self, status=200, body=None, headers=None):
+        self.status_code, self.body, self.headers = status, body, headers or {}
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise OSError(f"HTTP {self.status_code}")
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """http_get 대체 — responses 큐에서 차례로 응답, 받은 헤더를 기록"""
+    state = {"responses": [], "seen": []}
+
+    def fake_get(url, params=None, headers=None, timeout=10):
+        state["seen"].append(dict(headers or {}))
+        r = state["responses"].pop(0)
+        if isinstance(r, Exception):
+            raise r
+        return r
+    monkeypatch.setattr(generate, "http_get", fake_get)
+    monkeypatch.setitem(generate.CACHE_TTL, "t", 600)
+    return state
+
+
+def get():
+    return generate.cached_http_json("t", "https://example.test/a", {"q": 1, "api_key": "k"})
+
+
+def test_fresh_entry_is_served_without_a_request(server):
+    server["responses"] = [Resp(body={"v": 1}, headers={"ETag": '"e1"'})]
+    assert get() == {"v": 1}
+    assert get() == {"v": 1}
+    assert len(server["seen"]) == 1
+
+
+def test_expired_entry_revalidates_and_keeps_body_on_304(server, monkeypatch):
+    server["responses"] = [Resp(body={"v": 1}, headers={"ETag": '"e1"', "Last-Modified": "Mon"}),
+                           Resp(status=304)]
+    get()
+    monkeypatch.setitem(generate.CACHE_TTL, "t", 0)           # 만료
+    assert get() == {"v": 1}
+    assert server["seen"][1] == {"If-None-Match": '"e1"', "If-Modified-Since": "Mon"}
+
+
+def test_expired_entry_is_replaced_by_new_body(server, monkeypatch):
+    server["responses"] = [Resp(body={"v": 1}), Resp(body={"v": 2})]
+    get()
+    monkeypatch.setitem(generate.CACHE_TTL, "t", 0)
+    assert get() == {"v": 2}
+    monkeypatch.setitem(generate.CACHE_TTL, "t", 600)
+    assert get() == {"v": 2}                                  # 새 본문이 저장됨
+
+
+def test_error_serves_stale_entry_and_marks_source(server, monkeypatch):
+    server["responses"] = [Resp(body={"v": 1}), OSError("down")]
+    get()
+    monkeypatch.setitem(generate.CACHE_TTL, "t", 0)
+    assert get() == {"v": 1}
+    assert "t" in generate._STALE
+
+
+def test_error_without_entry_or_past_max_stale_raises(server, monkeypatch):
+    server["responses"] = [Resp(status=500)]
+    with pytest.raises(OSError):
+        get()
+    server["responses"] = [Resp(body={"v": 1}), OSError("down")]
+    get()
+    monkeypatch.setitem(generate.CACHE_TTL, "t", 0)
+    monkeypatch.setattr(generate, "CACHE_MAX_STALE", -1)
+    with pytest.raises(OSError, match="down"):
+        get()
+
+
+def test_api_key_is_not_written_to_disk(server, tmp_path):
+    server["responses"] = [Resp(body={"v": 1})]
+    get()
+    files = list((tmp_path / "cache" / "t").glob("*.json"))
+    assert len(files) == 1 and "api_key" not in files[0].read_text()
@@ -0,0 +1,86 @@
+"""FRED 관측치 저장소 — 개정 윈도부터의 증분 병합, 다음 발표일 전 요청 생략"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+import generate
+
+
+@pytest.fixture
+def fred(monkeypatch):
+    """FRED 요청 대체 — observations 큐에서 차례로 응답, 요청 시작일을 기록"""
+    state = {"responses": [], "starts": [], "next_release": None}
+
+    def fake_json(url, params=None, headers=None, timeout=10):
+        state["starts"].append(params["observation_start"])
+        r = state["responses"].pop(0)
+        if isinstance(r, Exception):
+            raise r
+        return {"observations": [{"date": d, "value": v} for d, v in r]}
+    monkeypatch.setattr(generate, "FRED_API_KEY", "k")
+    monkeypatch.setattr(generate, "http_json", fake_json)
+    monkeypatch.setattr(generate, "_fred_next_release", lambda sid, store, today: state["next_release"])
+    monkeypatch.setattr(generate, "_CLOCK", None)
+    monkeypatch.setattr(generate, "METRICS", generate.RunMetrics())
+    generate.start_run_clock(datetime(2025, 3, 10, 7, tzinfo=generate.KST))
+    return state
+
+
+def test_first_run_backfills_and_persists(fred):
+    fred["responses"] = [[("2025-01-01", "1.0"), ("2025-02-01", "."), ("2025-03-01", "2.0")]]
+    assert generate.fred_observations("X") == [("2025-01-01", 1.0), ("2025-03-01", 2.0)]
+    assert fred["starts"] == [generate.FRED_STORE_START]
+    store = json.loads(generate._fred_store_path("X").read_text())
+    assert store["observations"] == [["2025-01-01", 1.0], ["2025-03-01", 2.0]]
+    assert store["updated_at"] == "2025-03-10"
+
+
+def test_incremental_request_replaces_revision_window(fred, monkeypatch):
+    monkeypatch.setitem(generate.FRED_REVISION_DAYS, "X", 30)
+    fred["responses"] = [[("2024-12-01", "1.0"), ("2025-01-01", "2.0"), ("2025-02-01", "3.0")],
+                         [("2025-01-02", "9.0"), ("2025-02-01", "3.5"), ("2025-03-01", "4.0")]]
+    generate.fred_observations("X")
+    obs = generate.fred_observations("X")
+    assert fred["starts"][1] == "2025-01-02"               # 마지막 관측 - 30일
+    assert obs == [("2024-12-01", 1.0), ("2025-01-01", 2.0), ("2025-01-02", 9.0),
+                   ("2025-02-01", 3.5), ("2025-03-01", 4.0)]
+
+
+def test_skips_request_until_next_release(fred):
+    fred["responses"] = [[("2025-03-01", "1.0")]]
+    fred["next_release"] = "2025-03-10"
+    generate.fred_observations("X")
+    assert generate.fred_observations("X") == [("2025-03-01", 1.0)]
+    assert len(fred["starts"]) == 1
+    assert generate.METRICS.counters["fred.release_skip"] == 1
+
+
+def test_requests_again_after_release_day(fred):
+    fred["responses"] = [[("2025-03-01", "1.0")], [("2025-03-01", "1.0"), ("2025-03-09", "2.0")]]
+    fred["next_release"] = "2025-03-09"
+    generate.fred_observations("X")
+    assert generate.fred_observations("X")[-1] == ("2025-03-09", 2.0)
+    assert len(fred["starts"]) == 2
+
+
+def test_failure_serves_store_and_marks_stale(fred):
+    fred["responses"] = [[("2025-03-01", "1.0")], OSError("down")]
+    generate.fred_observations("X")
+    assert generate.fred_observations("X") == [("2025-03-01", 1.0)]
+    assert "fred_X" in generate._STALE
+    fred["responses"] = [OSError("down")]
+    with pytest.raises(OSError):
+        generate.fred_observations("Y")                    # 저장소 없음 → 단계가 대체
+
+
+def test_start_filters_and_wider_start_refetches(fred):
+    fred["next_release"] = "2025-04-01"
+    fred["responses"] = [[("2024-01-01", "1.0"), ("2025-01-01", "2.0")],
+                         [("2010-01-01", "0.5"), ("2024-01-01", "1.0"), ("2025-01-01", "2.0")]]
+    generate.fred_observations("X")
+    assert generate.fred_observations("X", "2024-06-01") == [("2025-01-01", 2.0)]
+    assert len(fred["starts"]) == 1                       # 좁은 범위는 저장소에서
+    assert generate.fred_observations("X", "2009-01-01")[0] == ("2010-01-01", 0.5)
+    assert fred["starts"][-1] == "2009-01-01"             # 넓은 범위는 재백필
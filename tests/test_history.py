@@ -0,0 +1,41 @@
+"""history_rows — 수집 실패 기본값이 히스토리에 실제 값으로 남지 않는지"""
+
+import math
+
+import generate
+
+
+class _EmptyStore:
+    def closes(self, sym, **kw):
+        return []
+
+
+def _offline(monkeypatch):
+    def fail(*a, **kw):
+        raise OSError("offline")
+    monkeypatch.setattr(generate, "fetch_cnn_graphdata", fail)
+    monkeypatch.setattr(generate, "http_json", fail)
+    monkeypatch.setattr(generate, "lkg_load", lambda source: (None, None))
+
+
+def test_failed_move_pcc_is_not_recorded(monkeypatch):
+    _offline(monkeypatch)
+    mp = generate.fetch_move_pcc(_EmptyStore())
+    assert sorted(mp["missing"]) == ["move", "pcc"]
+    rows = generate.history_rows(move_pcc=mp)
+    assert "move_pcc" not in rows                 # move_chg=0 기본값도 남기지 않음
+
+
+def test_failed_fetches_leave_no_history(monkeypatch):
+    _offline(monkeypatch)
+    fg = generate.fetch_fear_greed()
+    mp = generate.fetch_move_pcc(_EmptyStore())
+    assert generate.history_rows(fg=fg, move_pcc=mp) == {}
+
+
+def test_partial_move_pcc_blanks_only_failed_part(monkeypatch):
+    _offline(monkeypatch)
+    mp = {"move_now": 98.5, "move_chg": 0.0, "pcc_now": 0, "pcc_chg": 0, "missing": ["pcc"]}
+    row = generate.history_rows(move_pcc=mp)["move_pcc"]
+    assert row["move_now"] == 98.5 and row["move_chg"] == 0.0   # 실제 0 변화는 유지
+    assert row["pcc_now"] is None and row["pcc_chg"] is None
@@ -0,0 +1,71 @@
+"""OHLC 저장소 — 일괄 다운로드 프레임 upsert, 심볼별 다운로드 묶음"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from marketstore import OHLCStore
+
+NAN = np.nan
+
+
+def frame(data, order="ticker"):
+    """{심볼: [(날짜, 종가)]} → yfinance 일괄 다운로드 모양 (휴장일은 NaN)"""
+    days = sorted({d for bars in data.values() for d, _ in bars})
+    cols, vals = [], []
+    for sym, bars in data.items():
+        close = dict(bars)
+        for f in ("Open", "High", "Low", "Close", "Volume"):
+            cols.append((sym, f) if order == "ticker" else (f, sym))
+            vals.append([close.get(d, NAN) if f != "Volume" else 100.0 for d in days])
+    return pd.DataFrame(np.array(vals).T, index=pd.to_datetime(days),
+                        columns=pd.MultiIndex.from_tuples(cols))
+
+
+@pytest.fixture
+def store():
+    s = OHLCStore()
+    yield s
+    s.close()
+
+
+@pytest.mark.parametrize("order", ["ticker", "column"])
+def test_upsert_skips_holidays_and_replaces_same_date(store, order):
+    df = frame({"A": [("2025-01-02", 1.0), ("2025-01-03", 2.0)], "B": [("2025-01-03", 5.0)]}, order)
+    assert store.upsert(df, ["A", "B", "MISSING"]) == 3
+    assert store.closes("B") == [("2025-01-03", 5.0)]                # 01-02 NaN 행은 저장 안 함
+    store.upsert(frame({"A": [("2025-01-03", 2.5), ("2025-01-06", 3.0)]}, order), ["A"])
+    assert store.closes("A") == [("2025-01-02", 1.0), ("2025-01-03", 2.5), ("2025-01-06", 3.0)]
+    assert store.closes("A", last=2) == [("2025-01-03", 2.5), ("2025-01-06", 3.0)]
+    assert store.count() == 4 and store.latest() == "2025-01-06"
+
+
+def test_upsert_flat_single_symbol(store):
+    df = pd.DataFrame({"Open": [1.0, NAN], "Close": [1.5, NAN]},
+                      index=pd.to_datetime(["2025-01-02", "2025-01-03"]))
+    assert store.upsert(df, ["A"]) == 1
+    assert store.closes("A") == [("2025-01-02", 1.5)]
+
+
+def test_download_plan_groups_by_last_bar(store):
+    store.upsert(frame({"A": [("2025-03-07", 1.0)], "B": [("2025-03-03", 1.0)],
+                        "C": [("2025-03-09", 1.0)], "OLD": [("2024-06-28", 1.0)]}),
+                 ["A", "B", "C", "OLD"])
+    plan = store.download_plan(["NEW", "A", "OLD", "B", "C"], revision_days=5, slack_days=7)
+    assert plan == [(None, ["NEW"]),
+                    ("2025-02-26", ["A", "B", "C"]),                  # B(03-03) - 5일
+                    ("2024-06-23", ["OLD"])]                          # 뒤처진 심볼은 따로
+
+
+def test_download_plan_empty_store_backfills_all(store):
+    assert store.download_plan(["A", "B"]) == [(None, ["A", "B"])]
+
+
+def test_persists_to_file(tmp_path):
+    path = tmp_path / "db" / "ohlc.sqlite"
+    s = OHLCStore(path)
+    s.upsert(frame({"A": [("2025-01-02", 1.0)]}), ["A"])
+    s.close()
+    s = OHLCStore(path)
+    assert s.last_dates(["A", "B"]) == {"A": "2025-01-02", "B": None}
+    s.close()
@@ -0,0 +1,125 @@
+"""재시도·헤지 — 지터 백오프, Retry-After, 예산 중단, 헤지 요청, 마지막 정상값 저장 조건"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+import generate
+from generate import Retryable
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """time.sleep 대체 — 대기 시간만 기록"""
+    waits = []
+    monkeypatch.setattr(time, "sleep", waits.append)
+    monkeypatch.setattr(generate, "METRICS", generate.RunMetrics())
+    return waits
+
+
+def flaky(*outcomes):
+    """outcomes를 차례로 올리거나 돌려주는 fn"""
+    it = iter(outcomes)
+
+    def fn():
+        r = next(it)
+        if isinstance(r, Exception):
+            raise r
+        return r
+    return fn
+
+
+def test_retry_after_seconds_and_http_date():
+    assert generate.retry_after("7") == 7.0
+    assert generate.retry_after("-3") == 0.0
+    assert generate.retry_after(None) is None and generate.retry_after("soon") is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < generate.retry_after(later) <= 30
+
+
+def test_backoff_is_capped_full_jitter():
+    for n in range(10):
+        assert 0 <= generate.backoff_delay(n) <= min(generate.RETRY_CAP, generate.RETRY_BASE * 2 ** n)
+    assert generate.backoff_delay(5, hint=1.5) == 1.5
+
+
+def test_retry_call_retries_then_succeeds(sleeps):
+    fn = flaky(Retryable("503", hint=2.0), ConnectionError("reset"), "ok")
+    assert generate.retry_call(fn, "t", retries=3, retry_on=(ConnectionError,)) == "ok"
+    assert sleeps[0] == 2.0 and len(sleeps) == 2
+    assert generate.METRICS.counters["retry.t"] == 2
+
+
+def test_retry_call_exhausted_returns_result_or_raises(sleeps):
+    assert generate.retry_call(flaky(*[Retryable("429", 0, result="last")] * 3), "t", retries=2) == "last"
+    with pytest.raises(ConnectionError):
+        generate.retry_call(flaky(*[ConnectionError("x")] * 3), "t", retries=2,
+                            retry_on=(ConnectionError,))
+    with pytest.raises(ValueError):                          # 재시도 대상이 아니면 바로
+        generate.retry_call(flaky(ValueError("bad"), "ok"), "t", retries=2)
+    assert len(sleeps) == 4
+
+
+def test_retry_call_stops_when_wait_exceeds_budget(sleeps):
+    generate.start_budget(generate.BUDGET_RESERVE + 5)
+    with pytest.raises(Retryable):
+        generate.retry_call(flaky(Retryable("429", hint=60), "ok"), "t", retries=3)
+    assert sleeps == []
+
+
+class Resp:
+    def __init__(self, status, retry_after=None):
+        self.status_code, self.content = status, b"{}"
+        self.headers = {"Retry-After": retry_after} if retry_after else {}
+
+
+def test_http_get_honours_retry_after(sleeps, monkeypatch):
+    responses = [Resp(503, "4"), Resp(429), Resp(200)]
+
+    class Session:
+        def get(self, url, **kw):
+            return responses.pop(0)
+    monkeypatch.setattr(generate, "http_session", Session)
+    monkeypatch.setattr(generate, "HTTP_RETRIES", 3)
+    assert generate.http_get("https://example.test/x").status_code == 200
+    assert sleeps[0] == 4.0 and len(sleeps) == 2
+
+
+def test_hedged_fast_call_is_not_duplicated(sleeps):
+    calls = []
+    assert generate.hedged(lambda: calls.append(1) or "r", 1.0) == "r"
+    assert calls == [1] and "http.hedged" not in generate.METRICS.counters
+
+
+def test_hedged_slow_call_loses_to_second_request(sleeps):
+    release, n = threading.Event(), []
+
+    def fn():
+        n.append(1)
+        if len(n) == 1:
+            release.wait(2)                                   # 첫 요청만 느림
+            return "slow"
+        return "fast"
+    try:
+        assert generate.hedged(fn, 0.05) == "fast"
+    finally:
+        release.set()
+    assert generate.METRICS.counters["http.hedge_won"] == 1
+
+
+def test_hedged_both_fail_raises_last_error(sleeps):
+    with pytest.raises(OSError):
+        generate.hedged(flaky(OSError("a"), OSError("b")), 0.0)
+
+
+def test_stage_keep_skips_results_with_missing():
+    st = generate.Stage("fg", lambda: None, lkg=True)
+    st.keep({"cnn": 50, "missing": ["cnn"]})
+    assert generate.lkg_load("fg") == (None, None)
+    st.keep({"cnn": 61, "missing": []})
+    assert generate.lkg_load("fg")[0] == {"cnn": 61, "missing": []}
+    assert st.recover(OSError("down")) == {"cnn": 61, "missing": []}
+    assert "fg" in generate._STALE
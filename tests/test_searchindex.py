@@ -0,0 +1,104 @@
+"""검색 색인 — 토큰·티커 규칙, 샤드 해시 고정값, 증분 추가·교체·재구축"""
+
+import json
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import searchindex as si
+
+TEXT = "## 🇺🇸 미국\n엔비디아($NVDA)와 삼성전자(005930.KS) 상승. The Fed 금리 https://x.com/a 동결 S&P"
+
+
+def test_tokens_bigrams_words_and_codes():
+    toks = si.tokens(TEXT)
+    assert {"미국", "엔비", "비디", "디아", "삼성", "전자", "금리", "동결"} <= toks
+    assert {"nvda", "005930", "fed", "s&p"} <= toks
+    assert not {"the", "https", "com", "x"} & toks                 # URL 제거, 불용어 제외
+    assert si.tokens("금 상승") == {"금", "상승"}
+
+
+def test_tickers_in_order_without_duplicates():
+    assert si.tickers(TEXT + " 다시 $NVDA (TSLA)") == ["NVDA", "005930", "TSLA"]
+
+
+def test_shard_of_is_fnv1a_32():
+    # FNV-1a 32비트 공개 테스트 벡터 — 브라우저 shardOf()와 파일 배치가 어긋나지 않도록 고정
+    assert si.shard_of("a", 2 ** 32) == 0xE40C292C
+    assert si.shard_of("foobar", 2 ** 32) == 0xBF9CF968
+    assert [si.shard_of(t) for t in ("a", "foobar", "반도")] == [44, 40, 25]
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="node 없음")
+def test_browser_tokens_and_shards_match():
+    page = (Path(si.__file__).parent / "templates" / "archive.html").read_text(encoding="utf-8")
+    stop = re.search(r"const STOP=.*?;", page).group(0)
+    fns = re.search(r"function tokens\(text\)\{.*?\n  function shardOf.*?\n  \}", page, re.S).group(0)
+    src = (stop + fns + f"\nconst t=tokens({json.dumps(TEXT)});"
+           "console.log(JSON.stringify(t.map(x=>[x,shardOf(x,64)])))")
+    out = json.loads(subprocess.run(["node", "-e", src], capture_output=True, text=True,
+                                    check=True).stdout)
+    assert {t: int(no, 16) for t, no in out} == {t: si.shard_of(t) for t in si.tokens(TEXT)}
+
+
+def lookup(idx, token):
+    """브라우저와 같은 경로 — meta의 연도별 샤드에서 토큰의 문서 날짜"""
+    meta = json.loads(idx.meta_path.read_text(encoding="utf-8"))
+    out = []
+    for year in meta["years"]:
+        shard = idx._load(year, si.shard_of(token, idx.shards))
+        out += [meta["docs"][i]["d"] for i in si._decode(shard.get(token, []))]
+    return out
+
+
+def test_add_unchanged_and_replaced(tmp_path):
+    idx = si.SearchIndex(tmp_path)
+    assert idx.add("20250101", "1월 1일", "20250101.html", "금리 동결")[0] == "added"
+    assert idx.add("20250102", "1월 2일", "20250102.html", "금리 인상 $NVDA")[0] == "added"
+    assert idx.add("20250102", "1월 2일", "20250102.html", "금리 인상 $NVDA") == ("unchanged", 0)
+    assert lookup(idx, "금리") == ["20250101", "20250102"]
+    assert idx.add("20250102", "1월 2일", "20250102.html", "환율 급등")[0] == "replaced"
+    assert lookup(idx, "인상") == [] and lookup(idx, "환율") == ["20250102"]
+    meta = json.loads(idx.meta_path.read_text(encoding="utf-8"))
+    assert [d["d"] for d in meta["docs"]] == ["20250101", "20250102"] and meta["docs"][1]["t"] == []
+
+
+def test_new_year_leaves_last_year_shards_untouched(tmp_path):
+    idx = si.SearchIndex(tmp_path)
+    idx.add("20241231", "12월 31일", "20241231.html", "금리 동결")
+    before = {p: p.read_bytes() for p in (tmp_path / "search" / "2024").glob("*.json")}
+    idx.add("20250102", "1월 2일", "20250102.html", "금리 인상")
+    assert {p: p.read_bytes() for p in (tmp_path / "search" / "2024").glob("*.json")} == before
+    assert lookup(idx, "금리") == ["20241231", "20250102"]
+
+
+def test_rebuild_from_archive_matches_incremental(tmp_path):
+    docs = [("20241231", "금리 동결 $AAPL"), ("20250102", "금리 인상"), ("20250103", "환율 급등")]
+    inc = si.SearchIndex(tmp_path / "inc")
+    for d, text in docs:
+        inc.add(d, d, f"{d}.html", text)
+    arc = tmp_path / "arc"
+    (arc / "search" / "2020").mkdir(parents=True)
+    (arc / "search" / "2020" / "00.json").write_text("{}")                  # 낡은 샤드는 지움
+    (arc / "meta.json").write_text(json.dumps([{"date": d, "label": d, "file": f"{d}.html"}
+                                               for d, _ in docs] + [{"date": "20250104", "label": "x",
+                                                                     "file": "x"}]))
+    for d, text in docs:
+        (arc / f"{d}.md").write_text(text, encoding="utf-8")
+    built = si.SearchIndex(arc)
+    built.add("20250103", "20250103", "20250103.html", "환율 급등")           # 메타 없음 → 재구축
+    files = lambda root: {p.relative_to(root).as_posix(): p.read_text(encoding="utf-8")
+                          for p in (root / "search").rglob("*.json")}
+    assert files(arc) == files(tmp_path / "inc")
+
+
+def test_shard_count_change_triggers_rebuild(tmp_path):
+    (tmp_path / "meta.json").write_text(json.dumps([{"date": "20250101", "label": "l", "file": "f"}]))
+    (tmp_path / "20250101.md").write_text("금리", encoding="utf-8")
+    si.SearchIndex(tmp_path).add("20250101", "l", "f", "금리")
+    idx = si.SearchIndex(tmp_path, shards=8)
+    assert idx.add("20250101", "l", "f", "금리") == ("unchanged", 0)
+    assert lookup(idx, "금리") == ["20250101"]
@@ -0,0 +1,86 @@
+"""분할 출력 — 시리즈 델타 인코딩 왕복, data.json 페이로드, 셸 HTML"""
+
+import json
+import re
+import shutil
+import subprocess
+from datetime import date
+
+import pytest
+
+import generate
+
+DAILY = {"x": ["2024-12-30", "2024-12-31", "2025-01-02", "2025-01-03", "2025-03-01"],
+         "y": [4.57, 4.58, 4.5, 4.61, 4.2]}
+MONTHLY = {"x": ["2023-11", "2023-12", "2024-01", "2024-03"], "y": [307.1, 308.85, 309.2, 311.0]}
+
+
+def unpack(p):
+    """셸 JS unpack()과 같은 복원"""
+    if "x" in p:
+        return p
+    f, y, v = 10 ** p["k"], [], 0
+    for d in p["y"]:
+        v += d
+        y.append(v / f)
+    if p["t"] == "m":
+        m, x = int(p["x0"][:4]) * 12 + int(p["x0"][5:7]) - 1, [p["x0"]]
+        for d in p["dx"]:
+            m += d
+            x.append(f"{m // 12}-{m % 12 + 1:02d}")
+    else:
+        t, x = date.fromisoformat(p["x0"]).toordinal(), [p["x0"]]
+        for d in p["dx"]:
+            t += d
+            x.append(date.fromordinal(t).isoformat())
+    return {"x": x, "y": y}
+
+
+@pytest.mark.parametrize("xy", [DAILY, MONTHLY], ids=["daily", "monthly"])
+def test_pack_round_trip(xy):
+    p = generate.pack_series(xy)
+    assert p["t"] == ("d" if len(xy["x"][0]) == 10 else "m") and p["k"] == 2
+    assert all(isinstance(v, int) for v in p["y"] + p["dx"])
+    out = unpack(p)
+    assert out["x"] == xy["x"] and out["y"] == pytest.approx(xy["y"])
+
+
+def test_pack_passes_through_unknown_dates_and_empty():
+    xy = {"x": ["2024 Q1", "2024 Q2"], "y": [1, 2]}
+    assert generate.pack_series(xy) == xy
+    assert generate.pack_series({"x": [], "y": []}) is None
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="node 없음")
+def test_shell_unpack_matches_python():
+    js = re.search(r"function unpack\(p\)\{.*?return\{x,y\}\}", generate.SHELL_HTML, re.S).group(0)
+    packed = [generate.pack_series(DAILY), generate.pack_series(MONTHLY)]
+    src = js + f"\nconsole.log(JSON.stringify({json.dumps(packed)}.map(unpack)))"
+    out = json.loads(subprocess.run(["node", "-e", src], capture_output=True, text=True,
+                                    check=True).stdout)
+    assert out == [unpack(p) for p in packed]
+
+
+def test_split_payload_moves_chart_series_out_of_scripts():
+    fred = {k: DAILY for k in ("dgs10", "dgs2", "cpi", "ppi", "unrate", "fedfunds")}
+    mp = {"move_dates": DAILY["x"], "move_vals": DAILY["y"]}
+    d = generate.split_payload({"fred_script": "<script>old</script>", "move_pcc_script": "x",
+                                "date": "d"}, fred, mp)
+    assert set(d["s"]) == set(fred) | {"move", "pcc"}
+    assert unpack(d["s"]["pcc"])["y"] == [0] * len(DAILY["y"])       # PCC 없으면 0 막대
+    assert "S." in d["v"]["fred_script"] and "4.57" not in d["v"]["fred_script"]
+    assert d["v"]["date"] == "d"
+
+
+def test_split_payload_without_script_slots_has_no_series():
+    d = generate.split_payload({"fred_script": "", "move_pcc_script": ""}, {"dgs10": DAILY},
+                               {"move_dates": DAILY["x"], "move_vals": DAILY["y"]})
+    assert d["s"] == {}
+
+
+def test_shell_html_is_stable_and_filled():
+    tpl = generate.SlotTemplate("<h1>old</h1>", [("t", [r"<h1>(?P<slot>[^<]*)</h1>"], False, 0)])
+    shell = generate.shell_html(tpl, "d.json", "f.html")
+    assert shell == generate.shell_html(tpl, "d.json", "f.html")
+    assert "/*" + "DATA*/" not in shell and "'d.json'" in shell and 'href="f.html"' in shell
+    assert '["t","old"]' in shell.replace(" ", "")
@@ -0,0 +1,74 @@
+"""run_stages — 의존성 순서, 데드라인 대체값, REQUIRED 전파"""
+
+import threading
+import time
+
+import pytest
+
+from generate import Stage, run_stages
+
+
+def test_deps_run_after_their_inputs():
+    order, lock = [], threading.Lock()
+
+    def step(name, value):
+        def fn(*args):
+            with lock:
+                order.append(name)
+            return value + sum(args)
+        return fn
+
+    stages = [Stage("c", step("c", 100), deps=["a", "b"]),
+              Stage("a", step("a", 1)),
+              Stage("b", step("b", 10), deps=["a"])]
+    results = run_stages(stages)
+    assert results == {"a": 1, "b": 11, "c": 112}
+    assert order.index("a") < order.index("b") < order.index("c")
+
+
+def test_done_results_are_not_rerun():
+    calls = []
+    results = run_stages([Stage("b", lambda a: calls.append(a) or a * 2, deps=["a"])],
+                         done={"a": 21})
+    assert results["b"] == 42 and calls == [21]
+
+
+def test_unknown_dep_and_cycle_are_rejected():
+    with pytest.raises(ValueError, match="unknown deps"):
+        run_stages([Stage("a", lambda x: x, deps=["missing"])])
+    with pytest.raises(ValueError, match="cycle"):
+        run_stages([Stage("a", lambda b: b, deps=["b"]), Stage("b", lambda a: a, deps=["a"])])
+
+
+def test_deadline_uses_fallback_without_waiting():
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return "late"
+
+    t = time.monotonic()
+    try:
+        results = run_stages([Stage("slow", slow, deadline=0.1, fallback="fb"),
+                              Stage("after", lambda s: s + "!", deps=["slow"])])
+    finally:
+        release.set()
+    assert results == {"slow": "fb", "after": "fb!"}
+    assert time.monotonic() - t < 2
+
+
+def test_error_uses_fallback_and_callable_gets_the_exception():
+    def boom():
+        raise OSError("down")
+
+    results = run_stages([Stage("a", boom, fallback={}),
+                          Stage("b", boom, fallback=lambda e: f"fb:{e}")])
+    assert results == {"a": {}, "b": "fb:down"}
+
+
+def test_required_stage_error_propagates():
+    def boom():
+        raise KeyError("needed")
+
+    with pytest.raises(KeyError, match="needed"):
+        run_stages([Stage("ok", lambda: 1), Stage("req", boom)])
@@ -0,0 +1,47 @@
+"""슬롯 템플릿 — 조각 치환, None은 기존 내용 유지 + unbound 보고, 앵커 누락 보고"""
+
+import re
+from pathlib import Path
+
+import generate
+
+SPECS = [
+    ("title", [r"<h1>(?P<slot>[^<]*)</h1>"], False, 0),
+    ("date", [r"(?P<slot>\d{4}-\d{2}-\d{2})"], True, 0),
+    ("body", [r'<div id="nope">(?P<slot>.*?)</div>', r'<p>(?P<slot>.*?)</p>'], False, re.DOTALL),
+    ("footer", [r"<footer>(?P<slot>.*?)</footer>"], False, 0),
+]
+SRC = "<h1>old</h1><p>2024-01-01 본문</p><small>2024-01-01</small>"
+
+
+def test_slots_are_replaced_everywhere_and_nested_matches_dropped():
+    tpl = generate.SlotTemplate(SRC, SPECS)
+    html, unbound = tpl.render({"title": "new", "date": "2025-03-10", "body": "B"})
+    assert html == "<h1>new</h1><p>B</p><small>2025-03-10</small>"   # 본문 속 날짜는 본문 슬롯이 덮음
+    assert unbound == ["footer"]
+    assert tpl.missing == ["footer"]
+    assert tpl.names == {"title", "date", "body"}
+
+
+def test_none_keeps_default_and_reports_unbound():
+    tpl = generate.SlotTemplate(SRC, SPECS)
+    html, unbound = tpl.render({"title": None, "date": "2025-03-10"})
+    assert html == "<h1>old</h1><p>2024-01-01 본문</p><small>2025-03-10</small>"
+    assert unbound == ["body", "footer", "title"]
+
+
+def test_unknown_values_are_ignored_and_render_is_repeatable():
+    tpl = generate.SlotTemplate(SRC, SPECS)
+    a = tpl.render({"title": "x", "extra": "ignored"})
+    assert a == tpl.render({"title": "x", "extra": "ignored"})
+    assert "ignored" not in a[0]
+
+
+def test_compile_template_caches_per_source():
+    assert generate.compile_template(SRC, SPECS) is generate.compile_template(SRC, SPECS)
+    assert generate.compile_template(SRC + " ", SPECS) is not generate.compile_template(SRC, SPECS)
+
+
+def test_dashboard_template_binds_every_slot():
+    src = (Path(generate.__file__).parent / "templates" / "dashboard.html").read_text(encoding="utf-8")
+    assert generate.SlotTemplate(src, generate.DASHBOARD_SLOTS).missing == []
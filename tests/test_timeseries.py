@@ -0,0 +1,88 @@
+"""시계열 변환 — as-of 조인 기반 전년比, LTTB·바이트 예산 다운샘플"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import timeseries as ts
+
+
+def test_to_series_sorts_dedups_and_drops_nan():
+    s = ts.to_series([("2024-01-03", 3.0), ("2024-01-01", 1.0), ("2024-01-03", 4.0),
+                      ("2024-01-02", float("nan"))])
+    assert s.index.strftime("%Y-%m-%d").tolist() == ["2024-01-01", "2024-01-03"]
+    assert s.tolist() == [1.0, 4.0]
+
+
+def test_yoy_monthly_uses_same_month_last_year():
+    s = ts.to_series({"x": pd.date_range("2023-01-01", periods=24, freq="MS"),
+                      "y": np.arange(100.0, 124.0)})
+    out = ts.yoy(s)
+    assert out.index[0] == pd.Timestamp("2024-01-01")          # 1년 전 기준이 없으면 제외
+    assert out.iloc[0] == pytest.approx((112 - 100) / 100 * 100)
+    assert len(out) == 12
+
+
+def test_yoy_daily_falls_back_to_last_observation_before_gap():
+    # 1년 전 날짜(2024-03-10, 일요일)엔 관측이 없음 → 그 이하 마지막 관측(금요일) 기준
+    s = ts.to_series([("2024-03-08", 50.0), ("2024-03-11", 80.0), ("2025-03-10", 100.0)])
+    assert ts.yoy(s).to_dict() == {pd.Timestamp("2025-03-10"): pytest.approx(100.0)}
+
+
+def test_yoy_skips_zero_base():
+    s = ts.to_series([("2024-01-01", 0.0), ("2025-01-01", 5.0)])
+    assert ts.yoy(s).empty
+
+
+def test_asof_values_before_first_observation_is_nan():
+    s = ts.to_series([("2024-01-02", 1.0), ("2024-01-04", 2.0)])
+    out = ts.asof_values(s, pd.to_datetime(["2024-01-01", "2024-01-03", "2024-01-09"]))
+    assert np.isnan(out[0]) and out[1:].tolist() == [1.0, 2.0]
+
+
+def test_to_xy_rounds_and_filters_start():
+    s = ts.to_series([("2024-01-01", 1.234), ("2024-02-01", 2.345)])
+    assert ts.to_xy(s, decimals=1, start="2024-01-15") == {"x": ["2024-02-01"], "y": [2.3]}
+
+
+# ───────────────────────────────────────────
+# 다운샘플링 — LTTB + 바이트 예산
+# ───────────────────────────────────────────
+
+def test_lttb_keeps_endpoints_and_peak():
+    y = np.sin(np.linspace(0, 6, 500))
+    y[123] = 10.0
+    keep = ts.lttb_indices(np.arange(500), y, 50)
+    assert len(keep) == 50 and keep[0] == 0 and keep[-1] == 499
+    assert (np.diff(keep) > 0).all()
+    assert 123 in keep
+
+
+def test_lttb_small_input_is_unchanged():
+    assert ts.lttb_indices([0, 1, 2], [1, 2, 3], 10).tolist() == [0, 1, 2]
+    s = ts.to_series({"x": pd.date_range("2024-01-01", periods=5), "y": [1, 2, 3, 4, 5]})
+    assert ts.lttb(s, 2).equals(s)
+
+
+def daily(n, start="2020-01-01"):
+    x = pd.date_range(start, periods=n).strftime("%Y-%m-%d").tolist()
+    return {"x": x, "y": [round(float(v), 2) for v in np.cumsum(np.random.default_rng(0).normal(size=n))]}
+
+
+def test_fit_budget_within_budget_returns_input():
+    xys = {"a": daily(100)}
+    assert ts.fit_budget(xys, 10**6) is xys
+
+
+def test_fit_budget_shrinks_all_series_under_budget():
+    xys = {"a": daily(2000), "b": daily(1000)}
+    out = ts.fit_budget(xys, 20_000)
+    assert ts._xy_bytes(out["a"]) + ts._xy_bytes(out["b"]) <= 20_000
+    for k in xys:
+        assert out[k]["x"][0] == xys[k]["x"][0] and out[k]["x"][-1] == xys[k]["x"][-1]
+    assert len(out["a"]["x"]) > len(out["b"]["x"])           # 같은 비율로 축소
+
+
+def test_fit_budget_stops_at_min_points():
+    out = ts.fit_budget({"a": daily(1000)}, 10, min_points=40)
+    assert len(out["a"]["x"]) == 40
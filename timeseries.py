@@ -0,0 +1,188 @@
+"""
+시계열 변환 엔진 — FRED / yfinance 시리즈 공용 (NumPy·pandas 벡터화)
+
+모든 함수는 날짜 오름차순 DatetimeIndex를 가진 float Series를 주고받는다.
+to_series()로 입력을 정규화하고, 변환 후 to_xy()로 차트용 {"x","y"}를 만든다.
+기준 시점 값은 as-of 조인(searchsorted)으로 찾으므로 일간·수십 년 데이터도 O(n log n).
+차트 페이로드는 resample()로 달력 버킷을 만들거나 fit_budget()으로 바이트 예산에 맞춘다.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+def to_series(data, name=None) -> pd.Series:
+    """[(date, value)] / {"x","y"} / pandas Series·단일열 DataFrame → 정렬된 float Series"""
+    if isinstance(data, pd.DataFrame):
+        data = data.iloc[:, 0] if data.shape[1] == 1 else data["Close"]
+    if isinstance(data, pd.Series):
+        idx = pd.DatetimeIndex(pd.to_datetime(data.index))
+        if idx.tz is not None:
+            idx = idx.tz_localize(None)
+        s = pd.Series(data.to_numpy(dtype=float), index=idx)
+    elif isinstance(data, dict):
+        s = pd.Series(np.asarray(data["y"], dtype=float),
+                      index=pd.DatetimeIndex(pd.to_datetime(data["x"])))
+    else:
+        data = list(data)
+        dates = [d for d, _ in data]
+        vals = np.fromiter((v for _, v in data), dtype=float, count=len(data))
+        s = pd.Series(vals, index=pd.DatetimeIndex(pd.to_datetime(dates)))
+    s = s[~np.isnan(s.to_numpy())]
+    if not s.index.is_monotonic_increasing:
+        s = s.sort_index(kind="stable")
+    if s.index.has_duplicates:
+        s = s[~s.index.duplicated(keep="last")]
+    if name is not None:
+        s.name = name
+    return s
+
+
+def asof_values(s: pd.Series, when) -> np.ndarray:
+    """when 각 시점 이하의 마지막 관측값 (없으면 NaN) — 정렬 인덱스 이진 탐색"""
+    idx = s.index.searchsorted(pd.DatetimeIndex(when), side="right") - 1
+    vals = s.to_numpy()
+    out = np.full(len(idx), np.nan)
+    ok = idx >= 0
+    out[ok] = vals[idx[ok]]
+    return out
+
+
+def pct_change_asof(s: pd.Series, offset) -> pd.Series:
+    """offset 이전 시점(as-of) 대비 변화율 %. 기준값이 없거나 0이면 제외"""
+    prev = asof_values(s, s.index - offset)
+    cur = s.to_numpy()
+    ok = ~np.isnan(prev) & (prev != 0)
+    return pd.Series((cur[ok] - prev[ok]) / prev[ok] * 100, index=s.index[ok], name=s.name)
+
+
+def yoy(s: pd.Series) -> pd.Series:
+    """전년 동기 대비 % (1년 전 날짜 이하 마지막 관측 기준)"""
+    return pct_change_asof(s, pd.DateOffset(years=1))
+
+
+def mom(s: pd.Series) -> pd.Series:
+    """전월 대비 % (1개월 전 날짜 이하 마지막 관측 기준)"""
+    return pct_change_asof(s, pd.DateOffset(months=1))
+
+
+def diff(s: pd.Series, periods=1) -> pd.Series:
+    """관측 간 차분 (첫 periods개 제외)"""
+    return s.diff(periods).iloc[periods:]
+
+
+def rolling_mean(s: pd.Series, window) -> pd.Series:
+    """이동평균 — window는 관측 개수(int) 또는 기간 문자열('30D')"""
+    if isinstance(window, int):
+        return s.rolling(window).mean().iloc[window - 1:]
+    return s.rolling(window).mean()
+
+
+def zscore(s: pd.Series, window=None) -> pd.Series:
+    """표준점수 — window가 없으면 전체 구간, 있으면 이동 창 기준"""
+    if window is None:
+        sd = s.std()
+        return (s - s.mean()) / sd if sd else s * 0.0
+    r = s.rolling(window)
+    z = (s - r.mean()) / r.std()
+    return z[np.isfinite(z.to_numpy())]
+
+
+def since(s: pd.Series, start) -> pd.Series:
+    """start(포함) 이후 구간"""
+    return s.loc[s.index >= pd.Timestamp(start)]
+
+
+def to_xy(s: pd.Series, decimals=None, start=None, date_fmt="%Y-%m-%d") -> dict:
+    """차트용 {"x": 날짜 문자열, "y": float} — fred_js / 템플릿 JS 배열 입력"""
+    if start is not None:
+        s = since(s, start)
+    x = s.index.strftime(date_fmt).tolist()
+    y = s.to_numpy().tolist()
+    if decimals is not None:
+        y = [round(v, decimals) for v in y]
+    return {"x": x, "y": y}
+
+
+# ───────────────────────────────────────────
+# 리샘플링 — 달력 버킷 (last / mean / OHLC)
+# ───────────────────────────────────────────
+
+def from_epoch_ms(points, x="x", y="y") -> pd.Series:
+    """[{x: epoch ms, y: 값}] (CNN graphdata 형식) → UTC 날짜 기준 Series"""
+    xs = np.fromiter((p.get(x, 0) for p in points), dtype=float, count=len(points))
+    ys = np.fromiter((p.get(y, 0) for p in points), dtype=float, count=len(points))
+    idx = pd.to_datetime(xs, unit="ms", utc=True).tz_localize(None)
+    return to_series(pd.Series(ys, index=idx))
+
+
+def resample(s: pd.Series, rule="ME", how="last") -> pd.Series:
+    """달력 버킷 집계 — rule: pandas 오프셋 ('W', 'ME', 'QE'), how: last/first/mean/max/min"""
+    out = getattr(s.resample(rule), how)()
+    return out[~np.isnan(out.to_numpy())]
+
+
+def ohlc(s: pd.Series, rule="W") -> pd.DataFrame:
+    """달력 버킷별 시가/고가/저가/종가"""
+    return s.resample(rule).ohlc().dropna()
+
+
+# ───────────────────────────────────────────
+# 다운샘플링 — LTTB (Largest-Triangle-Three-Buckets) + 바이트 예산
+# ───────────────────────────────────────────
+
+def lttb_indices(x, y, n) -> np.ndarray:
+    """모양 보존 다운샘플 — 남길 인덱스 n개 (양 끝점 포함, 오름차순)"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    N = len(x)
+    if n >= N or n < 3:
+        return np.arange(N)
+    edges = np.linspace(1, N - 1, n - 1).astype(np.int64)   # 중간 점을 n-2 버킷으로
+    keep = np.empty(n, dtype=np.int64)
+    keep[0], keep[-1] = 0, N - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo = edges[i + 1]
+        nhi = edges[i + 2] if i + 2 < n - 1 else N
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def lttb(s: pd.Series, n) -> pd.Series:
+    """Series를 n개 점으로 다운샘플 (피크·골 보존)"""
+    return s.iloc[lttb_indices(s.index.asi8, s.to_numpy(), n)]
+
+
+def _xy_bytes(xy):
+    return len(json.dumps(xy["x"], separators=(",", ":"))) + \
+        len(json.dumps(xy["y"], separators=(",", ":")))
+
+
+def fit_budget(xys: dict, budget: int, min_points=40) -> dict:
+    """{이름: {"x","y"}} 전체 JSON 크기가 budget 바이트 이하가 되도록 LTTB 축소
+
+    예산 안이면 입력을 그대로 돌려준다. 모든 시리즈를 같은 비율로 줄이되
+    min_points 아래로는 내리지 않는다."""
+    size = sum(_xy_bytes(v) for v in xys.values())
+    if size <= budget:
+        return xys
+    xnum = {k: np.array(v["x"], dtype="datetime64[D]").astype(np.int64) for k, v in xys.items()}
+    out, scale = xys, 1.0
+    while size > budget:
+        scale *= budget / size * 0.97
+        out = {}
+        for k, v in xys.items():
+            n = max(min_points, int(len(v["x"]) * scale))
+            keep = lttb_indices(xnum[k], v["y"], n)
+            out[k] = {"x": [v["x"][i] for i in keep], "y": [v["y"][i] for i in keep]}
+        size = sum(_xy_bytes(v) for v in out.values())
+        if all(len(v["x"]) <= min_points for v in out.values()):
+            break
+    return out